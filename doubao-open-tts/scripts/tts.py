@@ -8,537 +8,64 @@ import os
 import sys
 import json
 import base64
-import hashlib
-import hmac
 import time
 import uuid
-import requests
-from datetime import datetime, timezone
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
+try:
+    from tts_cache import TTSCache, cache_key
+    from audio_utils import AudioConcatenator, audio_duration, chunk_text, DEFAULT_MAX_CHUNK_BYTES
+    from voices import get_catalog
+except ImportError:  # 作为包导入 (from scripts.tts import ...)
+    from .tts_cache import TTSCache, cache_key
+    from .audio_utils import AudioConcatenator, audio_duration, chunk_text, DEFAULT_MAX_CHUNK_BYTES
+    from .voices import get_catalog
 
-# 加载 .env 文件
+# requests、python-dotenv 在首次发起请求 / 读取配置时才导入，
+# 使 --list-voices、--help 和 import tts 不必为其付出启动开销
+
+# .env 文件路径
 env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
-load_dotenv(env_path)
+_env_loaded = False
+
+
+def _load_env(override=False):
+    """加载 .env 文件（默认只在进程内加载一次）"""
+    global _env_loaded
+    if _env_loaded and not override:
+        return
+    from dotenv import load_dotenv
+    load_dotenv(env_path, override=override)
+    _env_loaded = True
 
 # API配置 - 火山引擎语音合成HTTP API V1
 API_HOST = "openspeech.bytedance.com"
 TTS_ENDPOINT = f"https://{API_HOST}/api/v1/tts"
+# 流式接口（WebSocket 二进制协议，音频分片到达即返回）
+TTS_WS_ENDPOINT = f"wss://{API_HOST}/api/v1/tts/ws_binary"
+
+# 批量合成默认并发数与每秒请求数上限（按控制台开通的并发额度调整）
+DEFAULT_BATCH_WORKERS = 4
+DEFAULT_BATCH_QPS = 5.0
 
 
 # 默认音色 - 通用场景（豆包语音合成模型1.0）
 DEFAULT_VOICE_TYPE = "zh_female_cancan_mars_bigtts"
 
-# 支持的音色列表（通用场景 - 豆包语音合成模型1.0）
-VOICE_TYPES = {
-    # 通用场景 - 多情感音色
-    "zh_male_lengkugege_emo_v2_mars_bigtts": "冷酷哥哥（多情感）",
-    "zh_female_tianxinxiaomei_emo_v2_mars_bigtts": "甜心小美（多情感）",
-    "zh_female_gaolengyujie_emo_v2_mars_bigtts": "高冷御姐（多情感）",
-    "zh_male_aojiaobazong_emo_v2_mars_bigtts": "傲娇霸总（多情感）",
-    "zh_male_guangzhoudege_emo_mars_bigtts": "广州德哥（多情感）",
-    "zh_male_jingqiangkanye_emo_mars_bigtts": "京腔侃爷（多情感）",
-    "zh_female_linjuayi_emo_v2_mars_bigtts": "邻居阿姨（多情感）",
-    "zh_male_yourougongzi_emo_v2_mars_bigtts": "优柔公子（多情感）",
-    "zh_male_ruyayichen_emo_v2_mars_bigtts": "儒雅男友（多情感）",
-    "zh_male_junlangnanyou_emo_v2_mars_bigtts": "俊朗男友（多情感）",
-    "zh_male_beijingxiaoye_emo_v2_mars_bigtts": "北京小爷（多情感）",
-    "zh_female_roumeinvyou_emo_v2_mars_bigtts": "柔美女友（多情感）",
-    "zh_male_yangguangqingnian_emo_v2_mars_bigtts": "阳光青年（多情感）",
-    "zh_female_meilinvyou_emo_v2_mars_bigtts": "魅力女友（多情感）",
-    "zh_female_shuangkuaisisi_emo_v2_mars_bigtts": "爽快思思（多情感）",
-    "en_female_candice_emo_v2_mars_bigtts": "Candice（多情感）",
-    "en_female_skye_emo_v2_mars_bigtts": "Serena（多情感）",
-    "en_male_glen_emo_v2_mars_bigtts": "Glen（多情感）",
-    "en_male_sylus_emo_v2_mars_bigtts": "Sylus（多情感）",
-    "en_male_corey_emo_v2_mars_bigtts": "Corey（多情感）",
-    "en_female_nadia_tips_emo_v2_mars_bigtts": "Nadia（多情感）",
-    "zh_male_shenyeboke_emo_v2_mars_bigtts": "深夜播客（多情感）",
-    
-    # 通用场景 - 普通音色
-    "zh_female_yingyujiaoyu_mars_bigtts": "Tina老师",
-    "ICL_zh_female_wenrounvshen_239eff5e8ffa_tob": "温柔女神",
-    "zh_female_vv_mars_bigtts": "Vivi",
-    "zh_female_qinqienvsheng_moon_bigtts": "亲切女声",
-    "ICL_zh_male_shenmi_v1_tob": "机灵小伙",
-    "ICL_zh_female_wuxi_tob": "元气甜妹",
-    "ICL_zh_female_wenyinvsheng_v1_tob": "知心姐姐",
-    "zh_male_qingyiyuxuan_mars_bigtts": "阳光阿辰",
-    "zh_male_xudong_conversation_wvae_bigtts": "快乐小东",
-    "ICL_zh_male_lengkugege_v1_tob": "冷酷哥哥",
-    "ICL_zh_female_feicui_v1_tob": "纯澈女生",
-    "ICL_zh_female_yuxin_v1_tob": "初恋女友",
-    "ICL_zh_female_xnx_tob": "贴心闺蜜",
-    "ICL_zh_female_yry_tob": "温柔白月光",
-    "ICL_zh_male_BV705_streaming_cs_tob": "炀炀",
-    "en_male_jason_conversation_wvae_bigtts": "开朗学长",
-    "zh_female_sophie_conversation_wvae_bigtts": "魅力苏菲",
-    "ICL_zh_female_yilin_tob": "贴心妹妹",
-    "zh_female_tianmeitaozi_mars_bigtts": "甜美桃子",
-    "zh_female_qingxinnvsheng_mars_bigtts": "清新女声",
-    "zh_female_zhixingnvsheng_mars_bigtts": "知性女声",
-    "zh_male_qingshuangnanda_mars_bigtts": "清爽男大",
-    "zh_female_linjianvhai_moon_bigtts": "邻家女孩",
-    "zh_male_yuanboxiaoshu_moon_bigtts": "渊博小叔",
-    "zh_male_yangguangqingnian_moon_bigtts": "阳光青年",
-    "zh_female_tianmeixiaoyuan_moon_bigtts": "甜美小源",
-    "zh_female_qingchezizi_moon_bigtts": "清澈梓梓",
-    "zh_male_jieshuoxiaoming_moon_bigtts": "解说小明",
-    "zh_female_kailangjiejie_moon_bigtts": "开朗姐姐",
-    "zh_male_linjiananhai_moon_bigtts": "邻家男孩",
-    "zh_female_tianmeiyueyue_moon_bigtts": "甜美悦悦",
-    "zh_female_xinlingjitang_moon_bigtts": "心灵鸡汤",
-    "ICL_zh_female_zhixingwenwan_tob": "知性温婉",
-    "ICL_zh_male_nuanxintitie_tob": "暖心体贴",
-    "ICL_zh_male_kailangqingkuai_tob": "开朗轻快",
-    "ICL_zh_male_huoposhuanglang_tob": "活泼爽朗",
-    "ICL_zh_male_shuaizhenxiaohuo_tob": "率真小伙",
-    "zh_male_wenrouxiaoge_mars_bigtts": "温柔小哥",
-    "zh_female_cancan_mars_bigtts": "灿灿/Shiny",
-    "zh_female_shuangkuaisisi_moon_bigtts": "爽快思思/Skye",
-    "zh_male_wennuanahu_moon_bigtts": "温暖阿虎/Alvin",
-    "zh_male_shaonianzixin_moon_bigtts": "少年梓辛/Brayan",
-    "ICL_zh_female_wenrouwenya_tob": "温柔文雅",
-    
-    # IP仿音
-    "zh_male_hupunan_mars_bigtts": "沪普男",
-    "zh_male_lubanqihao_mars_bigtts": "鲁班七号",
-    "zh_female_yangmi_mars_bigtts": "林潇",
-    "zh_female_linzhiling_mars_bigtts": "玲玲姐姐",
-    "zh_female_jiyejizi2_mars_bigtts": "春日部姐姐",
-    "zh_male_tangseng_mars_bigtts": "唐僧",
-    "zh_male_zhuangzhou_mars_bigtts": "庄周",
-    "zh_male_zhubajie_mars_bigtts": "猪八戒",
-    "zh_female_ganmaodianyin_mars_bigtts": "感冒电音姐姐",
-    "zh_female_naying_mars_bigtts": "直率英子",
-    "zh_female_leidian_mars_bigtts": "女雷神",
-    
-    # 趣味口音
-    "zh_female_yueyunv_mars_bigtts": "粤语小溏",
-    "zh_male_yuzhouzixuan_moon_bigtts": "豫州子轩",
-    "zh_female_daimengchuanmei_moon_bigtts": "呆萌川妹",
-    "zh_male_guangxiyuanzhou_moon_bigtts": "广西远舟",
-    "zh_male_zhoujielun_emo_v2_mars_bigtts": "双节棍小哥",
-    "zh_female_wanwanxiaohe_moon_bigtts": "湾湾小何",
-    "zh_female_wanqudashu_moon_bigtts": "湾区大叔",
-    "zh_male_guozhoudege_moon_bigtts": "广州德哥",
-    "zh_male_haoyuxiaoge_moon_bigtts": "浩宇小哥",
-    "zh_male_beijingxiaoye_moon_bigtts": "北京小爷",
-    "zh_male_jingqiangkanye_moon_bigtts": "京腔侃爷/Harmony",
-    "zh_female_meituojieer_moon_bigtts": "妹坨洁儿",
-    
-    # 角色扮演
-    "ICL_zh_female_chunzhenshaonv_e588402fb8ad_tob": "纯真少女",
-    "ICL_zh_male_xiaonaigou_edf58cf28b8b_tob": "奶气小生",
-    "ICL_zh_female_jinglingxiangdao_1beb294a9e3e_tob": "精灵向导",
-    "ICL_zh_male_menyoupingxiaoge_ffed9fc2fee7_tob": "闷油瓶小哥",
-    "ICL_zh_male_anrenqinzhu_cd62e63dcdab_tob": "黯刃秦主",
-    "ICL_zh_male_badaozongcai_v1_tob": "霸道总裁",
-    "ICL_zh_female_ganli_v1_tob": "妩媚可人",
-    "ICL_zh_female_xiangliangya_v1_tob": "邪魅御姐",
-    "ICL_zh_male_ms_tob": "嚣张小哥",
-    "ICL_zh_male_you_tob": "油腻大叔",
-    "ICL_zh_male_guaogongzi_v1_tob": "孤傲公子",
-    "ICL_zh_male_huzi_v1_tob": "胡子叔叔",
-    "ICL_zh_female_luoqing_v1_tob": "性感魅惑",
-    "ICL_zh_male_bingruogongzi_tob": "病弱公子",
-    "ICL_zh_female_bingjiao3_tob": "邪魅女王",
-    "ICL_zh_male_aomanqingnian_tob": "傲慢青年",
-    "ICL_zh_male_cujingnansheng_tob": "醋精男生",
-    "ICL_zh_male_shuanglangshaonian_tob": "爽朗少年",
-    "ICL_zh_male_sajiaonanyou_tob": "撒娇男友",
-    "ICL_zh_male_wenrounanyou_tob": "温柔男友",
-    "ICL_zh_male_wenshunshaonian_tob": "温顺少年",
-    "ICL_zh_male_naigounanyou_tob": "粘人男友",
-    "ICL_zh_male_sajiaonansheng_tob": "撒娇男生",
-    "ICL_zh_male_huoponanyou_tob": "活泼男友",
-    "ICL_zh_male_tianxinanyou_tob": "甜系男友",
-    "ICL_zh_male_huoliqingnian_tob": "活力青年",
-    "ICL_zh_male_kailangqingnian_tob": "开朗青年",
-    "ICL_zh_male_lengmoxiongzhang_tob": "冷漠兄长",
-    "ICL_zh_male_tiancaitongzhuo_tob": "天才同桌",
-    "ICL_zh_male_pianpiangongzi_tob": "翩翩公子",
-    "ICL_zh_male_mengdongqingnian_tob": "懵懂青年",
-    "ICL_zh_male_lenglianxiongzhang_tob": "冷脸兄长",
-    "ICL_zh_male_bingjiaoshaonian_tob": "病娇少年",
-    "ICL_zh_male_bingjiaonanyou_tob": "病娇男友",
-    "ICL_zh_male_bingruoshaonian_tob": "病弱少年",
-    "ICL_zh_male_yiqishaonian_tob": "意气少年",
-    "ICL_zh_male_ganjingshaonian_tob": "干净少年",
-    "ICL_zh_male_lengmonanyou_tob": "冷漠男友",
-    "ICL_zh_male_jingyingqingnian_tob": "精英青年",
-    "ICL_zh_male_rexueshaonian_tob": "热血少年",
-    "ICL_zh_male_qingshuangshaonian_tob": "清爽少年",
-    "ICL_zh_male_zhongerqingnian_tob": "中二青年",
-    "ICL_zh_male_lingyunqingnian_tob": "凌云青年",
-    "ICL_zh_male_zifuqingnian_tob": "自负青年",
-    "ICL_zh_male_bujiqingnian_tob": "不羁青年",
-    "ICL_zh_male_ruyajunzi_tob": "儒雅君子",
-    "ICL_zh_male_diyinchenyu_tob": "低音沉郁",
-    "ICL_zh_male_lenglianxueba_tob": "冷脸学霸",
-    "ICL_zh_male_ruyazongcai_tob": "儒雅总裁",
-    "ICL_zh_male_shenchenzongcai_tob": "深沉总裁",
-    "ICL_zh_male_xiaohouye_tob": "小侯爷",
-    "ICL_zh_male_gugaogongzi_tob": "孤高公子",
-    "ICL_zh_male_zhangjianjunzi_tob": "仗剑君子",
-    "ICL_zh_male_wenrunxuezhe_tob": "温润学者",
-    "ICL_zh_male_qinqieqingnian_tob": "亲切青年",
-    "ICL_zh_male_wenrouxuezhang_tob": "温柔学长",
-    "ICL_zh_male_gaolengzongcai_tob": "高冷总裁",
-    "ICL_zh_male_lengjungaozhi_tob": "冷峻高智",
-    "ICL_zh_male_chanruoshaoye_tob": "孱弱少爷",
-    "ICL_zh_male_zixinqingnian_tob": "自信青年",
-    "ICL_zh_male_qingseqingnian_tob": "青涩青年",
-    "ICL_zh_male_xuebatongzhuo_tob": "学霸同桌",
-    "ICL_zh_male_lengaozongcai_tob": "冷傲总裁",
-    "ICL_zh_male_yuanqishaonian_tob": "元气少年",
-    "ICL_zh_male_satuoqingnian_tob": "洒脱青年",
-    "ICL_zh_male_zhishuaiqingnian_tob": "直率青年",
-    "ICL_zh_male_siwenqingnian_tob": "斯文青年",
-    "ICL_zh_male_junyigongzi_tob": "俊逸公子",
-    "ICL_zh_male_zhangjianxiake_tob": "仗剑侠客",
-    "ICL_zh_male_jijiaozhineng_tob": "机甲智能",
-    "zh_male_naiqimengwa_mars_bigtts": "奶气萌娃",
-    "zh_female_popo_mars_bigtts": "婆婆",
-    "zh_female_gaolengyujie_moon_bigtts": "高冷御姐",
-    "zh_male_aojiaobazong_moon_bigtts": "傲娇霸总",
-    "zh_female_meilinvyou_moon_bigtts": "魅力女友",
-    "zh_male_shenyeboke_moon_bigtts": "深夜播客",
-    "zh_female_sajiaonvyou_moon_bigtts": "柔美女友",
-    "zh_female_yuanqinvyou_moon_bigtts": "撒娇学妹",
-    "ICL_zh_female_bingruoshaonv_tob": "病弱少女",
-    "ICL_zh_female_huoponvhai_tob": "活泼女孩",
-    "zh_male_dongfanghaoran_moon_bigtts": "东方浩然",
-    "ICL_zh_male_lvchaxiaoge_tob": "绿茶小哥",
-    "ICL_zh_female_jiaoruoluoli_tob": "娇弱萝莉",
-    "ICL_zh_male_lengdanshuli_tob": "冷淡疏离",
-    "ICL_zh_male_hanhoudunshi_tob": "憨厚敦实",
-    "ICL_zh_female_huopodiaoman_tob": "活泼刁蛮",
-    "ICL_zh_male_guzhibingjiao_tob": "固执病娇",
-    "ICL_zh_male_sajiaonianren_tob": "撒娇粘人",
-    "ICL_zh_female_aomanjiaosheng_tob": "傲慢娇声",
-    "ICL_zh_male_xiaosasuixing_tob": "潇洒随性",
-    "ICL_zh_male_guiyishenmi_tob": "诡异神秘",
-    "ICL_zh_male_ruyacaijun_tob": "儒雅才俊",
-    "ICL_zh_male_zhengzhiqingnian_tob": "正直青年",
-    "ICL_zh_female_jiaohannvwang_tob": "娇憨女王",
-    "ICL_zh_female_bingjiaomengmei_tob": "病娇萌妹",
-    "ICL_zh_male_qingsenaigou_tob": "青涩小生",
-    "ICL_zh_male_chunzhenxuedi_tob": "纯真学弟",
-    "ICL_zh_male_youroubangzhu_tob": "优柔帮主",
-    "ICL_zh_male_yourougongzi_tob": "优柔公子",
-    "ICL_zh_female_tiaopigongzhu_tob": "调皮公主",
-    "ICL_zh_male_tiexinnanyou_tob": "贴心男友",
-    "ICL_zh_male_shaonianjiangjun_tob": "少年将军",
-    "ICL_zh_male_bingjiaogege_tob": "病娇哥哥",
-    "ICL_zh_male_xuebanantongzhuo_tob": "学霸男同桌",
-    "ICL_zh_male_youmoshushu_tob": "幽默叔叔",
-    "ICL_zh_female_jiaxiaozi_tob": "假小子",
-    "ICL_zh_male_wenrounantongzhuo_tob": "温柔男同桌",
-    "ICL_zh_male_youmodaye_tob": "幽默大爷",
-    "ICL_zh_male_asmryexiu_tob": "枕边低语",
-    "ICL_zh_male_shenmifashi_tob": "神秘法师",
-    "zh_female_jiaochuan_mars_bigtts": "娇喘女声",
-    "zh_male_livelybro_mars_bigtts": "开朗弟弟",
-    "zh_female_flattery_mars_bigtts": "谄媚女声",
-    "ICL_zh_male_lengjunshangsi_tob": "冷峻上司",
-    "ICL_zh_male_xiaoge_v1_tob": "寡言小哥",
-    "ICL_zh_male_renyuwangzi_v1_tob": "清朗温润",
-    "ICL_zh_male_xiaosha_v1_tob": "潇洒随性",
-    "ICL_zh_male_liyisheng_v1_tob": "清冷矜贵",
-    "ICL_zh_male_qinglen_v1_tob": "沉稳优雅",
-    "ICL_zh_male_chongqingzhanzhan_v1_tob": "清逸苏感",
-    "ICL_zh_male_xingjiwangzi_v1_tob": "温柔内敛",
-    "ICL_zh_male_sigeshiye_v1_tob": "低沉缱绻",
-    "ICL_zh_male_lanyingcaohunshi_v1_tob": "蓝银草魂师",
-    "ICL_zh_female_liumengdie_v1_tob": "清冷高雅",
-    "ICL_zh_female_linxueying_v1_tob": "甜美娇俏",
-    "ICL_zh_female_rouguhunshi_v1_tob": "柔骨魂师",
-    "ICL_zh_female_tianmei_v1_tob": "甜美活泼",
-    "ICL_zh_female_chengshu_v1_tob": "成熟温柔",
-    "ICL_zh_female_xnx_v1_tob": "贴心闺蜜",
-    "ICL_zh_female_yry_v1_tob": "温柔白月光",
-    "zh_male_bv139_audiobook_ummv3_bigtts": "高冷沉稳",
-    "ICL_zh_male_cujingnanyou_tob": "醋精男友",
-    "ICL_zh_male_fengfashaonian_tob": "风发少年",
-    "ICL_zh_male_cixingnansang_tob": "磁性男嗓",
-    "ICL_zh_male_chengshuzongcai_tob": "成熟总裁",
-    "ICL_zh_male_aojiaojingying_tob": "傲娇精英",
-    "ICL_zh_male_aojiaogongzi_tob": "傲娇公子",
-    "ICL_zh_male_badaoshaoye_tob": "霸道少爷",
-    "ICL_zh_male_fuheigongzi_tob": "腹黑公子",
-    "ICL_zh_female_nuanxinxuejie_tob": "暖心学姐",
-    "ICL_zh_female_keainvsheng_tob": "可爱女生",
-    "ICL_zh_female_chengshujiejie_tob": "成熟姐姐",
-    "ICL_zh_female_bingjiaojiejie_tob": "病娇姐姐",
-    "ICL_zh_female_wumeiyujie_tob": "妩媚御姐",
-    "ICL_zh_female_aojiaonvyou_tob": "傲娇女友",
-    "ICL_zh_female_tiexinnvyou_tob": "贴心女友",
-    "ICL_zh_female_xingganyujie_tob": "性感御姐",
-    "ICL_zh_male_bingjiaodidi_tob": "病娇弟弟",
-    "ICL_zh_male_aomanshaoye_tob": "傲慢少爷",
-    "ICL_zh_male_aiqilingren_tob": "傲气凌人",
-    "ICL_zh_male_bingjiaobailian_tob": "病娇白莲",
-    
-    # 多语种
-    "en_female_lauren_moon_bigtts": "Lauren",
-    "en_male_campaign_jamal_moon_bigtts": "Energetic Male II",
-    "en_male_chris_moon_bigtts": "Gotham Hero",
-    "en_female_product_darcie_moon_bigtts": "Flirty Female",
-    "en_female_emotional_moon_bigtts": "Peaceful Female",
-    "en_female_nara_moon_bigtts": "Nara",
-    "en_male_bruce_moon_bigtts": "Bruce",
-    "en_male_michael_moon_bigtts": "Michael",
-    "ICL_en_male_cc_sha_v1_tob": "Cartoon Chef",
-    "zh_male_M100_conversation_wvae_bigtts": "Lucas",
-    "zh_female_sophie_conversation_wvae_bigtts": "Sophie",
-    "en_female_dacey_conversation_wvae_bigtts": "Daisy",
-    "en_male_charlie_conversation_wvae_bigtts": "Owen",
-    "en_female_sarah_new_conversation_wvae_bigtts": "Luna",
-    "ICL_en_male_michael_tob": "Michael",
-    "ICL_en_female_cc_cm_v1_tob": "Charlie",
-    "ICL_en_male_oogie2_tob": "Big Boogie",
-    "ICL_en_male_frosty1_tob": "Frosty Man",
-    "ICL_en_male_grinch2_tob": "The Grinch",
-    "ICL_en_male_zayne_tob": "Zayne",
-    "ICL_en_male_cc_jigsaw_tob": "Jigsaw",
-    "ICL_en_male_cc_chucky_tob": "Chucky",
-    "ICL_en_male_cc_penny_v1_tob": "Clown Man",
-    "ICL_en_male_kevin2_tob": "Kevin McCallister",
-    "ICL_en_male_xavier1_v1_tob": "Xavier",
-    "ICL_en_male_cc_dracula_v1_tob": "Noah",
-    "en_male_adam_mars_bigtts": "Adam",
-    "en_female_amanda_mars_bigtts": "Amanda",
-    "en_male_jackson_mars_bigtts": "Jackson",
-    "en_female_daisy_moon_bigtts": "Delicate Girl",
-    "en_male_dave_moon_bigtts": "Dave",
-    "en_male_hades_moon_bigtts": "Hades",
-    "en_female_onez_moon_bigtts": "Onez",
-    "en_female_emily_mars_bigtts": "Emily",
-    "zh_male_xudong_conversation_wvae_bigtts": "Daniel",
-    "ICL_en_male_cc_alastor_tob": "Alastor",
-    "en_male_smith_mars_bigtts": "Smith",
-    "en_female_anna_mars_bigtts": "Anna",
-    "ICL_en_male_aussie_v1_tob": "Ethan",
-    "en_female_sarah_mars_bigtts": "Sarah",
-    "en_male_dryw_mars_bigtts": "Dryw",
-    "multi_female_maomao_conversation_wvae_bigtts": "Diana",
-    "multi_male_M100_conversation_wvae_bigtts": "Lucía",
-    "multi_female_sophie_conversation_wvae_bigtts": "Sofía",
-    "multi_male_xudong_conversation_wvae_bigtts": "Daníel",
-    "multi_zh_male_youyoujunzi_moon_bigtts": "ひかる（光）",
-    "multi_female_sophie_conversation_wvae_bigtts": "さとみ（智美）",
-    "multi_male_xudong_conversation_wvae_bigtts": "まさお（正男）",
-    "multi_female_maomao_conversation_wvae_bigtts": "つき（月）",
-    "multi_female_gaolengyujie_moon_bigtts": "あけみ（朱美）",
-    "multi_male_jingqiangkanye_moon_bigtts": "かずね（和音）",
-    "multi_female_shuangkuaisisi_moon_bigtts": "はるこ（晴子）",
-    "multi_male_wanqudashu_moon_bigtts": "ひろし（広志）",
-    
-    # 客服场景
-    "ICL_zh_female_lixingyuanzi_cs_tob": "理性圆子",
-    "ICL_zh_female_qingtiantaotao_cs_tob": "清甜桃桃",
-    "ICL_zh_female_qingxixiaoxue_cs_tob": "清晰小雪",
-    "ICL_zh_female_qingtianmeimei_cs_tob": "清甜莓莓",
-    "ICL_zh_female_kailangtingting_cs_tob": "开朗婷婷",
-    "ICL_zh_male_qingxinmumu_cs_tob": "清新沐沐",
-    "ICL_zh_male_shuanglangxiaoyang_cs_tob": "爽朗小阳",
-    "ICL_zh_male_qingxinbobo_cs_tob": "清新波波",
-    "ICL_zh_female_wenwanshanshan_cs_tob": "温婉珊珊",
-    "ICL_zh_female_tianmeixiaoyu_cs_tob": "甜美小雨",
-    "ICL_zh_female_reqingaina_cs_tob": "热情艾娜",
-    "ICL_zh_female_tianmeixiaoju_cs_tob": "甜美小橘",
-    "ICL_zh_male_chenwenmingzai_cs_tob": "沉稳明仔",
-    "ICL_zh_male_qinqiexiaozhuo_cs_tob": "亲切小卓",
-    "ICL_zh_female_lingdongxinxin_cs_tob": "灵动欣欣",
-    "ICL_zh_female_guaiqiaokeer_cs_tob": "乖巧可儿",
-    "ICL_zh_female_nuanxinqianqian_cs_tob": "暖心茜茜",
-    "ICL_zh_female_ruanmengtuanzi_cs_tob": "软萌团子",
-    "ICL_zh_male_yangguangyangyang_cs_tob": "阳光洋洋",
-    "ICL_zh_female_ruanmengtangtang_cs_tob": "软萌糖糖",
-    "ICL_zh_female_xiuliqianqian_cs_tob": "秀丽倩倩",
-    "ICL_zh_female_kaixinxiaohong_cs_tob": "开心小鸿",
-    "ICL_zh_female_qingyingduoduo_cs_tob": "轻盈朵朵",
-    "zh_female_kefunvsheng_mars_bigtts": "暖阳女声",
-    
-    # 视频配音
-    "zh_male_M100_conversation_wvae_bigtts": "悠悠君子",
-    "zh_female_maomao_conversation_wvae_bigtts": "文静毛毛",
-    "ICL_zh_female_qiuling_v1_tob": "倾心少女",
-    "ICL_zh_male_buyan_v1_tob": "醇厚低音",
-    "ICL_zh_male_BV144_paoxiaoge_v1_tob": "咆哮小哥",
-    "ICL_zh_female_heainainai_tob": "和蔼奶奶",
-    "ICL_zh_female_linjuayi_tob": "邻居阿姨",
-    "zh_female_wenrouxiaoya_moon_bigtts": "温柔小雅",
-    "zh_male_tiancaitongsheng_mars_bigtts": "天才童声",
-    "zh_male_sunwukong_mars_bigtts": "猴哥",
-    "zh_male_xionger_mars_bigtts": "熊二",
-    "zh_female_peiqi_mars_bigtts": "佩奇猪",
-    "zh_female_wuzetian_mars_bigtts": "武则天",
-    "zh_female_gujie_mars_bigtts": "顾姐",
-    "zh_female_yingtaowanzi_mars_bigtts": "樱桃丸子",
-    "zh_male_chunhui_mars_bigtts": "广告解说",
-    "zh_female_shaoergushi_mars_bigtts": "少儿故事",
-    "zh_male_silang_mars_bigtts": "四郎",
-    "zh_female_qiaopinvsheng_mars_bigtts": "俏皮女声",
-    "zh_male_lanxiaoyang_mars_bigtts": "懒音绵宝",
-    "zh_male_dongmanhaimian_mars_bigtts": "亮嗓萌仔",
-    "zh_male_jieshuonansheng_mars_bigtts": "磁性解说男声/Morgan",
-    "zh_female_jitangmeimei_mars_bigtts": "鸡汤妹妹/Hope",
-    "zh_female_tiexinnvsheng_mars_bigtts": "贴心女声/Candy",
-    "zh_female_mengyatou_mars_bigtts": "萌丫头/Cutey",
-    
-    # 有声阅读
-    "ICL_zh_male_neiliancaijun_e991be511569_tob": "内敛才俊",
-    "ICL_zh_male_yangyang_v1_tob": "温暖少年",
-    "ICL_zh_male_flc_v1_tob": "儒雅公子",
-    "zh_male_changtianyi_mars_bigtts": "悬疑解说",
-    "zh_male_ruyaqingnian_mars_bigtts": "儒雅青年",
-    "zh_male_baqiqingshu_mars_bigtts": "霸气青叔",
-    "zh_male_qingcang_mars_bigtts": "擎苍",
-    "zh_male_yangguangqingnian_mars_bigtts": "活力小哥",
-    "zh_female_gufengshaoyu_mars_bigtts": "古风少御",
-    "zh_female_wenroushunv_mars_bigtts": "温柔淑女",
-    "zh_male_fanjuanqingnian_mars_bigtts": "反卷青年",
+# 音色目录（音色列表、分类、推荐音色）保存在 voices.json 中，首次访问时才读取
+_CATALOG_ATTRS = {
+    "VOICE_TYPES": "voices",
+    "VOICE_CATEGORIES": "categories",
+    "RECOMMENDED_VOICES": "recommended",
+    "CATEGORY_DISPLAY_NAMES": "category_display_names",
 }
 
-# 音色分类
-VOICE_CATEGORIES = {
-    "通用场景-多情感": [
-        "zh_male_lengkugege_emo_v2_mars_bigtts",
-        "zh_female_tianxinxiaomei_emo_v2_mars_bigtts",
-        "zh_female_gaolengyujie_emo_v2_mars_bigtts",
-        "zh_male_aojiaobazong_emo_v2_mars_bigtts",
-        "zh_male_guangzhoudege_emo_mars_bigtts",
-        "zh_male_jingqiangkanye_emo_mars_bigtts",
-        "zh_female_linjuayi_emo_v2_mars_bigtts",
-        "zh_male_yourougongzi_emo_v2_mars_bigtts",
-        "zh_male_ruyayichen_emo_v2_mars_bigtts",
-        "zh_male_junlangnanyou_emo_v2_mars_bigtts",
-        "zh_male_beijingxiaoye_emo_v2_mars_bigtts",
-        "zh_female_roumeinvyou_emo_v2_mars_bigtts",
-        "zh_male_yangguangqingnian_emo_v2_mars_bigtts",
-        "zh_female_meilinvyou_emo_v2_mars_bigtts",
-        "zh_female_shuangkuaisisi_emo_v2_mars_bigtts",
-        "en_female_candice_emo_v2_mars_bigtts",
-        "en_female_skye_emo_v2_mars_bigtts",
-        "en_male_glen_emo_v2_mars_bigtts",
-        "en_male_sylus_emo_v2_mars_bigtts",
-        "en_male_corey_emo_v2_mars_bigtts",
-        "en_female_nadia_tips_emo_v2_mars_bigtts",
-        "zh_male_shenyeboke_emo_v2_mars_bigtts",
-    ],
-    "通用场景-普通": [
-        "zh_female_cancan_mars_bigtts",
-        "zh_female_qinqienvsheng_moon_bigtts",
-        "zh_male_xudong_conversation_wvae_bigtts",
-        "zh_female_shuangkuaisisi_moon_bigtts",
-        "zh_male_wennuanahu_moon_bigtts",
-        "zh_male_yangguangqingnian_moon_bigtts",
-        "zh_female_linjianvhai_moon_bigtts",
-        "zh_male_yuanboxiaoshu_moon_bigtts",
-        "zh_female_gaolengyujie_moon_bigtts",
-        "zh_male_aojiaobazong_moon_bigtts",
-        "zh_female_meilinvyou_moon_bigtts",
-        "zh_male_shenyeboke_moon_bigtts",
-        "zh_male_dongfanghaoran_moon_bigtts",
-    ],
-    "角色扮演": [
-        "ICL_zh_female_chunzhenshaonv_e588402fb8ad_tob",
-        "ICL_zh_male_xiaonaigou_edf58cf28b8b_tob",
-        "ICL_zh_female_jinglingxiangdao_1beb294a9e3e_tob",
-        "ICL_zh_male_menyoupingxiaoge_ffed9fc2fee7_tob",
-        "ICL_zh_male_anrenqinzhu_cd62e63dcdab_tob",
-        "ICL_zh_male_badaozongcai_v1_tob",
-        "ICL_zh_male_bingruogongzi_tob",
-        "ICL_zh_female_bingjiao3_tob",
-        "ICL_zh_male_shuanglangshaonian_tob",
-        "ICL_zh_male_sajiaonanyou_tob",
-        "ICL_zh_male_wenrounanyou_tob",
-        "ICL_zh_male_tiancaitongzhuo_tob",
-        "ICL_zh_male_bingjiaoshaonian_tob",
-        "ICL_zh_male_bingjiaonanyou_tob",
-        "ICL_zh_male_bingruoshaonian_tob",
-        "ICL_zh_male_bingjiaogege_tob",
-        "ICL_zh_female_bingjiaojiejie_tob",
-        "ICL_zh_male_bingjiaodidi_tob",
-        "ICL_zh_female_bingruoshaonv_tob",
-        "ICL_zh_female_bingjiaomengmei_tob",
-        "ICL_zh_male_bingjiaobailian_tob",
-    ],
-    "视频配音": [
-        "zh_male_M100_conversation_wvae_bigtts",
-        "zh_female_maomao_conversation_wvae_bigtts",
-        "zh_male_tiancaitongsheng_mars_bigtts",
-        "zh_male_sunwukong_mars_bigtts",
-        "zh_male_xionger_mars_bigtts",
-        "zh_female_peiqi_mars_bigtts",
-        "zh_female_wuzetian_mars_bigtts",
-        "zh_female_yingtaowanzi_mars_bigtts",
-        "zh_male_silang_mars_bigtts",
-        "zh_male_jieshuonansheng_mars_bigtts",
-    ],
-    "有声阅读": [
-        "zh_male_changtianyi_mars_bigtts",
-        "zh_male_ruyaqingnian_mars_bigtts",
-        "zh_male_baqiqingshu_mars_bigtts",
-        "zh_male_qingcang_mars_bigtts",
-        "zh_female_gufengshaoyu_mars_bigtts",
-        "zh_female_wenroushunv_mars_bigtts",
-    ],
-    "多语种": [
-        "en_female_lauren_moon_bigtts",
-        "en_male_michael_moon_bigtts",
-        "en_male_bruce_moon_bigtts",
-        "en_female_emily_mars_bigtts",
-        "en_male_smith_mars_bigtts",
-        "en_female_anna_mars_bigtts",
-    ],
-}
 
-# 推荐音色（用于交互式选择）
-RECOMMENDED_VOICES = {
-    "通用场景-多情感": [
-        ("zh_female_gaolengyujie_emo_v2_mars_bigtts", "高冷御姐（多情感）"),
-        ("zh_male_aojiaobazong_emo_v2_mars_bigtts", "傲娇霸总（多情感）"),
-        ("zh_male_ruyayichen_emo_v2_mars_bigtts", "儒雅男友（多情感）"),
-    ],
-    "通用场景-普通": [
-        ("zh_female_cancan_mars_bigtts", "灿灿/Shiny [DEFAULT]"),
-        ("zh_male_xudong_conversation_wvae_bigtts", "快乐小东"),
-        ("zh_female_qinqienvsheng_moon_bigtts", "亲切女声"),
-    ],
-    "角色扮演": [
-        ("ICL_zh_female_chunzhenshaonv_e588402fb8ad_tob", "纯真少女"),
-        ("ICL_zh_male_badaozongcai_v1_tob", "霸道总裁"),
-        ("ICL_zh_male_sajiaonanyou_tob", "撒娇男友"),
-    ],
-    "视频配音": [
-        ("zh_male_sunwukong_mars_bigtts", "猴哥"),
-        ("zh_male_xionger_mars_bigtts", "熊二"),
-        ("zh_female_peiqi_mars_bigtts", "佩奇猪"),
-    ],
-    "有声阅读": [
-        ("zh_male_qingcang_mars_bigtts", "擎苍"),
-        ("zh_male_ruyaqingnian_mars_bigtts", "儒雅青年"),
-        ("zh_female_wenroushunv_mars_bigtts", "温柔淑女"),
-    ],
-    "多语种": [
-        ("en_female_lauren_moon_bigtts", "Lauren (美式英语)"),
-        ("en_male_michael_moon_bigtts", "Michael (美式英语)"),
-        ("en_female_emily_mars_bigtts", "Emily (英式英语)"),
-    ],
-}
-
-# 音色分类英文映射（用于交互显示）
-CATEGORY_DISPLAY_NAMES = {
-    "通用场景-多情感": "General - Multilingual (with emotions)",
-    "通用场景-普通": "General - Normal",
-    "角色扮演": "Roleplay",
-    "视频配音": "Video Dubbing",
-    "有声阅读": "Audiobook",
-    "多语种": "Multilingual",
-}
+def __getattr__(name):
+    """兼容 from tts import VOICE_TYPES 等旧用法：按需从音色目录读取"""
+    if name in _CATALOG_ATTRS:
+        return getattr(get_catalog(), _CATALOG_ATTRS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def check_api_config():
@@ -548,15 +75,15 @@ def check_api_config():
     Returns:
         dict or None: 如果配置完整返回配置字典，否则返回None
     """
+    _load_env()
     app_id = os.environ.get('VOLCANO_TTS_APPID')
     access_token = os.environ.get('VOLCANO_TTS_ACCESS_TOKEN')
     secret_key = os.environ.get('VOLCANO_TTS_SECRET_KEY')
     
     # 如果环境变量没有，尝试从.env文件读取
     if not all([app_id, access_token, secret_key]):
-        env_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.env')
         if os.path.exists(env_path):
-            load_dotenv(env_path, override=True)
+            _load_env(override=True)
             app_id = os.environ.get('VOLCANO_TTS_APPID')
             access_token = os.environ.get('VOLCANO_TTS_ACCESS_TOKEN')
             secret_key = os.environ.get('VOLCANO_TTS_SECRET_KEY')
@@ -615,7 +142,7 @@ def setup_api_config(app_id, access_token, secret_key, voice_type=None):
             f.write(f"VOLCANO_TTS_VOICE_TYPE={existing_content.get('VOLCANO_TTS_VOICE_TYPE', voice_type)}\n")
     
     # 重新加载环境变量
-    load_dotenv(env_path, override=True)
+    _load_env(override=True)
     
     return env_path
 
@@ -667,8 +194,9 @@ def get_voice_selection_prompt():
         "",
     ]
     
-    for category, voices in RECOMMENDED_VOICES.items():
-        display_name = CATEGORY_DISPLAY_NAMES.get(category, category)
+    catalog = get_catalog()
+    for category, voices in catalog.recommended.items():
+        display_name = catalog.category_display_names.get(category, category)
         prompt_lines.append(f"[{display_name}]")
         
         for voice_id, voice_name in voices:
@@ -703,31 +231,10 @@ def find_voice_by_name(name):
         
     Returns:
         tuple: (voice_type, voice_display_name) 或 (None, None) 如果未找到
+
+    依次匹配 voice_type、完整名称或英文别名（如 Shiny）、名称前缀、名称中包含
     """
-    name = name.strip().lower()
-    
-    # 直接匹配voice_type
-    if name in VOICE_TYPES:
-        return name, VOICE_TYPES[name]
-    
-    # 模糊匹配音色名称
-    for voice_id, display_name in VOICE_TYPES.items():
-        # 完全匹配
-        if name == display_name.lower():
-            return voice_id, display_name
-        
-        # 部分匹配（中文或英文名称）
-        if name in display_name.lower():
-            return voice_id, display_name
-        
-        # 匹配英文别名（如 Shiny, Skye 等）
-        if "/" in display_name:
-            aliases = display_name.split("/")
-            for alias in aliases:
-                if name == alias.strip().lower():
-                    return voice_id, display_name
-    
-    return None, None
+    return get_catalog().find(name)
 
 
 def get_voice_info(voice_type):
@@ -740,26 +247,50 @@ def get_voice_info(voice_type):
     Returns:
         dict: 音色信息
     """
-    if voice_type not in VOICE_TYPES:
+    catalog = get_catalog()
+    if voice_type not in catalog.voices:
         return None
     
-    # 查找所属分类
-    category = None
-    for cat, voices in VOICE_CATEGORIES.items():
-        if voice_type in voices:
-            category = cat
-            break
-    
+    category = catalog.category_of.get(voice_type)
     return {
         "voice_type": voice_type,
-        "name": VOICE_TYPES[voice_type],
+        "name": catalog.voices[voice_type],
         "category": category,
-        "category_display": CATEGORY_DISPLAY_NAMES.get(category, category) if category else "Unknown",
+        "category_display": catalog.category_display_names.get(category, category) if category else "Unknown",
     }
 
 
+class RateLimiter:
+    """
+    线程安全的请求速率限制器
+    
+    按固定间隔 (1/qps) 分配请求时间槽，多个线程同时调用 wait() 时依次排队。
+    """
+    
+    def __init__(self, qps):
+        """
+        Args:
+            qps: 每秒最多请求数，None 或 <=0 表示不限制
+        """
+        self.interval = 1.0 / qps if qps and qps > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """阻塞到下一个可用时间槽"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
 class VolcanoTTS:
-    def __init__(self, app_id=None, access_token=None, secret_key=None, voice_type=None):
+    def __init__(self, app_id=None, access_token=None, secret_key=None, voice_type=None,
+                 pool_size=DEFAULT_BATCH_WORKERS, cache=None):
         """
         初始化火山引擎TTS客户端
         
@@ -768,7 +299,13 @@ class VolcanoTTS:
             access_token: 访问令牌 (AK)
             secret_key: 密钥 (SK)
             voice_type: 音色类型，默认使用DEFAULT_VOICE_TYPE
+            pool_size: 连接池大小（批量合成的最大并发数）
+            cache: TTSCache 实例（可选）。命中时直接复制缓存音频，不调用接口
         """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        _load_env()
         self.app_id = app_id or os.environ.get('VOLCANO_TTS_APPID')
         self.access_token = access_token or os.environ.get('VOLCANO_TTS_ACCESS_TOKEN')
         self.secret_key = secret_key or os.environ.get('VOLCANO_TTS_SECRET_KEY')
@@ -776,6 +313,26 @@ class VolcanoTTS:
         
         if not all([self.app_id, self.access_token, self.secret_key]):
             raise ValueError("缺少必要的API配置，请设置环境变量或直接传入参数")
+        
+        self.cache = cache
+        
+        # 复用 keep-alive 连接，多次合成只需一次 TLS 握手
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def close(self):
+        """关闭连接池并保存缓存索引"""
+        self.session.close()
+        if self.cache:
+            self.cache.flush()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
     
     def list_voices(self, category=None):
         """
@@ -787,10 +344,10 @@ class VolcanoTTS:
         Returns:
             音色列表
         """
-        if category and category in VOICE_CATEGORIES:
-            voices = VOICE_CATEGORIES[category]
-            return {v: VOICE_TYPES[v] for v in voices}
-        return VOICE_TYPES
+        catalog = get_catalog()
+        if category and category in catalog.categories:
+            return {v: catalog.voices[v] for v in catalog.categories[category]}
+        return catalog.voices
     
     def set_voice(self, voice_type):
         """
@@ -799,7 +356,7 @@ class VolcanoTTS:
         Args:
             voice_type: 音色类型
         """
-        if voice_type not in VOICE_TYPES:
+        if voice_type not in get_catalog().voices:
             raise ValueError(f"不支持的音色: {voice_type}")
         self.voice_type = voice_type
         return self.voice_type
@@ -823,6 +380,45 @@ class VolcanoTTS:
         Returns:
             音频文件路径
         """
+        return self._synthesize(text, voice_type, encoding, sample_rate, speed, volume,
+                                output_file, cluster)[0]
+    
+    def _synthesize(self, text, voice_type=None, encoding="mp3",
+                    sample_rate=24000, speed=1.0, volume=1.0,
+                    output_file=None, cluster="volcano_tts"):
+        """
+        合成语音（先查缓存），返回 (音频文件路径, 时长秒数, 是否命中缓存)
+        """
+        if output_file is None:
+            timestamp = int(time.time())
+            output_file = f"tts_output_{timestamp}.{encoding}"
+        
+        if self.cache is None:
+            path, duration = self._request_audio(text, voice_type, encoding, sample_rate, speed, volume,
+                                                 output_file, cluster)
+            return path, duration, False
+        
+        key = cache_key(text, voice_type or self.voice_type, encoding, sample_rate, speed, volume, cluster)
+        hit = self.cache.fetch(key, output_file)
+        if hit is not None:
+            return str(Path(output_file).absolute()), hit["duration"], True
+        
+        path, duration = self._request_audio(text, voice_type, encoding, sample_rate, speed, volume,
+                                             output_file, cluster)
+        self.cache.put(key, path, duration=duration, text=text)
+        return path, duration, False
+    
+    def _build_request(self, text, voice_type=None, encoding="mp3", sample_rate=24000, speed=1.0,
+                       volume=1.0, cluster="volcano_tts", operation="query"):
+        """
+        构建请求头和请求体
+        
+        Args:
+            operation: query（HTTP 一次性返回）或 submit（WebSocket 流式返回）
+        
+        Returns:
+            tuple: (headers, body)
+        """
         # 使用传入的音色或实例默认音色
         voice = voice_type or self.voice_type
         
@@ -853,9 +449,22 @@ class VolcanoTTS:
                 "reqid": str(uuid.uuid4()),
                 "text": text,
                 "text_type": "plain",
-                "operation": "query"
+                "operation": operation
             }
         }
+        return headers, body
+    
+    def _request_audio(self, text, voice_type=None, encoding="mp3",
+                       sample_rate=24000, speed=1.0, volume=1.0,
+                       output_file=None, cluster="volcano_tts"):
+        """
+        调用接口合成语音，返回 (音频文件路径, 时长秒数)
+        
+        时长取自响应的 addition.duration（毫秒），响应中没有时为 None
+        """
+        import requests
+        
+        headers, body = self._build_request(text, voice_type, encoding, sample_rate, speed, volume, cluster)
         
         # 调试输出
         debug_mode = os.environ.get('TTS_DEBUG', '0') == '1'
@@ -866,7 +475,7 @@ class VolcanoTTS:
         
         # 发送请求
         try:
-            response = requests.post(
+            response = self.session.post(
                 TTS_ENDPOINT,
                 headers=headers,
                 json=body,
@@ -905,7 +514,12 @@ class VolcanoTTS:
             output_path = Path(output_file)
             output_path.write_bytes(audio_data)
             
-            return str(output_path.absolute())
+            duration = None
+            addition = result.get("addition") or {}
+            if addition.get("duration"):
+                duration = int(addition["duration"]) / 1000.0
+            
+            return str(output_path.absolute()), duration
             
         except requests.exceptions.RequestException as e:
             raise Exception(f"网络请求失败: {e}")
@@ -915,6 +529,532 @@ class VolcanoTTS:
             if "TTS请求失败" in str(e):
                 raise
             raise Exception(f"TTS合成失败: {e}")
+    
+    def synthesize_stream(self, text, output_file=None, on_audio=None, voice_type=None, encoding="mp3",
+                          sample_rate=24000, speed=1.0, volume=1.0, cluster="volcano_tts", timeout=30):
+        """
+        流式合成语音：通过 WebSocket 接口逐片接收音频，到达即写入文件并调用回调
+        
+        首片音频通常在几百毫秒内到达，适合预览和交互场景；音频不经过 base64，也不在内存中整段缓存。
+        需要 aiohttp。
+        
+        Args:
+            text: 要合成的文本
+            output_file: 输出文件路径（可选，与 on_audio 至少提供一个）
+            on_audio: 每收到一片音频调用 on_audio(bytes)
+            timeout: 连接和相邻两片之间的最长等待时间（秒）
+            其余参数同 synthesize()
+        
+        Returns:
+            dict: {
+                "output_file": 音频文件绝对路径（未指定时为 None）,
+                "duration": 音频时长（秒，无法计算时为 None）,
+                "ttfb": 首片音频到达耗时（秒）,
+                "latency": 总耗时（秒）,
+                "rtf": 实时率 = 总耗时 / 音频时长,
+                "bytes": 音频字节数,
+                "cached": 是否命中缓存
+            }
+        """
+        try:
+            from tts_stream import stream_synthesis_sync
+        except ImportError:
+            from .tts_stream import stream_synthesis_sync
+        
+        if output_file is None and on_audio is None:
+            raise ValueError("需要指定 output_file 或 on_audio")
+        
+        started = time.monotonic()
+        voice = voice_type or self.voice_type
+        key = None
+        if self.cache is not None and output_file is not None:
+            key = cache_key(text, voice, encoding, sample_rate, speed, volume, cluster)
+            hit = self.cache.fetch(key, output_file)
+            if hit is not None:
+                data = Path(output_file).read_bytes()
+                if on_audio:
+                    on_audio(data)
+                latency = time.monotonic() - started
+                return {
+                    "output_file": str(Path(output_file).absolute()),
+                    "duration": hit["duration"],
+                    "ttfb": latency,
+                    "latency": latency,
+                    "rtf": latency / hit["duration"] if hit["duration"] else None,
+                    "bytes": len(data),
+                    "cached": True,
+                }
+        
+        headers, body = self._build_request(text, voice, encoding, sample_rate, speed, volume, cluster,
+                                            operation="submit")
+        ws_headers = {'Authorization': headers['Authorization']}
+        
+        out = None
+        if output_file is not None:
+            Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+            out = open(output_file, 'wb')
+        
+        def handle(chunk):
+            if out is not None:
+                out.write(chunk)
+                out.flush()    # 播放器可以边写边读
+            if on_audio:
+                on_audio(chunk)
+        
+        try:
+            stats = stream_synthesis_sync(TTS_WS_ENDPOINT, ws_headers, body, handle, timeout)
+        except Exception:
+            if out is not None:
+                out.close()
+                Path(output_file).unlink(missing_ok=True)
+            raise
+        
+        duration = None
+        if out is not None:
+            out.close()
+            duration = audio_duration(Path(output_file).read_bytes(), encoding, sample_rate)
+        elif encoding == "pcm":
+            duration = stats["bytes"] / (sample_rate * 2)
+        if key is not None:
+            self.cache.put(key, output_file, duration=duration, text=text)
+        
+        return {
+            "output_file": str(Path(output_file).absolute()) if output_file else None,
+            "duration": duration,
+            "ttfb": stats["ttfb"],
+            "latency": stats["latency"],
+            "rtf": stats["latency"] / duration if duration else None,
+            "bytes": stats["bytes"],
+            "cached": False,
+        }
+    
+    def synthesize_long(self, text, output_file, max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES,
+                        max_workers=DEFAULT_BATCH_WORKERS, qps=DEFAULT_BATCH_QPS, retries=2,
+                        on_chunk=None, timestamps_file=None, limiter=None, executor=None, **params):
+        """
+        合成长文本
+        
+        按句子切分为不超过接口长度限制的分段，并发合成，按原文顺序边合成边拼接写入 output_file：
+        第一段完成即可开始写入，后续分段已完成时依次追加。MP3 按帧拼接，WAV 修正文件头。
+        
+        Args:
+            text: 要合成的文本（任意长度）
+            output_file: 输出文件路径
+            max_chunk_bytes: 每段最大字节数（UTF-8）
+            max_workers: 最大并发请求数
+            qps: 每秒最多发起的请求数
+            retries: 单段失败后的重试次数
+            on_chunk: 每段写入后的回调 (分段信息字典)
+            timestamps_file: 保存分段时间戳的 JSON 文件路径（可选）
+            limiter: 共享的 RateLimiter（可选），传入时忽略 qps
+            executor: 共享的线程池（可选），传入时忽略 max_workers，且不会被关闭
+            **params: synthesize() 的其它参数（voice_type、encoding、sample_rate、speed 等）
+            
+        Returns:
+            dict: {"output_file", "duration", "chunks": [{"index", "text", "start", "end", "cached"}]}
+            
+        Raises:
+            Exception: 任一分段重试后仍失败（已写入的部分文件会被删除）
+        """
+        from concurrent.futures import ThreadPoolExecutor, wait
+        
+        encoding = params.get("encoding", "mp3")
+        sample_rate = params.get("sample_rate", 24000)
+        chunks = chunk_text(text, max_chunk_bytes)
+        if not chunks:
+            raise ValueError("文本为空")
+        
+        output_path = Path(output_file)
+        part_dir = output_path.parent / f".{output_path.name}.chunks"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        limiter = limiter or RateLimiter(qps)
+        
+        def run(index, chunk):
+            part = part_dir / f"{index:04d}.{encoding}"
+            for attempt in range(retries + 1):
+                limiter.wait()
+                try:
+                    return self._synthesize(chunk, output_file=str(part), **params)
+                except Exception:
+                    if attempt == retries:
+                        raise
+                    time.sleep(0.5 * 2 ** attempt)
+        
+        timeline = []
+        futures = []
+        pool = executor or ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))))
+        try:
+            futures = [pool.submit(run, i, chunk) for i, chunk in enumerate(chunks)]
+            with AudioConcatenator(output_path, encoding, sample_rate) as out:
+                # 按顺序等待，前面的分段完成即写入，后面的分段继续在后台合成
+                for index, future in enumerate(futures):
+                    part, _, cached = future.result()
+                    start, end = out.append(Path(part).read_bytes())
+                    Path(part).unlink(missing_ok=True)
+                    entry = {"index": index, "text": chunks[index], "start": round(start, 3),
+                             "end": round(end, 3), "cached": cached}
+                    timeline.append(entry)
+                    if on_chunk:
+                        on_chunk(entry)
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            output_path.unlink(missing_ok=True)
+            raise
+        finally:
+            if executor is None:
+                pool.shutdown(wait=True)
+            else:
+                # 共享线程池不关闭，等待本次提交的分段结束后再清理临时文件
+                wait(futures)
+            for leftover in part_dir.glob("*"):
+                leftover.unlink(missing_ok=True)
+            part_dir.rmdir()
+        
+        result = {
+            "output_file": str(output_path.absolute()),
+            "duration": round(timeline[-1]["end"], 3),
+            "chunks": timeline,
+        }
+        if timestamps_file:
+            Path(timestamps_file).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        return result
+    
+    def synthesize_batch(self, items, max_workers=DEFAULT_BATCH_WORKERS, qps=DEFAULT_BATCH_QPS,
+                         retries=2, on_result=None, **defaults):
+        """
+        批量并发合成语音
+        
+        所有请求共享连接池，最多 max_workers 个同时进行，发起速率不超过 qps；
+        单个条目失败不影响其它条目，失败信息记录在对应结果中。
+        
+        Args:
+            items: 条目列表，每项为 {"text": ..., "output_file": ..., 可选 synthesize() 的其它参数}
+                或纯文本字符串（输出文件自动命名）
+            max_workers: 最大并发请求数
+            qps: 每秒最多发起的请求数，None 表示不限制
+            retries: 单个条目失败后的重试次数（指数退避）
+            on_result: 每个条目完成时的回调 (结果字典)，在工作线程中调用
+            **defaults: 所有条目共用的 synthesize() 参数（voice_type、encoding、speed 等）
+            
+        Returns:
+            list: 与 items 顺序一致的结果字典列表，每项包含:
+                - index: 条目序号
+                - text: 合成文本
+                - output_file: 音频文件路径（失败时为 None）
+                - duration: 音频时长（秒，接口未返回时为 None）
+                - latency: 请求耗时（秒，含重试）
+                - attempts: 请求次数
+                - cached: 是否命中缓存（未调用接口）
+                - error: 错误信息（成功时为 None）
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        limiter = RateLimiter(qps)
+        batch_id = int(time.time())
+        
+        def run(index, item):
+            if isinstance(item, str):
+                item = {"text": item}
+            params = {**defaults, **item}
+            text = params.pop("text")
+            if not params.get("output_file"):
+                params["output_file"] = f"tts_batch_{batch_id}_{index:03d}.{params.get('encoding', 'mp3')}"
+            
+            result = {"index": index, "text": text, "output_file": None, "duration": None,
+                      "latency": None, "attempts": 0, "cached": False, "error": None}
+            started = time.monotonic()
+            for attempt in range(retries + 1):
+                limiter.wait()
+                result["attempts"] += 1
+                try:
+                    result["output_file"], result["duration"], result["cached"] = self._synthesize(text, **params)
+                    result["error"] = None
+                    break
+                except Exception as e:
+                    result["error"] = str(e)
+                    if attempt < retries:
+                        time.sleep(0.5 * 2 ** attempt)
+            result["latency"] = round(time.monotonic() - started, 3)
+            if on_result:
+                on_result(result)
+            return result
+        
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as pool:
+            futures = [pool.submit(run, i, item) for i, item in enumerate(items)]
+            return [f.result() for f in futures]
+
+
+def load_batch_items(path):
+    """读取批量合成条目（JSON 数组或每行一个 JSON 的 JSONL）"""
+    content = Path(path).read_text(encoding='utf-8').strip()
+    if content.startswith('['):
+        return json.loads(content)
+    return [json.loads(line) for line in content.splitlines() if line.strip()]
+
+
+def run_batch(args, cache=None):
+    """执行 --batch 批量合成，返回退出码"""
+    items = load_batch_items(args.batch)
+    print(f"[INFO] 批量合成 {len(items)} 条，并发 {args.workers}，QPS 上限 {args.qps}")
+    
+    def report(result):
+        if result["error"]:
+            print(f"[ERROR] #{result['index']}: {result['error']}")
+        else:
+            duration = f"{result['duration']:.2f}s" if result["duration"] is not None else "-"
+            source = "缓存" if result["cached"] else f"耗时 {result['latency']:.2f}s"
+            print(f"[OK] #{result['index']}: {result['output_file']} (时长 {duration}, {source})")
+    
+    try:
+        tts = VolcanoTTS(
+            app_id=args.appid,
+            access_token=args.token,
+            secret_key=args.secret,
+            voice_type=args.voice,
+            pool_size=args.workers,
+            cache=cache
+        )
+    except ValueError as e:
+        print(f"[ERROR] 错误: {e}")
+        return 1
+    
+    started = time.monotonic()
+    with tts:
+        results = tts.synthesize_batch(
+            items,
+            max_workers=args.workers,
+            qps=args.qps,
+            on_result=report,
+            voice_type=args.voice,
+            encoding=args.encoding,
+            sample_rate=args.rate,
+            speed=args.speed,
+            volume=args.volume,
+            cluster=args.cluster
+        )
+    
+    failed = sum(1 for r in results if r["error"])
+    cached = sum(1 for r in results if r["cached"])
+    print(f"[INFO] 完成 {len(results) - failed}/{len(results)} 条（缓存命中 {cached} 条），"
+          f"总耗时 {time.monotonic() - started:.1f}s")
+    return 1 if failed else 0
+
+
+# 服务模式请求中可覆盖的合成参数
+SERVE_PARAMS = ("voice_type", "encoding", "sample_rate", "speed", "volume", "cluster")
+
+
+class TTSServer:
+    """
+    常驻合成服务（--serve）
+    
+    进程只启动一次，音色目录、连接池和缓存索引保持加载，之后每条请求只需一次接口调用。
+    请求和响应均为每行一个 JSON：
+    
+        请求: {"id", "text", "output_file", "voice", "voice_type", "encoding", "sample_rate",
+               "speed", "volume", "cluster"}，除 text 外均可省略；voice 可以是音色名称（如 Shiny）
+        响应: {"id", "output_file", "duration", "cached", "latency", "error"}，长文本另有 "chunks"
+    
+    请求中 "stream": true 时走流式接口，响应另有 "ttfb"（首片音频耗时）和 "rtf"（实时率）。
+    
+    多条请求在线程池中并发处理，按完成先后写回（用 id 对应）。长文本的分段在另一个共享线程池中合成，
+    所有请求（包括分段）共用同一个速率限制器。
+    """
+    
+    def __init__(self, tts, max_workers=DEFAULT_BATCH_WORKERS, qps=DEFAULT_BATCH_QPS,
+                 max_chunk_bytes=DEFAULT_MAX_CHUNK_BYTES, **defaults):
+        """
+        Args:
+            tts: VolcanoTTS 实例
+            max_workers: 最大并发请求数（长文本分段另有同样大小的共享线程池）
+            qps: 每秒请求数上限（所有连接和长文本分段共享）
+            max_chunk_bytes: 超过该长度的文本按长文本分段合成
+            **defaults: 默认合成参数 (voice_type, encoding, sample_rate, speed, volume, cluster)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.tts = tts
+        self.qps = qps
+        self.max_chunk_bytes = max_chunk_bytes
+        self.defaults = defaults
+        self.limiter = RateLimiter(qps)
+        self.pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        # 长文本分段单独用一个池：请求线程等待分段结果，共用同一个池会互相阻塞
+        self.chunk_pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+    
+    def _next_seq(self):
+        with self._seq_lock:
+            self._seq += 1
+            return self._seq
+    
+    def handle(self, request):
+        """
+        处理一条请求
+        
+        Returns:
+            dict: 响应（失败时 error 为错误信息）
+        """
+        started = time.monotonic()
+        response = {"id": request.get("id"), "output_file": None, "duration": None,
+                    "cached": False, "latency": None, "error": None}
+        try:
+            text = request.get("text")
+            if not text:
+                raise ValueError("缺少 text")
+            params = {**self.defaults, **{k: request[k] for k in SERVE_PARAMS if k in request}}
+            if request.get("voice"):
+                voice_type, _ = find_voice_by_name(request["voice"])
+                if voice_type is None:
+                    raise ValueError(f"未找到音色: {request['voice']}")
+                params["voice_type"] = voice_type
+            output_file = (request.get("output_file")
+                           or f"tts_serve_{os.getpid()}_{self._next_seq():06d}.{params.get('encoding', 'mp3')}")
+            
+            if len(text.encode('utf-8')) > self.max_chunk_bytes:
+                result = self.tts.synthesize_long(text, output_file, max_chunk_bytes=self.max_chunk_bytes,
+                                                  limiter=self.limiter, executor=self.chunk_pool, **params)
+                response.update(output_file=str(Path(result["output_file"]).absolute()),
+                                duration=result["duration"],
+                                cached=all(c["cached"] for c in result["chunks"]),
+                                chunks=result["chunks"])
+            elif request.get("stream"):
+                self.limiter.wait()
+                result = self.tts.synthesize_stream(text, output_file=output_file, **params)
+                response.update(output_file=result["output_file"], duration=result["duration"],
+                                cached=result["cached"], ttfb=round(result["ttfb"], 3),
+                                rtf=round(result["rtf"], 3) if result["rtf"] else None)
+            else:
+                self.limiter.wait()
+                path, duration, cached = self.tts._synthesize(text, output_file=output_file, **params)
+                response.update(output_file=path, duration=duration, cached=cached)
+        except Exception as e:
+            response["error"] = str(e)
+        response["latency"] = round(time.monotonic() - started, 3)
+        return response
+    
+    def serve_lines(self, lines, emit):
+        """
+        读取请求行并并发处理，直到输入结束且所有请求完成
+        
+        Args:
+            lines: 请求行的可迭代对象（str）
+            emit: 写出一行响应文本的函数
+        """
+        lock = threading.Lock()
+        
+        def reply(response):
+            line = json.dumps(response, ensure_ascii=False) + "\n"
+            with lock:
+                emit(line)
+        
+        pending = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("请求必须是 JSON 对象")
+            except ValueError as e:
+                reply({"id": None, "error": f"请求解析失败: {e}"})
+                continue
+            pending.append(self.pool.submit(lambda r=request: reply(self.handle(r))))
+        for future in pending:
+            future.result()
+    
+    def serve_stdio(self):
+        """从 stdin 读取请求，向 stdout 写响应"""
+        def emit(line):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+        
+        self.serve_lines(sys.stdin, emit)
+    
+    def make_server(self, address):
+        """
+        创建本地 socket 服务
+        
+        Args:
+            address: host:port（TCP）或 unix:/path（Unix socket）
+        """
+        import socketserver
+        import stat
+        
+        server_self = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                lines = (line.decode('utf-8') for line in self.rfile)
+                server_self.serve_lines(lines, lambda line: self.wfile.write(line.encode('utf-8')))
+        
+        if address.startswith('unix:'):
+            path = address[len('unix:'):]
+            if os.path.exists(path) and stat.S_ISSOCK(os.stat(path).st_mode):
+                os.unlink(path)    # 上次运行遗留的 socket 文件
+            server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        else:
+            host, _, port = address.rpartition(':')
+            server = socketserver.ThreadingTCPServer((host or '127.0.0.1', int(port)), Handler)
+        server.daemon_threads = True
+        return server
+    
+    def close(self):
+        self.pool.shutdown(wait=True)
+        self.chunk_pool.shutdown(wait=True)
+        self.tts.close()
+
+
+def run_server(args, cache=None):
+    """执行 --serve 常驻服务模式，返回退出码"""
+    try:
+        tts = VolcanoTTS(
+            app_id=args.appid,
+            access_token=args.token,
+            secret_key=args.secret,
+            voice_type=args.voice,
+            pool_size=args.workers,
+            cache=cache
+        )
+    except ValueError as e:
+        print(f"[ERROR] 错误: {e}", file=sys.stderr)
+        return 1
+    
+    get_catalog()  # 预先建立音色索引，请求中的音色名称查找无需再读取目录
+    service = TTSServer(
+        tts,
+        max_workers=args.workers,
+        qps=args.qps,
+        max_chunk_bytes=args.max_chunk_bytes,
+        voice_type=args.voice,
+        encoding=args.encoding,
+        sample_rate=args.rate,
+        speed=args.speed,
+        volume=args.volume,
+        cluster=args.cluster
+    )
+    server = None
+    try:
+        if args.serve == '-':
+            print(f"[INFO] 服务已就绪，从 stdin 读取请求（并发 {args.workers}，QPS 上限 {args.qps}）", file=sys.stderr)
+            service.serve_stdio()
+        else:
+            server = service.make_server(args.serve)
+            print(f"[INFO] 服务已就绪: {args.serve}（并发 {args.workers}，QPS 上限 {args.qps}）", file=sys.stderr)
+            server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.server_close()
+        service.close()
+    return 0
 
 
 def main():
@@ -937,32 +1077,61 @@ def main():
     parser.add_argument('--secret', help='密钥')
     parser.add_argument('--debug', action='store_true', help='开启调试模式')
     parser.add_argument('--category', help='按分类筛选音色 (通用场景-多情感/通用场景-普通/角色扮演/视频配音/有声阅读/多语种)')
+    parser.add_argument('--batch', help='批量合成：JSON 数组或 JSONL 文件，每项为文本或 {"text", "output_file", ...}')
+    parser.add_argument('--workers', type=int, default=DEFAULT_BATCH_WORKERS, help=f'批量合成并发数 (默认: {DEFAULT_BATCH_WORKERS})')
+    parser.add_argument('--qps', type=float, default=DEFAULT_BATCH_QPS, help=f'批量合成每秒请求数上限 (默认: {DEFAULT_BATCH_QPS})')
+    parser.add_argument('--cache', nargs='?', const='', default=None, metavar='DIR',
+                        help='启用音频缓存（相同文本和参数不再调用接口），可指定目录 (默认: 技能目录下 .cache/tts)')
+    parser.add_argument('--cache-max-mb', type=int, default=500, help='缓存容量上限 (MB，默认: 500)')
+    parser.add_argument('--max-chunk-bytes', type=int, default=DEFAULT_MAX_CHUNK_BYTES,
+                        help=f'长文本每段最大字节数，超过时按句子分段并发合成后拼接 (默认: {DEFAULT_MAX_CHUNK_BYTES})')
+    parser.add_argument('--timestamps', help='长文本分段合成时保存各段时间戳的 JSON 文件')
+    parser.add_argument('--stream', action='store_true',
+                        help='使用流式接口 (WebSocket)：音频分片到达即写入文件，并输出首包耗时和实时率；需要 aiohttp')
+    parser.add_argument('--serve', nargs='?', const='-', metavar='ADDR',
+                        help='常驻服务模式：每行一个 JSON 请求，处理后写回一行 JSON 响应。'
+                             '默认读 stdin；也可指定 host:port 或 unix:/path 监听本地 socket')
     
     args = parser.parse_args()
     
     # 列出音色
     if args.list_voices:
         print("\n=== 可用音色列表 ===\n")
+        catalog = get_catalog()
         if args.category:
-            if args.category in VOICE_CATEGORIES:
+            if args.category in catalog.categories:
                 print(f"【{args.category}】")
-                for voice_id in VOICE_CATEGORIES[args.category]:
-                    print(f"  {voice_id}: {VOICE_TYPES[voice_id]}")
+                for voice_id in catalog.categories[args.category]:
+                    print(f"  {voice_id}: {catalog.voices[voice_id]}")
             else:
                 print(f"错误: 未知的分类 '{args.category}'")
-                print(f"可用分类: {', '.join(VOICE_CATEGORIES.keys())}")
+                print(f"可用分类: {', '.join(catalog.categories.keys())}")
         else:
-            for category, voices in VOICE_CATEGORIES.items():
+            for category, voices in catalog.categories.items():
                 print(f"【{category}】")
                 for voice_id in voices[:5]:  # 每类只显示前5个
-                    print(f"  {voice_id}: {VOICE_TYPES[voice_id]}")
+                    print(f"  {voice_id}: {catalog.voices[voice_id]}")
                 if len(voices) > 5:
                     print(f"  ... 还有 {len(voices) - 5} 个音色")
                 print()
-            print(f"\n总计: {len(VOICE_TYPES)} 个音色")
+            print(f"\n总计: {len(catalog.voices)} 个音色")
             print(f"\n使用 --category <分类名> 查看特定分类的所有音色")
         return
     
+    # 开启调试模式
+    if args.debug:
+        os.environ['TTS_DEBUG'] = '1'
+    
+    cache = None
+    if args.cache is not None:
+        cache = TTSCache(args.cache or None, max_bytes=args.cache_max_mb * 1024 * 1024)
+    
+    if args.batch:
+        sys.exit(run_batch(args, cache))
+    
+    if args.serve:
+        sys.exit(run_server(args, cache))
+    
     # 获取文本
     if args.file:
         text = Path(args.file).read_text(encoding='utf-8')
@@ -972,21 +1141,68 @@ def main():
         print("错误: 请提供文本或使用 -f 指定文件")
         sys.exit(1)
     
-    # 开启调试模式
-    if args.debug:
-        os.environ['TTS_DEBUG'] = '1'
-    
     # 初始化TTS
     try:
         tts = VolcanoTTS(
             app_id=args.appid,
             access_token=args.token,
             secret_key=args.secret,
-            voice_type=args.voice
+            voice_type=args.voice,
+            pool_size=args.workers,
+            cache=cache
         )
         
         print(f"[INFO] 正在合成: {text[:50]}...")
         
+        if len(text.encode('utf-8')) > args.max_chunk_bytes or args.timestamps:
+            if args.output is None:
+                args.output = f"tts_output_{int(time.time())}.{args.encoding}"
+            
+            def report(chunk):
+                print(f"[CHUNK] #{chunk['index']} {chunk['start']:.2f}-{chunk['end']:.2f}s: {chunk['text'][:30]}")
+            
+            result = tts.synthesize_long(
+                text,
+                args.output,
+                max_chunk_bytes=args.max_chunk_bytes,
+                max_workers=args.workers,
+                qps=args.qps,
+                on_chunk=report,
+                timestamps_file=args.timestamps,
+                voice_type=args.voice,
+                encoding=args.encoding,
+                sample_rate=args.rate,
+                speed=args.speed,
+                volume=args.volume,
+                cluster=args.cluster
+            )
+            tts.close()
+            print(f"[OK] 合成成功: {result['output_file']} ({len(result['chunks'])} 段, {result['duration']:.1f}s)")
+            print(f"[VOICE] 使用音色: {get_catalog().voices.get(args.voice, args.voice)}")
+            return
+        
+        if args.stream:
+            if args.output is None:
+                args.output = f"tts_output_{int(time.time())}.{args.encoding}"
+            result = tts.synthesize_stream(
+                text,
+                output_file=args.output,
+                voice_type=args.voice,
+                encoding=args.encoding,
+                sample_rate=args.rate,
+                speed=args.speed,
+                volume=args.volume,
+                cluster=args.cluster
+            )
+            tts.close()
+            duration = f"{result['duration']:.2f}s" if result['duration'] is not None else "-"
+            rtf = f"{result['rtf']:.2f}" if result['rtf'] is not None else "-"
+            print(f"[OK] 合成成功: {result['output_file']}")
+            print(f"[STREAM] 首包 {result['ttfb']:.3f}s, 总耗时 {result['latency']:.3f}s, "
+                  f"时长 {duration}, RTF {rtf}{' (缓存)' if result['cached'] else ''}")
+            print(f"[VOICE] 使用音色: {get_catalog().voices.get(args.voice, args.voice)}")
+            return
+        
         output_path = tts.synthesize(
             text=text,
             voice_type=args.voice,
@@ -998,8 +1214,10 @@ def main():
             output_file=args.output
         )
         
+        tts.close()
+        
         print(f"[OK] 合成成功: {output_path}")
-        print(f"[VOICE] 使用音色: {VOICE_TYPES.get(args.voice, args.voice)}")
+        print(f"[VOICE] 使用音色: {get_catalog().voices.get(args.voice, args.voice)}")
         
     except Exception as e:
         print(f"[ERROR] 错误: {e}")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+TTS 音频缓存
+按 (规范化文本, 音色, 格式, 采样率, 语速, 音量, 集群) 的哈希保存合成结果和时长，
+重复合成相同内容时直接复制缓存文件，不再调用接口；超过容量上限时按最近使用时间淘汰
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+# 默认缓存目录（技能目录下的 .cache/tts），可用环境变量 VOLCANO_TTS_CACHE_DIR 覆盖
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "tts"
+
+# 默认容量上限
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+INDEX_FILE = "index.json"
+
+
+def normalize_text(text):
+    """规范化文本：Unicode NFC、去掉首尾空白、连续空白合并为一个空格"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(text, voice_type, encoding="mp3", sample_rate=24000, speed=1.0, volume=1.0,
+              cluster="volcano_tts"):
+    """
+    计算缓存键
+
+    Returns:
+        str: 参数组合的 SHA-256 十六进制摘要
+    """
+    payload = json.dumps(
+        [normalize_text(text), voice_type, encoding, int(sample_rate), float(speed), float(volume), cluster],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    内容寻址的 TTS 音频缓存
+
+    音频保存在 <目录>/<键前两位>/<键>.<格式>，索引文件 index.json 记录每条的大小、时长和最近使用时间。
+    线程安全，可在批量合成的多个线程间共享。
+
+    Example:
+        >>> cache = TTSCache()
+        >>> key = cache_key("你好", "zh_female_cancan_mars_bigtts")
+        >>> hit = cache.fetch(key, "out.mp3")      # 命中时返回 {"duration": ...}，否则 None
+        >>> cache.put(key, "out.mp3", duration=1.2)
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: 缓存目录，默认为 VOLCANO_TTS_CACHE_DIR 或 DEFAULT_CACHE_DIR
+            max_bytes: 容量上限（字节），超过时淘汰最久未使用的条目
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get("VOLCANO_TTS_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.index_path = self.cache_dir / INDEX_FILE
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.entries = self._load_index()
+
+    def _load_index(self):
+        """读取索引，丢弃音频文件已不存在的条目"""
+        try:
+            entries = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        return {key: e for key, e in entries.items() if (self.cache_dir / e["file"]).exists()}
+
+    def _path(self, key, encoding):
+        return self.cache_dir / key[:2] / f"{key}.{encoding}"
+
+    @property
+    def total_bytes(self):
+        return sum(e["size"] for e in self.entries.values())
+
+    def get(self, key):
+        """
+        查询缓存
+
+        Returns:
+            dict or None: 命中时返回 {"path", "duration", "size"}，否则 None
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            path = self.cache_dir / entry["file"] if entry else None
+            if entry is None or not path.exists():
+                if entry is not None:
+                    del self.entries[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self._dirty = True
+            self.hits += 1
+            return {"path": str(path), "duration": entry.get("duration"), "size": entry["size"]}
+
+    def fetch(self, key, output_file):
+        """
+        命中时将缓存音频复制到 output_file
+
+        Returns:
+            dict or None: 命中时返回 get() 的结果，否则 None
+        """
+        hit = self.get(key)
+        if hit is None:
+            return None
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(hit["path"], output_file)
+        return hit
+
+    def put(self, key, audio_file, duration=None, text=None):
+        """
+        将合成结果加入缓存（复制音频文件），随后按容量上限淘汰并写入索引
+
+        Args:
+            key: cache_key() 计算的键
+            audio_file: 音频文件路径（扩展名作为格式）
+            duration: 音频时长（秒）
+            text: 原文（只保存前 40 个字符便于排查）
+        """
+        source = Path(audio_file)
+        encoding = source.suffix.lstrip(".") or "mp3"
+        target = self._path(key, encoding)
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # 先复制到临时文件再改名，避免并发读取到不完整的文件
+        tmp = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {
+                "file": str(target.relative_to(self.cache_dir)),
+                "size": target.stat().st_size,
+                "duration": duration,
+                "created": now,
+                "last_used": now,
+                "text": normalize_text(text)[:40] if text else None,
+            }
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        """按最近使用时间淘汰，直到总大小不超过上限（调用方持有锁）"""
+        total = self.total_bytes
+        if total <= self.max_bytes:
+            return
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            del self.entries[key]
+
+    def _save(self):
+        """原子写入索引（调用方持有锁）"""
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+        self._dirty = False
+
+    def flush(self):
+        """将最近使用时间等未保存的变化写入索引"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def clear(self):
+        """删除所有缓存"""
+        with self._lock:
+            for entry in self.entries.values():
+                (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            self.entries = {}
+            self._save()
+
+    def stats(self):
+        """缓存统计"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
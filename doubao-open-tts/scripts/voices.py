@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+音色目录
+音色数据保存在 voices.json 中，首次使用时才读取并建立索引
+（名称 -> 音色ID、音色ID -> 分类、按名称前缀查找），导入本模块本身几乎没有开销
+"""
+
+import json
+import bisect
+from functools import lru_cache
+from pathlib import Path
+
+CATALOG_FILE = Path(__file__).resolve().parent / "voices.json"
+
+
+class VoiceCatalog:
+    """
+    音色目录及其索引
+
+    Attributes:
+        voices: 音色ID -> 显示名称
+        categories: 分类 -> 音色ID 列表
+        recommended: 分类 -> [(音色ID, 显示名称)]
+        category_display_names: 分类 -> 英文显示名称
+    """
+
+    def __init__(self, data):
+        self.voices = data["voices"]
+        self.categories = data["categories"]
+        self.recommended = {k: [tuple(v) for v in vs] for k, vs in data["recommended"].items()}
+        self.category_display_names = data["category_display_names"]
+
+        # 音色ID -> 所属的第一个分类
+        self.category_of = {}
+        for category, ids in self.categories.items():
+            for voice_id in ids:
+                self.category_of.setdefault(voice_id, category)
+
+        # 小写名称/别名 -> 音色ID（同名时保留目录中靠前的音色）
+        self.by_name = {}
+        for voice_id, display_name in self.voices.items():
+            names = [display_name] + [alias.strip() for alias in display_name.split("/")]
+            for name in names:
+                self.by_name.setdefault(name.lower(), voice_id)
+
+        # 排序后的名称列表，用于前缀查找
+        self._sorted_names = sorted(self.by_name)
+
+    def search_prefix(self, prefix):
+        """
+        按名称前缀查找
+
+        Returns:
+            list: 名称以 prefix 开头（不区分大小写）的音色ID，按名称排序、去重
+        """
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._sorted_names, prefix)
+        found = []
+        for name in self._sorted_names[start:]:
+            if not name.startswith(prefix):
+                break
+            voice_id = self.by_name[name]
+            if voice_id not in found:
+                found.append(voice_id)
+        return found
+
+    def find(self, name):
+        """
+        根据音色名称或ID查找音色
+
+        依次尝试：音色ID、完整名称或别名（如 Shiny）、名称前缀、名称中包含
+
+        Returns:
+            tuple: (voice_type, 显示名称)，未找到时为 (None, None)
+        """
+        name = name.strip().lower()
+        if not name:
+            return None, None
+        if name in self.voices:
+            return name, self.voices[name]
+
+        voice_id = self.by_name.get(name)
+        if voice_id is None:
+            matches = self.search_prefix(name)
+            voice_id = matches[0] if matches else None
+        if voice_id is None:
+            voice_id = next((v for v, display in self.voices.items() if name in display.lower()), None)
+        return (voice_id, self.voices[voice_id]) if voice_id else (None, None)
+
+
+@lru_cache(maxsize=1)
+def get_catalog():
+    """读取音色目录（进程内只读取一次）"""
+    with open(CATALOG_FILE, encoding="utf-8") as f:
+        return VoiceCatalog(json.load(f))
@@ -0,0 +1,232 @@
+"""
+爬取结果缓存模块
+基于 SQLite 持久化 GoogleImageCrawler.search 的结果，支持 TTL 过期、
+按容量的 LRU 淘汰以及命中/未命中统计
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Dict, Any
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "google-images-crawler" / "crawl_cache.sqlite3"
+
+
+class CrawlCache:
+    """
+    爬取结果缓存
+
+    键为 (规范化关键词, safe_search, min_width, min_height)，值为图片信息字典列表。
+    缓存中的结果数量不少于请求数量时直接返回，否则视为未命中。
+
+    Example:
+        >>> cache = CrawlCache(ttl=3600)
+        >>> async with GoogleImageCrawler(cache=cache) as crawler:
+        ...     results = await crawler.search("cat", num_images=10)  # 第二次调用毫秒级返回
+    """
+
+    DEFAULT_TTL = 24 * 3600            # 1 天
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        初始化缓存
+
+        Args:
+            path: SQLite 文件路径，默认 ~/.cache/google-images-crawler/crawl_cache.sqlite3
+            ttl: 结果有效期（秒），<= 0 表示永不过期
+            max_bytes: 缓存数据总大小上限（字节），超出时按最近访问时间淘汰
+        """
+        self.path = Path(path) if path else DEFAULT_CACHE_PATH
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+        # 本实例的命中统计
+        self.hits = 0
+        self.misses = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                key TEXT PRIMARY KEY,
+                keyword TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_cache_accessed ON crawl_cache(accessed_at)")
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    @staticmethod
+    def make_key(
+        keyword: str,
+        safe_search: bool = True,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None
+    ) -> str:
+        """生成缓存键（关键词忽略大小写和多余空白）"""
+        normalized = " ".join(keyword.split()).lower()
+        return json.dumps([normalized, bool(safe_search), min_width, min_height], ensure_ascii=False)
+
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        return self.ttl > 0 and now - created_at > self.ttl
+
+    def get(
+        self,
+        keyword: str,
+        num_images: int,
+        safe_search: bool = True,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        查询缓存
+
+        Args:
+            keyword: 搜索关键词
+            num_images: 需要的图片数量
+            safe_search/min_width/min_height: 搜索过滤条件（缓存键的一部分）
+
+        Returns:
+            Optional[List[Dict]]: 命中时返回前 num_images 条结果，否则返回 None
+        """
+        key = self.make_key(keyword, safe_search, min_width, min_height)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, count, created_at FROM crawl_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or row[1] < num_images or self._is_expired(row[2], now):
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE crawl_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return json.loads(row[0])[:num_images]
+
+    def put(
+        self,
+        keyword: str,
+        results: List[Dict[str, Any]],
+        safe_search: bool = True,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None
+    ) -> None:
+        """
+        写入缓存（同一键已有更多且未过期的结果时保留原结果）
+
+        Args:
+            keyword: 搜索关键词
+            results: 图片信息字典列表
+            safe_search/min_width/min_height: 搜索过滤条件
+        """
+        if not results:
+            return
+
+        key = self.make_key(keyword, safe_search, min_width, min_height)
+        payload = json.dumps(results, ensure_ascii=False)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count, created_at FROM crawl_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and row[0] > len(results) and not self._is_expired(row[1], now):
+                return
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache "
+                "(key, keyword, payload, count, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, keyword, payload, len(results), len(payload.encode('utf-8')), now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """删除过期条目，并按最近访问时间淘汰直到总大小不超过上限（需持有锁）"""
+        if self.ttl > 0:
+            self._conn.execute("DELETE FROM crawl_cache WHERE created_at < ?", (now - self.ttl,))
+
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM crawl_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM crawl_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM crawl_cache WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+
+        logger.debug(f"缓存淘汰 {evicted} 条，当前大小 {total} bytes")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            Dict: hits, misses, hit_rate, entries, bytes
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM crawl_cache"
+            ).fetchone()
+
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'entries': entries,
+            'bytes': total,
+        }
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute("DELETE FROM crawl_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
@@ -12,12 +12,17 @@ logger = logging.getLogger(__name__)
 import asyncio
 import re
 import time
-from typing import List, Optional, Set, Dict, Any
-from dataclasses import dataclass
+from typing import List, Optional, Set, Dict, Any, Union, AsyncIterator
+from dataclasses import dataclass, asdict
 from urllib.parse import urlparse, parse_qs, unquote, quote
 from pathlib import Path
 
 from playwright.async_api import async_playwright, Page, Browser, BrowserContext
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Route, Request
+
+from .cache import CrawlCache
+from .interceptor import ResponseHarvester
+from .profiles import CrawlProfile, get_profile
 
 
 @dataclass
@@ -53,13 +58,63 @@ class GoogleImageCrawler:
     DEFAULT_SCROLL_PAUSE = 1.5
     DEFAULT_MAX_RETRIES = 3
     
+    # 结果收集引擎
+    ENGINE_DOM = "dom"          # 渲染后读取 /imgres 锚点
+    ENGINE_NETWORK = "network"  # 拦截搜索结果响应，解析其中的图片元数据
+    ENGINES = (ENGINE_DOM, ENGINE_NETWORK)
+    
+    # network 引擎下直接中止的资源类型（结果来自响应数据，无需渲染缩略图）
+    NETWORK_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+    
+    # 结果锚点选择器
+    RESULT_ANCHOR_SELECTOR = 'a[href*="/imgres"]'
+    
+    # 在浏览器内一次性收集结果锚点（href、缩略图、标题）。
+    # onlyNew 为 true 时跳过已标记 data-gic-seen 的锚点，并标记本次收集的锚点
+    # （仅标记 href 中已包含 imgurl 的锚点，尚未填充的锚点下次仍会被收集）
+    _EXTRACT_ANCHORS_JS = """
+    ([selector, onlyNew]) => {
+        const query = onlyNew ? selector + ':not([data-gic-seen])' : selector;
+        return Array.from(document.querySelectorAll(query), (a) => {
+            if (onlyNew && a.href.includes('imgurl=')) {
+                a.setAttribute('data-gic-seen', '1');
+            }
+            const img = a.querySelector('img');
+            const titled = a.closest('div[data-ved]') ? a.querySelector('img[alt]') : null;
+            return {
+                href: a.href,
+                thumbnail: img ? (img.getAttribute('src') || '') : '',
+                title: titled ? (titled.getAttribute('alt') || '') : '',
+            };
+        });
+    }
+    """
+    
+    # 记录当前结果锚点数量并滚动到底部
+    _SCROLL_JS = """
+    (selector) => {
+        const count = document.querySelectorAll(selector).length;
+        window.scrollTo(0, document.body.scrollHeight);
+        return count;
+    }
+    """
+    
+    # 等待结果锚点数量超过给定值
+    _TILES_GREW_JS = """
+    ([selector, count]) => document.querySelectorAll(selector).length > count
+    """
+    
     def __init__(
         self,
         headless: bool = True,
         timeout: int = DEFAULT_TIMEOUT,
         scroll_pause: float = DEFAULT_SCROLL_PAUSE,
         max_retries: int = DEFAULT_MAX_RETRIES,
-        proxy: Optional[str] = None
+        proxy: Optional[str] = None,
+        browser: Optional[Browser] = None,
+        engine: str = ENGINE_DOM,
+        profile: Union[str, CrawlProfile] = "full",
+        cache: Optional[CrawlCache] = None
     ):
         """
         初始化爬虫
@@ -67,56 +122,134 @@ class GoogleImageCrawler:
         Args:
             headless: 是否无头模式运行浏览器
             timeout: 页面加载超时时间（秒）
-            scroll_pause: 每次滚动后的暂停时间（秒）
+            scroll_pause: 每次滚动后等待新结果出现的最长时间（秒）
             max_retries: 最大重试次数
             proxy: 代理服务器地址 (e.g., "http://proxy:8080")
+            browser: 共享的浏览器实例（可选）。传入时只创建独立的
+                上下文和页面，关闭爬虫时不会关闭该浏览器
+            engine: 结果收集引擎。"dom" 读取渲染后的结果锚点；
+                "network" 拦截搜索结果响应并解析其中的图片元数据，同时中止
+                图片/字体/媒体请求，未拦截到数据时回退到 DOM 提取
+            profile: 页面配置。"full" 与正常浏览一致；"lean" 使用较小视口，
+                中止图片/媒体/字体和第三方统计请求，并在 DOM 就绪且结果出现后
+                立即开始提取；也可传入自定义 CrawlProfile
+            cache: 爬取结果缓存（可选）。命中时 search() 直接返回缓存结果，
+                且浏览器延迟到首次未命中时才启动
         """
+        if engine not in self.ENGINES:
+            raise ValueError(f"不支持的引擎: {engine}，可选: {', '.join(self.ENGINES)}")
+        
         self.headless = headless
         self.timeout = timeout
         self.scroll_pause = scroll_pause
         self.max_retries = max_retries
         self.proxy = proxy
+        self.engine = engine
+        self.profile = get_profile(profile)
+        self.cache = cache
+        
+        # 中止的资源类型 = 页面配置 + network 引擎需要的类型
+        self._blocked_resource_types = set(self.profile.blocked_resource_types)
+        if engine == self.ENGINE_NETWORK:
+            self._blocked_resource_types |= self.NETWORK_BLOCKED_RESOURCE_TYPES
+        
+        # 流量统计（在该爬虫生命周期内累计）
+        self.transfer_stats: Dict[str, int] = {
+            "requests": 0,        # 完成的请求数
+            "blocked": 0,         # 被中止的请求数
+            "bytes_sent": 0,      # 请求头 + 请求体
+            "bytes_received": 0,  # 响应头 + 响应体（编码后大小）
+        }
         
         # 运行时状态
-        self._browser: Optional[Browser] = None
+        self._browser: Optional[Browser] = browser
+        self._owns_browser = browser is None
         self._context: Optional[BrowserContext] = None
         self._page: Optional[Page] = None
         self._playwright = None
+        self._harvester: Optional[ResponseHarvester] = None
         
     async def __aenter__(self):
         """异步上下文管理器入口"""
-        await self._init_browser()
+        # 有缓存时延迟到首次未命中再启动浏览器
+        if not self.cache:
+            await self._init_browser()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """异步上下文管理器出口"""
         await self.close()
     
-    async def _init_browser(self) -> None:
-        """初始化 Playwright 浏览器"""
-        self._playwright = await async_playwright().start()
+    @staticmethod
+    def browser_launch_args(headless: bool = True, proxy: Optional[str] = None) -> Dict[str, Any]:
+        """
+        构建 chromium.launch() 参数
         
-        browser_args = {
-            "headless": self.headless,
+        Args:
+            headless: 是否无头模式
+            proxy: 代理服务器地址
+            
+        Returns:
+            Dict: 启动参数
+        """
+        browser_args: Dict[str, Any] = {
+            "headless": headless,
         }
         
-        if self.proxy:
-            browser_args["proxy"] = {"server": self.proxy}
+        if proxy:
+            browser_args["proxy"] = {"server": proxy}
         
-        self._browser = await self._playwright.chromium.launch(**browser_args)
+        return browser_args
+    
+    async def _init_browser(self) -> None:
+        """初始化 Playwright 浏览器"""
+        if self._browser is None:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                **self.browser_launch_args(self.headless, self.proxy)
+            )
+            self._owns_browser = True
         
         # 创建浏览器上下文，模拟正常用户
         self._context = await self._browser.new_context(
-            viewport={"width": 1920, "height": 1080},
+            viewport=dict(self.profile.viewport),
             user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
         )
         
+        if self._blocked_resource_types or self.profile.blocked_domains:
+            await self._context.route("**/*", self._route_request)
+        
         self._page = await self._context.new_page()
         self._page.set_default_timeout(self.timeout * 1000)
+        self._page.on("requestfinished", self._on_request_finished)
+        
+        if self.engine == self.ENGINE_NETWORK:
+            self._harvester = ResponseHarvester(is_valid_url=self._is_valid_image_url)
+            self._harvester.attach(self._page)
         
         # 处理可能的弹窗和 Cookie 同意
         await self._handle_consent()
     
+    async def _route_request(self, route: Route) -> None:
+        """路由回调：中止配置中拦截的资源类型和域名"""
+        request = route.request
+        if (request.resource_type in self._blocked_resource_types
+                or self.profile.is_blocked_host(urlparse(request.url).hostname or "")):
+            self.transfer_stats["blocked"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    async def _on_request_finished(self, request: Request) -> None:
+        """请求完成回调：累计传输字节数"""
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.transfer_stats["requests"] += 1
+        self.transfer_stats["bytes_sent"] += sizes.get("requestHeadersSize", 0) + sizes.get("requestBodySize", 0)
+        self.transfer_stats["bytes_received"] += sizes.get("responseHeadersSize", 0) + sizes.get("responseBodySize", 0)
+    
     async def _handle_consent(self) -> None:
         """处理 Google 的 Cookie 同意弹窗"""
         try:
@@ -166,6 +299,39 @@ class GoogleImageCrawler:
             RuntimeError: 浏览器未初始化
             Exception: 搜索过程中发生错误
         """
+        return [
+            result async for result in self.iter_search(
+                keyword, num_images, safe_search, min_width, min_height
+            )
+        ]
+    
+    async def iter_search(
+        self,
+        keyword: str,
+        num_images: int = 10,
+        safe_search: bool = True,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None
+    ) -> AsyncIterator[ImageResult]:
+        """
+        流式搜索：滚动页面的同时逐个产出结果
+        
+        参数与 search() 相同。每轮滚动新发现的结果立即产出，调用方可在爬虫继续滚动时
+        开始下载；完整产出 num_images 张（或结果耗尽）后写入缓存，中途停止迭代则不写缓存。
+        重试时已产出的 URL 不会重复产出。
+        
+        Example:
+            >>> async for result in crawler.iter_search("cat", num_images=50):
+            ...     print(result.url)
+        """
+        if self.cache:
+            cached = self.cache.get(keyword, num_images, safe_search, min_width, min_height)
+            if cached is not None:
+                logger.debug(f"缓存命中: {keyword} ({len(cached)} 张)")
+                for item in cached:
+                    yield ImageResult(**item)
+                return
+        
         if not self._page:
             await self._init_browser()
         
@@ -178,24 +344,22 @@ class GoogleImageCrawler:
                 search_url = self._build_search_url(keyword, safe_search)
                 
                 # 访问搜索页面
-                await self._page.goto(search_url, wait_until="networkidle")
+                if self._harvester:
+                    self._harvester.reset()
+                await self._page.goto(search_url, wait_until=self.profile.wait_until)
                 await self._handle_consent()
                 
-                # 等待图片加载
-                await self._page.wait_for_selector("img", timeout=10000)
+                # 等待搜索结果出现
+                await self._page.wait_for_selector(self.profile.result_selector, timeout=10000)
                 
-                # 滚动页面加载更多图片
-                image_urls = await self._scroll_and_extract(
-                    target_count=num_images,
+                # 滚动页面加载更多图片，边滚动边产出
+                async for item in self._scroll_and_extract(
                     min_width=min_width,
                     min_height=min_height
-                )
-                
-                # 解析并过滤 URL
-                for item in image_urls:
+                ):
                     original_url = item.get("original_url", "")
                     
-                    # 去重检查
+                    # 去重检查（跨重试）
                     if original_url and original_url not in seen_urls:
                         seen_urls.add(original_url)
                         
@@ -208,6 +372,7 @@ class GoogleImageCrawler:
                             height=item.get("height")
                         )
                         results.append(result)
+                        yield result
                         
                         if len(results) >= num_images:
                             break
@@ -221,7 +386,8 @@ class GoogleImageCrawler:
                 await asyncio.sleep(2 ** attempt)  # 指数退避
                 continue
         
-        return results[:num_images]
+        if self.cache:
+            self.cache.put(keyword, [asdict(r) for r in results], safe_search, min_width, min_height)
     
     def _build_search_url(self, keyword: str, safe_search: bool = True) -> str:
         """
@@ -248,157 +414,193 @@ class GoogleImageCrawler:
     
     async def _scroll_and_extract(
         self,
-        target_count: int,
         min_width: Optional[int] = None,
         min_height: Optional[int] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> AsyncIterator[Dict[str, Any]]:
         """
-        滚动页面并提取图片 URL
+        滚动页面并增量提取图片 URL
+        
+        每轮只收集新插入的结果锚点（已收集的锚点在 DOM 中打标记），
+        用集合去重后立即产出；滚动后等待新结果出现，最长等待 scroll_pause 秒。
+        调用方取够数量后停止迭代即可结束滚动
         
         Args:
-            target_count: 目标图片数量
             min_width: 最小宽度过滤
             min_height: 最小高度过滤
             
-        Returns:
-            List[Dict]: 提取的图片信息列表
+        Yields:
+            Dict: 图片信息
         """
-        results: List[Dict[str, Any]] = []
-        last_height = 0
+        seen_urls: Set[str] = set()
         no_change_count = 0
         max_no_change = 3
         
-        while len(results) < target_count and no_change_count < max_no_change:
-            # 提取当前页面的图片
-            new_results = await self._extract_image_urls_from_page()
+        while no_change_count < max_no_change:
+            # 只提取新出现的图片
+            new_results = await self._harvest_new()
             
-            # 过滤新结果
             for item in new_results:
-                # 检查尺寸过滤
-                if min_width and item.get("width", 0) < min_width:
+                # 检查尺寸过滤（尺寸未知视为不满足）
+                if min_width and (item.get("width") or 0) < min_width:
                     continue
-                if min_height and item.get("height", 0) < min_height:
+                if min_height and (item.get("height") or 0) < min_height:
                     continue
                 
                 # 检查是否已存在
-                if not any(r.get("original_url") == item.get("original_url") for r in results):
-                    results.append(item)
+                original_url = item["original_url"]
+                if original_url not in seen_urls:
+                    seen_urls.add(original_url)
+                    yield item
             
-            # 滚动页面
-            await self._page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(self.scroll_pause)
+            # 滚动页面并等待新结果出现
+            tile_count = await self._page.evaluate(self._SCROLL_JS, self.RESULT_ANCHOR_SELECTOR)
+            if await self._wait_for_new_tiles(tile_count):
+                no_change_count = 0
+                continue
             
-            # 检查是否到达底部
-            new_height = await self._page.evaluate("document.body.scrollHeight")
-            if new_height == last_height:
-                no_change_count += 1
-                
-                # 尝试点击 "Show more results" 或 "More results"
-                try:
-                    more_button = await self._page.wait_for_selector(
-                        'input[type="button"][value*="more"], button:has-text("more results")',
-                        timeout=2000
-                    )
-                    if more_button:
-                        await more_button.click()
-                        await asyncio.sleep(self.scroll_pause)
+            no_change_count += 1
+            
+            # 尝试点击 "Show more results" 或 "More results"
+            try:
+                more_button = await self._page.wait_for_selector(
+                    'input[type="button"][value*="more"], button:has-text("more results")',
+                    timeout=2000
+                )
+                if more_button:
+                    await more_button.click()
+                    if await self._wait_for_new_tiles(tile_count):
                         no_change_count = 0
-                except:
-                    pass
-            else:
-                no_change_count = 0
-                last_height = new_height
+            except Exception:
+                pass
+    
+    async def _harvest_new(self) -> List[Dict[str, Any]]:
+        """
+        收集上次调用之后新发现的图片
         
-        return results
+        network 引擎返回拦截到的响应数据；本次搜索尚未拦截到任何数据时
+        回退到 DOM 提取
+        
+        Returns:
+            List[Dict]: 图片信息字典列表
+        """
+        if self._harvester:
+            items = self._harvester.drain()
+            if self._harvester.intercepted:
+                return items
+        return await self._extract_image_urls_from_page(only_new=True)
     
-    async def _extract_image_urls_from_page(self) -> List[Dict[str, Any]]:
+    async def _wait_for_new_tiles(self, previous_count: int) -> bool:
+        """
+        等待页面出现新的结果锚点
+        
+        Args:
+            previous_count: 滚动前的锚点数量
+            
+        Returns:
+            bool: 超时（scroll_pause 秒）前是否出现了新结果
+        """
+        try:
+            await self._page.wait_for_function(
+                self._TILES_GREW_JS,
+                arg=[self.RESULT_ANCHOR_SELECTOR, previous_count],
+                timeout=self.scroll_pause * 1000
+            )
+            return True
+        except PlaywrightTimeoutError:
+            return False
+    
+    async def _extract_image_urls_from_page(self, only_new: bool = False) -> List[Dict[str, Any]]:
         """
         从当前页面提取图片 URL
         
-        从 Google 图片搜索结果中提取原始图片 URL（通过 imgurl 参数）
+        通过一次 page.evaluate 在浏览器内收集所有 /imgres 锚点的 href、
+        缩略图和标题，再在 Python 端解析 imgurl/imgrefurl 参数，
+        避免对每个锚点发起多次 IPC 往返
+        
+        Args:
+            only_new: 是否只收集上次调用之后新出现的锚点
         
         Returns:
             List[Dict]: 图片信息字典列表
         """
-        results = []
-        
         try:
-            # 获取所有图片相关的锚点元素
-            anchors = await self._page.query_selector_all('a[href*="/imgres"]')
-            
-            for anchor in anchors:
-                try:
-                    href = await anchor.get_attribute("href")
-                    if not href:
-                        continue
-                    
-                    # 解析 URL 参数
-                    parsed = urlparse(href)
-                    query_params = parse_qs(parsed.query)
-                    
-                    # 提取原始图片 URL（imgurl 参数）
-                    original_url = ""
-                    if "imgurl" in query_params:
-                        original_url = unquote(query_params["imgurl"][0])
-                    
-                    # 提取来源网页 URL（imgrefurl 参数）
-                    source_url = ""
-                    if "imgrefurl" in query_params:
-                        source_url = unquote(query_params["imgrefurl"][0])
-                    
-                    # 提取图片尺寸信息
-                    width = None
-                    height = None
-                    if "w" in query_params:
-                        try:
-                            width = int(query_params["w"][0])
-                        except ValueError:
-                            pass
-                    if "h" in query_params:
-                        try:
-                            height = int(query_params["h"][0])
-                        except ValueError:
-                            pass
-                    
-                    # 获取缩略图 URL
-                    thumbnail = await anchor.query_selector("img")
-                    thumbnail_url = ""
-                    if thumbnail:
-                        thumbnail_url = await thumbnail.get_attribute("src") or ""
-                    
-                    # 获取标题
-                    title = ""
-                    try:
-                        # 尝试从相邻元素获取标题
-                        parent = await anchor.evaluate("el => el.closest('div[data-ved]')")
-                        if parent:
-                            title_elem = await anchor.query_selector('img[alt]')
-                            if title_elem:
-                                title = await title_elem.get_attribute("alt") or ""
-                    except:
-                        pass
-                    
-                    # 过滤无效 URL
-                    if original_url and self._is_valid_image_url(original_url):
-                        results.append({
-                            "original_url": original_url,
-                            "thumbnail_url": thumbnail_url,
-                            "source_url": source_url,
-                            "title": title,
-                            "width": width,
-                            "height": height
-                        })
-                        
-                except Exception as e:
-                    # 单个元素处理失败，继续处理下一个
-                    continue
-                    
+            anchors = await self._page.evaluate(
+                self._EXTRACT_ANCHORS_JS,
+                [self.RESULT_ANCHOR_SELECTOR, only_new]
+            )
         except Exception as e:
-            # 提取过程出错，返回已收集的结果
-            pass
+            # 提取过程出错（如页面正在跳转），返回空结果
+            logger.debug(f"提取锚点失败: {e}")
+            return []
+        
+        results = []
+        for anchor in anchors or []:
+            item = self._parse_anchor(anchor)
+            if item:
+                results.append(item)
         
         return results
     
+    def _parse_anchor(self, anchor: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        解析浏览器端返回的单个锚点数据
+        
+        Args:
+            anchor: {"href", "thumbnail", "title"} 字典
+            
+        Returns:
+            Optional[Dict]: 图片信息字典，无效时返回 None
+        """
+        href = anchor.get("href")
+        if not href:
+            return None
+        
+        item = self._parse_imgres_href(href)
+        if not item or not self._is_valid_image_url(item["original_url"]):
+            return None
+        
+        item["thumbnail_url"] = anchor.get("thumbnail") or ""
+        item["title"] = anchor.get("title") or ""
+        return item
+    
+    @staticmethod
+    def _parse_imgres_href(href: str) -> Optional[Dict[str, Any]]:
+        """
+        解析 /imgres 链接中的原图 URL、来源网页和尺寸
+        
+        Args:
+            href: /imgres?imgurl=...&imgrefurl=...&w=...&h=... 形式的链接
+            
+        Returns:
+            Optional[Dict]: 包含 original_url/source_url/width/height，
+                缺少 imgurl 参数时返回 None
+        """
+        query_params = parse_qs(urlparse(href).query)
+        
+        # 提取原始图片 URL（imgurl 参数）
+        if "imgurl" not in query_params:
+            return None
+        original_url = unquote(query_params["imgurl"][0])
+        
+        # 提取来源网页 URL（imgrefurl 参数）
+        source_url = ""
+        if "imgrefurl" in query_params:
+            source_url = unquote(query_params["imgrefurl"][0])
+        
+        # 提取图片尺寸信息
+        def to_int(key: str) -> Optional[int]:
+            try:
+                return int(query_params[key][0])
+            except (KeyError, ValueError):
+                return None
+        
+        return {
+            "original_url": original_url,
+            "source_url": source_url,
+            "width": to_int("w"),
+            "height": to_int("h"),
+        }
+    
     def _is_valid_image_url(self, url: str) -> bool:
         """
         检查 URL 是否为有效的图片 URL
@@ -433,6 +635,19 @@ class GoogleImageCrawler:
         
         return True
     
+    @staticmethod
+    def _create_download_engine(concurrency: int, store=None):
+        """创建下载引擎（不跳过已存在文件，与直接写入的行为一致；非图片内容中止下载）"""
+        try:
+            from .engine import DownloadEngine
+            from .validation import ImageValidator
+        except ImportError:
+            raise ImportError("下载功能需要 aiohttp，请运行: pip install aiohttp")
+        
+        return DownloadEngine(
+            concurrent=concurrency, timeout=30, skip_existing=False, store=store, validator=ImageValidator()
+        )
+    
     async def download_image(
         self,
         image_url: str,
@@ -450,14 +665,7 @@ class GoogleImageCrawler:
         Returns:
             str: 保存的文件路径
         """
-        try:
-            import aiohttp
-        except ImportError:
-            raise ImportError("下载功能需要 aiohttp，请运行: pip install aiohttp")
-        
-        # 确保输出目录存在
-        output_dir = Path(output_path)
-        output_dir.mkdir(parents=True, exist_ok=True)
+        from .engine import DownloadTask, DownloadError
         
         # 生成文件名
         if not filename:
@@ -467,88 +675,70 @@ class GoogleImageCrawler:
             if not filename:
                 filename = f"image_{int(time.time())}.jpg"
         
-        file_path = output_dir / filename
-        
-        # 下载图片
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                response.raise_for_status()
-                content = await response.read()
-                
-                # 使用标准库写入文件（在异步环境中使用线程池）
-                import concurrent.futures
-                loop = asyncio.get_event_loop()
-                
-                def write_file():
-                    with open(file_path, 'wb') as f:
-                        f.write(content)
-                
-                with concurrent.futures.ThreadPoolExecutor() as pool:
-                    await loop.run_in_executor(pool, write_file)
+        async with self._create_download_engine(1) as engine:
+            outcome = await engine.fetch(DownloadTask(image_url, Path(output_path), filename))
         
-        return str(file_path)
+        if not outcome.success:
+            raise DownloadError(outcome.error)
+        return outcome.path
     
     async def download_images(
         self,
         results: List[ImageResult],
         output_dir: str,
-        concurrency: int = 3
+        concurrency: int = 3,
+        store=None
     ) -> List[str]:
         """
         批量下载图片
         
+        所有图片共享一个连接池，并发数由 concurrency 控制
+        
         Args:
             results: 图片结果列表
             output_dir: 输出目录
             concurrency: 并发下载数
+            store: 内容寻址存储 ContentStore（可选），相同内容跨关键词/跨运行只保存一份
             
         Returns:
-            List[str]: 下载成功的文件路径列表
+            List[str]: 下载成功的文件路径列表（按结果顺序）
         """
+        from .engine import DownloadTask
+        
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        downloaded = []
-        semaphore = asyncio.Semaphore(concurrency)
+        tasks = []
+        for index, result in enumerate(results):
+            # 生成序号文件名
+            ext = Path(urlparse(result.url).path).suffix.lower() or ".jpg"
+            if ext not in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']:
+                ext = ".jpg"
+            tasks.append(DownloadTask(result.url, output_path, f"{index:04d}{ext}"))
         
-        async def download_with_limit(result: ImageResult, index: int):
-            async with semaphore:
-                try:
-                    # 生成序号文件名
-                    ext = Path(result.url).suffix or ".jpg"
-                    if ext not in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']:
-                        ext = ".jpg"
-                    filename = f"{index:04d}{ext}"
-                    
-                    file_path = await self.download_image(
-                        result.url,
-                        str(output_path),
-                        filename
-                    )
-                    downloaded.append(file_path)
-                    return file_path
-                except Exception as e:
-                    print(f"下载失败 {result.url}: {str(e)}")
-                    return None
-        
-        # 并发下载
-        tasks = [
-            download_with_limit(result, i)
-            for i, result in enumerate(results)
-        ]
-        await asyncio.gather(*tasks)
+        async with self._create_download_engine(concurrency, store) as engine:
+            outcomes = await engine.run(tasks)
         
-        return [p for p in downloaded if p]
+        for outcome in outcomes:
+            if not outcome.success:
+                logger.warning(f"下载失败 {outcome.url}: {outcome.error}")
+        
+        return [o.path for o in outcomes if o.success]
     
     async def close(self) -> None:
         """关闭浏览器，释放资源"""
+        if self._harvester and self._page:
+            self._harvester.detach(self._page)
+        self._harvester = None
+        
         if self._context:
             await self._context.close()
             self._context = None
         
-        if self._browser:
+        # 共享浏览器由其所有者（如 GoogleImageCrawlerPool）负责关闭
+        if self._browser and self._owns_browser:
             await self._browser.close()
-            self._browser = None
+        self._browser = None
         
         if self._playwright:
             await self._playwright.stop()
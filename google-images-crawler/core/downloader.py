@@ -1,44 +1,67 @@
 """
 Google图片下载模块
-支持单张下载、批量下载、并发、重试、进度显示
+支持单张下载、批量下载、并发、重试、进度显示、下载时校验与转码
+
+同步接口，内部由 DownloadEngine（asyncio + 共享 aiohttp 连接池）执行下载
+
+本模块不配置日志（不调用 logging.basicConfig），日志输出由调用方决定
 """
-import os
-import time
+import asyncio
 import logging
-import hashlib
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Callable, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from urllib.parse import urlparse, unquote
+from typing import List, Dict, Optional, Callable, Tuple, Iterable, AsyncIterator
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from tqdm import tqdm
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('downloader.log', encoding='utf-8')
-    ]
-)
+from .engine import DownloadEngine, DownloadTask, DownloadOutcome, DEFAULT_HEADERS, filename_from_url
+from .manifest import JobManifest, STATE_DONE, STATE_FAILED
+from .metrics import DownloadMetrics
+from .store import ContentStore
+from .validation import ImageValidator, Transcoder
+
 logger = logging.getLogger(__name__)
 
+_END = object()
+
+
+async def _iterate_in_thread(iterable: Iterable, maxsize: int = 256) -> AsyncIterator:
+    """
+    在后台线程中遍历阻塞的可迭代对象（如 sys.stdin），逐个异步产出
+
+    队列有上限，消费变慢时读取线程随之阻塞，不会把输入全部读入内存
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+    
+    def pump() -> None:
+        try:
+            for item in iterable:
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+        except BaseException as e:
+            asyncio.run_coroutine_threadsafe(queue.put(e), loop).result()
+        asyncio.run_coroutine_threadsafe(queue.put(_END), loop).result()
+    
+    threading.Thread(target=pump, name="download-input", daemon=True).start()
+    while True:
+        item = await queue.get()
+        if item is _END:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+
 
 class ImageDownloader:
-    """图片下载器类，支持单张和批量下载"""
+    """
+    图片下载器类，支持单张和批量下载
+
+    同步外观：持有一个私有事件循环和一个 DownloadEngine，所有调用共享同一连接池。
+    异步代码中请直接使用 core.engine.DownloadEngine。
+    """
     
     # 默认请求头
-    DEFAULT_HEADERS = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-        'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        'Referer': 'https://www.google.com/',
-        'Connection': 'keep-alive',
-    }
+    DEFAULT_HEADERS = DEFAULT_HEADERS
     
     def __init__(
         self,
@@ -46,7 +69,20 @@ class ImageDownloader:
         timeout: int = 30,
         max_retries: int = 3,
         concurrent: int = 5,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        per_host: int = DownloadEngine.DEFAULT_PER_HOST,
+        proxy: Optional[str] = None,
+        show_progress: bool = True,
+        store_dir: Optional[str] = None,
+        manifest_path: Optional[str] = None,
+        resume: bool = False,
+        host_rate: float = DownloadEngine.DEFAULT_HOST_RATE,
+        validate: bool = True,
+        min_width: int = 0,
+        min_height: int = 0,
+        min_bytes: int = 0,
+        convert_to: Optional[str] = None,
+        max_edge: Optional[int] = None
     ):
         """
         初始化下载器
@@ -56,53 +92,74 @@ class ImageDownloader:
             timeout: 请求超时时间（秒）
             max_retries: 最大重试次数
             concurrent: 并发下载数
-            headers: 自定义请求头
+            headers: 自定义请求头（与默认请求头合并）
+            per_host: 每个主机的最大并发数（自适应并发窗口的上限）
+            proxy: 代理地址（未指定时读取 HTTP(S)_PROXY 环境变量）
+            show_progress: 批量下载时是否显示进度条
+            store_dir: 内容寻址存储目录（可选）。启用后相同内容只保存一份，
+                已下载过的 URL 直接链接到输出目录，文件以内容摘要命名
+            manifest_path: 任务清单 JSONL 路径（可选），记录每个 URL 的状态、字节数、摘要和错误
+            resume: 是否跳过任务清单中已完成（且文件仍存在）的 URL；未完成的 .part 文件
+                总会通过 HTTP Range 续传
+            host_rate: 每个主机的最大请求速率（请求/秒），遇到 429/503 时自动降低
+            validate: 是否在下载时校验内容（魔数识别格式，非图片立即中止）
+            min_width: 最小宽度（像素），从文件头读取，过小时中止下载
+            min_height: 最小高度（像素）
+            min_bytes: 最小文件大小（字节）
+            convert_to: 下载后转码的目标格式 (jpeg/png/webp)，需要 Pillow
+            max_edge: 下载后将最长边缩小到不超过该值（像素），需要 Pillow
         """
         self.output_dir = Path(output_dir)
         self.timeout = timeout
         self.max_retries = max_retries
         self.concurrent = concurrent
-        self.headers = headers or self.DEFAULT_HEADERS.copy()
+        self.headers = {**self.DEFAULT_HEADERS, **(headers or {})}
+        self.show_progress = show_progress
         
         # 创建输出目录
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 初始化会话
-        self.session = self._create_session()
+        self.store = ContentStore(store_dir) if store_dir else None
+        self.manifest = JobManifest(manifest_path) if manifest_path else None
+        self.resume = resume
         
-        # 下载统计
-        self.stats = {
-            'total': 0,
-            'success': 0,
-            'failed': 0,
-            'skipped': 0
-        }
+        validator = None
+        if validate or min_width or min_height or min_bytes:
+            validator = ImageValidator(min_width=min_width, min_height=min_height, min_bytes=min_bytes)
+        self.transcoder = Transcoder(convert_to, max_edge) if (convert_to or max_edge) else None
         
-        logger.info(f"初始化下载器: 输出目录={output_dir}, 并发={concurrent}, 超时={timeout}s")
-    
-    def _create_session(self) -> requests.Session:
-        """创建配置好的requests会话"""
-        session = requests.Session()
-        session.headers.update(self.headers)
-        
-        # 配置重试策略
-        retry_strategy = Retry(
-            total=self.max_retries,
-            backoff_factor=1,  # 指数退避: 1, 2, 4, 8...
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
-        )
+        # 下载指标（按工作协程分片记录，见 core.metrics）
+        self.metrics = DownloadMetrics()
+        self._total = 0
         
-        adapter = HTTPAdapter(
-            max_retries=retry_strategy,
-            pool_connections=self.concurrent,
-            pool_maxsize=self.concurrent * 2
+        # 下载引擎及其专用事件循环
+        self._loop = asyncio.new_event_loop()
+        self.engine = DownloadEngine(
+            concurrent=concurrent,
+            per_host=per_host,
+            timeout=timeout,
+            max_retries=max_retries,
+            headers=self.headers,
+            proxy=proxy,
+            store=self.store,
+            host_rate=host_rate,
+            validator=validator,
+            transcoder=self.transcoder,
+            metrics=self.metrics
         )
         
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-        
-        return session
+        logger.info(f"初始化下载器: 输出目录={output_dir}, 并发={concurrent}, 超时={timeout}s")
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        """下载统计: total, success, failed, skipped（详细指标见 self.metrics）"""
+        return {'total': self._total, **self.metrics.totals()}
+    
+    def _run(self, coro):
+        """在下载器的事件循环中执行协程"""
+        if self._loop.is_closed():
+            raise RuntimeError("下载器已关闭")
+        return self._loop.run_until_complete(coro)
     
     def _get_filename_from_url(self, url: str, content_type: str = None) -> str:
         """
@@ -115,38 +172,70 @@ class ImageDownloader:
         Returns:
             文件名
         """
-        # 尝试从URL提取文件名
-        parsed = urlparse(url)
-        path = unquote(parsed.path)
-        
-        if path and '.' in path:
-            # 提取扩展名
-            ext = Path(path).suffix.lower()
-            if ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg']:
-                # 使用哈希值作为文件名，避免冲突
-                name_hash = hashlib.md5(url.encode()).hexdigest()[:12]
-                return f"{name_hash}{ext}"
-        
-        # 根据content_type推断扩展名
-        ext_map = {
-            'image/jpeg': '.jpg',
-            'image/jpg': '.jpg',
-            'image/png': '.png',
-            'image/gif': '.gif',
-            'image/webp': '.webp',
-            'image/bmp': '.bmp',
-            'image/svg+xml': '.svg'
-        }
+        return filename_from_url(url, content_type)
+    
+    def _save_dir(self, subfolder: Optional[str]) -> Path:
+        """确定保存目录"""
+        return self.output_dir / subfolder if subfolder else self.output_dir
+    
+    def _record(self, outcome: DownloadOutcome, journal: bool = True) -> None:
+        """写入任务清单；断点续传跳过的任务不经过引擎，在此计入统计"""
+        if not journal:
+            self.metrics.record_outcome('resume', outcome.success, outcome.skipped)
+        elif self.manifest is not None:
+            self.manifest.record(
+                outcome.url,
+                STATE_DONE if outcome.success else STATE_FAILED,
+                path=outcome.path,
+                size=outcome.size,
+                digest=outcome.digest,
+                error=outcome.error
+            )
+    
+    def _resumed_outcome(self, task: DownloadTask) -> Optional[DownloadOutcome]:
+        """resume 模式下，任务清单中已完成的任务直接返回结果"""
+        if self.manifest is None or not self.resume:
+            return None
+        entry = self.manifest.completed(task.url)
+        if not entry:
+            return None
+        return DownloadOutcome(
+            task, True, path=entry['path'], skipped=True,
+            size=entry.get('bytes') or 0, digest=entry.get('digest')
+        )
+    
+    def _run_tasks(
+        self,
+        tasks: List[DownloadTask],
+        progress_callback: Optional[Callable] = None
+    ) -> List[DownloadOutcome]:
+        """执行一批任务并显示进度，progress_callback(当前, 总数)"""
+        outcomes: List[Optional[DownloadOutcome]] = [None] * len(tasks)
+        pending: List[int] = []
         
-        ext = '.jpg'  # 默认扩展名
-        if content_type:
-            for mime, extension in ext_map.items():
-                if mime in content_type:
-                    ext = extension
-                    break
+        with tqdm(total=len(tasks), desc="下载进度", unit="张", disable=not self.show_progress) as pbar:
+            def on_done(outcome: DownloadOutcome, journal: bool = True) -> None:
+                self._record(outcome, journal)
+                pbar.update(1)
+                if progress_callback:
+                    progress_callback(pbar.n, len(tasks))
+            
+            for index, task in enumerate(tasks):
+                outcome = self._resumed_outcome(task)
+                if outcome:
+                    outcomes[index] = outcome
+                    on_done(outcome, journal=False)
+                else:
+                    pending.append(index)
+            
+            if self.resume and len(pending) < len(tasks):
+                logger.info(f"断点续传: 跳过已完成 {len(tasks) - len(pending)} 张，剩余 {len(pending)} 张")
+            
+            done = self._run(self.engine.run([tasks[i] for i in pending], on_done=on_done))
+            for index, outcome in zip(pending, done):
+                outcomes[index] = outcome
         
-        name_hash = hashlib.md5(url.encode()).hexdigest()[:12]
-        return f"{name_hash}{ext}"
+        return outcomes
     
     def download_single(
         self,
@@ -167,97 +256,18 @@ class ImageDownloader:
         Returns:
             (成功标志, 文件路径或错误信息)
         """
-        if not url or not url.startswith(('http://', 'https://')):
-            logger.error(f"无效的URL: {url}")
-            return False, "Invalid URL"
-        
-        # 确定保存路径
-        save_dir = self.output_dir
-        if subfolder:
-            save_dir = self.output_dir / subfolder
-            save_dir.mkdir(parents=True, exist_ok=True)
+        task = DownloadTask(url=url, output_dir=self._save_dir(subfolder), filename=filename)
+        outcome = self._resumed_outcome(task)
+        if outcome:
+            self._record(outcome, journal=False)
+        else:
+            outcome = self._run(self.engine.fetch(task))
+            self._record(outcome)
         
-        try:
-            logger.debug(f"开始下载: {url}")
-            
-            # 发送请求
-            response = self.session.get(
-                url,
-                timeout=self.timeout,
-                stream=True,
-                allow_redirects=True
-            )
-            response.raise_for_status()
-            
-            # 获取文件大小
-            total_size = int(response.headers.get('content-length', 0))
-            content_type = response.headers.get('content-type', '')
-            
-            # 检查是否为图片
-            if not content_type.startswith('image/'):
-                # 某些CDN可能不返回正确的content-type，继续下载
-                logger.warning(f"Content-Type不是图片: {content_type}, URL: {url}")
-            
-            # 确定文件名
-            if not filename:
-                filename = self._get_filename_from_url(url, content_type)
-            
-            file_path = save_dir / filename
-            
-            # 检查文件是否已存在
-            if file_path.exists():
-                logger.info(f"文件已存在，跳过: {file_path}")
-                self.stats['skipped'] += 1
-                if callback:
-                    callback(url, str(file_path), True)
-                return True, str(file_path)
-            
-            # 下载文件
-            downloaded_size = 0
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded_size += len(chunk)
-            
-            # 验证下载
-            if total_size > 0 and downloaded_size != total_size:
-                file_path.unlink(missing_ok=True)
-                raise IOError(f"下载不完整: {downloaded_size}/{total_size} bytes")
-            
-            file_size = file_path.stat().st_size
-            logger.info(f"下载成功: {file_path} ({file_size / 1024:.1f} KB)")
-            
-            self.stats['success'] += 1
-            
-            if callback:
-                callback(url, str(file_path), True)
-            
-            return True, str(file_path)
-            
-        except requests.exceptions.Timeout:
-            error_msg = f"下载超时: {url}"
-            logger.error(error_msg)
-            self.stats['failed'] += 1
-            if callback:
-                callback(url, error_msg, False)
-            return False, error_msg
-            
-        except requests.exceptions.RequestException as e:
-            error_msg = f"下载失败: {url} - {str(e)}"
-            logger.error(error_msg)
-            self.stats['failed'] += 1
-            if callback:
-                callback(url, error_msg, False)
-            return False, error_msg
-            
-        except Exception as e:
-            error_msg = f"下载异常: {url} - {str(e)}"
-            logger.error(error_msg)
-            self.stats['failed'] += 1
-            if callback:
-                callback(url, error_msg, False)
-            return False, error_msg
+        result = outcome.path if outcome.success else outcome.error
+        if callback:
+            callback(url, result, outcome.success)
+        return outcome.success, result
     
     def download_batch(
         self,
@@ -280,52 +290,78 @@ class ImageDownloader:
             logger.warning("URL列表为空")
             return {'success': [], 'failed': []}
         
-        self.stats['total'] = len(urls)
+        self._total = len(urls)
+        save_dir = self._save_dir(subfolder)
+        tasks = [DownloadTask(url=url, output_dir=save_dir) for url in urls]
+        
+        logger.info(f"开始批量下载: {len(urls)}张图片, 并发数={self.concurrent}")
+        
+        outcomes = self._run_tasks(tasks, progress_callback)
+        
         results = {
             'success': [],
             'failed': [],
             'skipped': []
         }
+        for outcome in outcomes:
+            if outcome.success:
+                results['success'].append({'url': outcome.url, 'path': outcome.path})
+            else:
+                results['failed'].append({'url': outcome.url, 'error': outcome.error})
         
-        logger.info(f"开始批量下载: {len(urls)}张图片, 并发数={self.concurrent}")
+        # 输出统计
+        logger.info(f"批量下载完成: 成功={len(results['success'])}, 失败={len(results['failed'])}")
         
-        with tqdm(total=len(urls), desc="下载进度", unit="张") as pbar:
-            with ThreadPoolExecutor(max_workers=self.concurrent) as executor:
-                # 提交所有任务
-                future_to_url = {
-                    executor.submit(
-                        self.download_single,
-                        url,
-                        None,
-                        subfolder
-                    ): url for url in urls
-                }
-                
-                # 处理完成的任务
-                for future in as_completed(future_to_url):
-                    url = future_to_url[future]
-                    try:
-                        success, result = future.result()
-                        if success:
-                            if "跳过" in result or results.get('skipped'):
-                                results['success'].append({'url': url, 'path': result})
-                            else:
-                                results['success'].append({'url': url, 'path': result})
-                        else:
-                            results['failed'].append({'url': url, 'error': result})
-                    except Exception as e:
-                        logger.error(f"任务异常: {url} - {e}")
-                        results['failed'].append({'url': url, 'error': str(e)})
-                    
-                    pbar.update(1)
-                    if progress_callback:
-                        progress_callback(pbar.n, len(urls))
+        return results
+    
+    def download_stream(
+        self,
+        urls: Iterable[str],
+        subfolder: Optional[str] = None,
+        progress_callback: Optional[Callable] = None
+    ) -> Dict[str, any]:
+        """
+        流式批量下载：边读取 URL 边下载
         
-        # 输出统计
-        success_count = len(results['success'])
-        failed_count = len(results['failed'])
-        logger.info(f"批量下载完成: 成功={success_count}, 失败={failed_count}")
+        urls 可以是任意（可能阻塞的）迭代器，例如逐行读取的 stdin 或正在运行的爬虫的输出，
+        在后台线程中读取，第一个 URL 到达即开始下载；输入读取速度受下载进度限制。
+        
+        Args:
+            urls: 图片 URL 迭代器
+            subfolder: 子文件夹
+            progress_callback: 进度回调函数(已完成, 已接收)
+            
+        Returns:
+            下载结果统计（与 download_batch 相同）
+        """
+        save_dir = self._save_dir(subfolder)
+        results = {'success': [], 'failed': [], 'skipped': []}
+        
+        with tqdm(desc="下载进度", unit="张", disable=not self.show_progress) as pbar:
+            def on_done(outcome: DownloadOutcome, journal: bool = True) -> None:
+                self._record(outcome, journal)
+                if outcome.success:
+                    results['success'].append({'url': outcome.url, 'path': outcome.path})
+                else:
+                    results['failed'].append({'url': outcome.url, 'error': outcome.error})
+                pbar.update(1)
+                if progress_callback:
+                    progress_callback(pbar.n, self._total)
+            
+            async def tasks() -> AsyncIterator[DownloadTask]:
+                async for url in _iterate_in_thread(urls):
+                    self._total += 1
+                    task = DownloadTask(url=url, output_dir=save_dir)
+                    outcome = self._resumed_outcome(task)
+                    if outcome:
+                        on_done(outcome, journal=False)
+                    else:
+                        yield task
+            
+            logger.info(f"开始流式下载: 并发数={self.concurrent}")
+            self._run(self.engine.run_stream(tasks(), on_done=on_done))
         
+        logger.info(f"流式下载完成: 成功={len(results['success'])}, 失败={len(results['failed'])}")
         return results
     
     def download_with_metadata(
@@ -347,57 +383,47 @@ class ImageDownloader:
         if not items:
             return {'success': [], 'failed': []}
         
-        results = {'success': [], 'failed': []}
+        save_dir = self._save_dir(subfolder)
+        tasks = [
+            DownloadTask(
+                url=item['url'],
+                output_dir=save_dir,
+                filename=item.get('filename'),
+                metadata=item.get('metadata', {})
+            )
+            for item in items if item.get('url')
+        ]
         
-        with tqdm(total=len(items), desc="下载进度", unit="张") as pbar:
-            with ThreadPoolExecutor(max_workers=self.concurrent) as executor:
-                future_to_item = {}
-                
-                for item in items:
-                    url = item.get('url')
-                    filename = item.get('filename')
-                    if url:
-                        future = executor.submit(
-                            self.download_single,
-                            url,
-                            filename,
-                            subfolder
-                        )
-                        future_to_item[future] = item
-                
-                for future in as_completed(future_to_item):
-                    item = future_to_item[future]
-                    url = item.get('url')
-                    try:
-                        success, result = future.result()
-                        if success:
-                            results['success'].append({
-                                'url': url,
-                                'path': result,
-                                'metadata': item.get('metadata', {})
-                            })
-                        else:
-                            results['failed'].append({
-                                'url': url,
-                                'error': result,
-                                'metadata': item.get('metadata', {})
-                            })
-                    except Exception as e:
-                        results['failed'].append({
-                            'url': url,
-                            'error': str(e),
-                            'metadata': item.get('metadata', {})
-                        })
-                    
-                    pbar.update(1)
+        results = {'success': [], 'failed': []}
+        for outcome in self._run_tasks(tasks):
+            if outcome.success:
+                results['success'].append({
+                    'url': outcome.url,
+                    'path': outcome.path,
+                    'metadata': outcome.task.metadata
+                })
+            else:
+                results['failed'].append({
+                    'url': outcome.url,
+                    'error': outcome.error,
+                    'metadata': outcome.task.metadata
+                })
         
         return results
     
     def close(self):
         """关闭会话，释放资源"""
-        if self.session:
-            self.session.close()
-            logger.info("下载器会话已关闭")
+        if self._loop.is_closed():
+            return
+        self._loop.run_until_complete(self.engine.close())
+        self._loop.close()
+        if self.store:
+            self.store.close()
+        if self.manifest is not None:
+            self.manifest.close()
+        if self.transcoder:
+            self.transcoder.close()
+        logger.info("下载器会话已关闭")
     
     def __enter__(self):
         """上下文管理器入口"""
@@ -0,0 +1,691 @@
+"""
+异步图片下载引擎
+所有下载共享一个 aiohttp 会话（连接池 + 每主机连接数限制），
+由固定数量的协程从任务队列中取任务，支持重试、指数退避、流式写盘和断点续传，
+写盘的同时校验文件头（魔数与尺寸），下载完成后可选转码
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Callable, Iterable, Tuple, AsyncIterable
+from dataclasses import dataclass, field
+from urllib.parse import urlparse, unquote
+
+import aiohttp
+
+from .metrics import DownloadMetrics
+from .scheduler import HostScheduler, host_of, RESULT_OK, RESULT_THROTTLED, RESULT_ERROR, RESULT_FATAL
+from .store import ContentStore
+from .validation import ImageValidator, Transcoder, InvalidImageError, HEADER_LIMIT
+
+
+# 默认请求头
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
+    'Referer': 'https://www.google.com/',
+}
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.svg')
+
+CONTENT_TYPE_EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/jpg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/webp': '.webp',
+    'image/bmp': '.bmp',
+    'image/svg+xml': '.svg',
+}
+
+# 需要重试的 HTTP 状态码
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# 表示主机要求降速的状态码
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def url_extension(url: str) -> Optional[str]:
+    """从 URL 路径提取图片扩展名，无法识别时返回 None"""
+    ext = Path(unquote(urlparse(url).path)).suffix.lower()
+    return ext if ext in IMAGE_EXTENSIONS else None
+
+
+def extension_for(url: str, content_type: Optional[str] = None) -> str:
+    """根据 URL 路径或 Content-Type 推断扩展名，默认 .jpg"""
+    ext = url_extension(url)
+    if ext:
+        return ext
+    if content_type:
+        for mime, extension in CONTENT_TYPE_EXTENSIONS.items():
+            if mime in content_type:
+                return extension
+    return '.jpg'
+
+
+def filename_from_url(url: str, content_type: Optional[str] = None) -> str:
+    """
+    根据 URL 生成文件名（URL 的 MD5 前 12 位 + 扩展名）
+
+    Args:
+        url: 图片 URL
+        content_type: HTTP Content-Type，URL 无扩展名时用于推断
+
+    Returns:
+        str: 文件名
+    """
+    name_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+    return f"{name_hash}{extension_for(url, content_type)}"
+
+
+class DownloadError(Exception):
+    """下载失败（不可重试或重试耗尽）"""
+
+
+class _RetryableError(Exception):
+    """可重试的下载错误"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None, status: Optional[int] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.status = status
+
+
+@dataclass
+class _Attempt:
+    """一次下载尝试的结果（outcome 为空表示可重试）"""
+    result: str                                         # scheduler.RESULT_*
+    outcome: Optional["DownloadOutcome"] = None
+    error: Optional[str] = None
+    latency: Optional[float] = None
+    retry_after: Optional[float] = None
+
+
+@dataclass
+class DownloadTask:
+    """单个下载任务"""
+    url: str
+    output_dir: Path                                    # 保存目录
+    filename: Optional[str] = None                      # 为空时根据 URL 生成
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class DownloadOutcome:
+    """单个下载任务的结果"""
+    task: DownloadTask
+    success: bool
+    path: Optional[str] = None
+    error: Optional[str] = None
+    skipped: bool = False                               # 文件已存在或已在存储中，未重新下载
+    digest: Optional[str] = None                        # 内容 SHA-256（使用 ContentStore 时）
+    size: int = 0                                       # 写入字节数
+
+    @property
+    def url(self) -> str:
+        return self.task.url
+
+
+class DownloadEngine:
+    """
+    异步下载引擎
+
+    Example:
+        >>> async with DownloadEngine(concurrent=16) as engine:
+        ...     tasks = [DownloadTask(url, Path("./downloads")) for url in urls]
+        ...     outcomes = await engine.run(tasks)
+    """
+
+    DEFAULT_CONCURRENT = 5
+    DEFAULT_PER_HOST = 6
+    DEFAULT_CHUNK_SIZE = 64 * 1024
+    DEFAULT_HOST_RATE = HostScheduler.DEFAULT_RATE
+
+    def __init__(
+        self,
+        concurrent: int = DEFAULT_CONCURRENT,
+        per_host: int = DEFAULT_PER_HOST,
+        timeout: float = 30,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0,
+        headers: Optional[Dict[str, str]] = None,
+        proxy: Optional[str] = None,
+        skip_existing: bool = True,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        store: Optional[ContentStore] = None,
+        host_rate: float = DEFAULT_HOST_RATE,
+        breaker_threshold: int = HostScheduler.DEFAULT_BREAKER_THRESHOLD,
+        breaker_cooldown: float = HostScheduler.DEFAULT_COOLDOWN,
+        validator: Optional[ImageValidator] = None,
+        transcoder: Optional[Transcoder] = None,
+        metrics: Optional[DownloadMetrics] = None
+    ):
+        """
+        初始化下载引擎
+
+        Args:
+            concurrent: 同时进行的下载数（同时也是连接池总大小）
+            per_host: 每个主机的最大连接数（批量下载时为自适应并发窗口的上限）
+            timeout: 单次请求超时（秒）
+            max_retries: 最大重试次数
+            backoff_factor: 退避系数，第 n 次重试前等待 backoff_factor * 2^(n-1) 秒
+            headers: 请求头（默认 DEFAULT_HEADERS）
+            proxy: 代理地址（未指定时读取 HTTP(S)_PROXY 环境变量）
+            skip_existing: 目标文件已存在时跳过
+            chunk_size: 流式写盘的块大小（字节）
+            store: 内容寻址存储（可选）。启用后下载时计算 SHA-256，相同内容只保存一份，
+                输出目录中为指向存储对象的链接，未指定文件名时以摘要前 16 位命名
+            host_rate: 每个主机的最大请求速率（请求/秒）
+            breaker_threshold: 主机连续失败多少次后熔断
+            breaker_cooldown: 首次熔断的暂停时间（秒）
+            validator: 图片校验器（可选）。收到文件头即校验魔数和尺寸，不合格时中止下载且不重试
+            transcoder: 转码器（可选）。下载完成后转换格式/缩小尺寸，文件扩展名随之改变
+            metrics: 指标收集（可选）。按工作协程记录每次请求的结果、延迟、大小和各主机流量
+        """
+        if concurrent < 1:
+            raise ValueError(f"concurrent 必须大于 0: {concurrent}")
+
+        self.concurrent = concurrent
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.headers = headers or DEFAULT_HEADERS.copy()
+        self.proxy = proxy
+        self.skip_existing = skip_existing
+        self.chunk_size = chunk_size
+        self.store = store
+        self.host_rate = host_rate
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.validator = validator
+        self.transcoder = transcoder
+        self.metrics = metrics
+
+        # 最近一次 run() 使用的调度器（便于查看各主机状态）
+        self.scheduler: Optional[HostScheduler] = None
+
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口"""
+        await self.close()
+
+    async def start(self) -> None:
+        """创建共享会话（需在事件循环中调用）"""
+        if self._session and not self._session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrent,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trust_env=True
+        )
+
+    async def close(self) -> None:
+        """关闭会话和连接池"""
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def _precheck(self, task: DownloadTask) -> Tuple[Optional[DownloadOutcome], Optional[str]]:
+        """
+        发起请求前的检查
+
+        Returns:
+            (结果, 文件名)：URL 无效、存储命中或文件已存在时结果非空，无需请求
+        """
+        url = task.url
+        if not url or not url.startswith(('http://', 'https://')):
+            return DownloadOutcome(task, False, error=f"无效的URL: {url}"), None
+
+        # 已在存储中的 URL 直接链接，不发起请求
+        if self.store:
+            obj = self.store.lookup(url)
+            if obj:
+                file_path = self.store.link(obj, task.output_dir, task.filename)
+                logger.info(f"存储命中，跳过下载: {file_path}")
+                return DownloadOutcome(
+                    task, True, path=str(file_path), skipped=True, size=obj.size, digest=obj.digest
+                ), None
+
+        # 文件名可由 URL 确定时，先检查是否已存在，避免发起请求
+        filename = task.filename or (filename_from_url(url) if url_extension(url) else None)
+        if filename and self.skip_existing and not self.store:
+            file_path = self._existing_output(Path(task.output_dir), filename)
+            if file_path:
+                logger.info(f"文件已存在，跳过: {file_path}")
+                return DownloadOutcome(task, True, path=str(file_path), skipped=True), None
+
+        return None, filename
+
+    async def _attempt(self, task: DownloadTask, filename: Optional[str], worker: str = "fetch") -> _Attempt:
+        """执行一次下载尝试，并记录到指标"""
+        started = time.monotonic()
+        attempt = await self._attempt_once(task, filename)
+        if self.metrics:
+            self.metrics.record_attempt(
+                worker,
+                host_of(task.url),
+                attempt.result,
+                latency=attempt.latency,
+                duration=time.monotonic() - started,
+                size=attempt.outcome.size if attempt.result == RESULT_OK else 0
+            )
+        return attempt
+
+    def _finished(self, worker: str, outcome: DownloadOutcome) -> DownloadOutcome:
+        """记录任务最终结果"""
+        if self.metrics:
+            self.metrics.record_outcome(worker, outcome.success, outcome.skipped)
+        return outcome
+
+    async def _attempt_once(self, task: DownloadTask, filename: Optional[str]) -> _Attempt:
+        """执行一次下载尝试并归类结果"""
+        url = task.url
+        timing: Dict[str, float] = {}
+        try:
+            outcome = await self._fetch_once(task, filename, timing)
+            return _Attempt(RESULT_OK, outcome, latency=timing.get('latency'))
+        except _RetryableError as e:
+            result = RESULT_THROTTLED if e.status in THROTTLE_STATUSES else RESULT_ERROR
+            return _Attempt(result, error=str(e), latency=timing.get('latency'), retry_after=e.retry_after)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+            return _Attempt(RESULT_ERROR, error=error, latency=timing.get('latency'))
+        except DownloadError as e:
+            logger.error(f"下载失败: {url} - {e}")
+            return _Attempt(
+                RESULT_FATAL,
+                DownloadOutcome(task, False, error=f"下载失败: {url} - {e}"),
+                latency=timing.get('latency')
+            )
+        except Exception as e:
+            logger.error(f"下载异常: {url} - {e}")
+            return _Attempt(RESULT_FATAL, DownloadOutcome(task, False, error=f"下载异常: {url} - {e}"))
+
+    async def fetch(self, task: DownloadTask) -> DownloadOutcome:
+        """
+        下载单个任务（失败时按退避策略重试）
+
+        批量下载请使用 run()：其重试由按主机调度器安排，不会在等待期间占用协程。
+
+        Args:
+            task: 下载任务
+
+        Returns:
+            DownloadOutcome: 下载结果，不抛出下载异常
+        """
+        outcome, filename = self._precheck(task)
+        if outcome:
+            return self._finished("fetch", outcome)
+
+        await self.start()
+
+        for attempt in range(self.max_retries + 1):
+            result = await self._attempt(task, filename)
+            if result.outcome:
+                return self._finished("fetch", result.outcome)
+            if attempt < self.max_retries:
+                logger.debug(f"下载重试 ({attempt + 1}/{self.max_retries}): {task.url} - {result.error}")
+                await asyncio.sleep(result.retry_after or self.backoff_factor * (2 ** attempt))
+
+        logger.error(f"下载失败: {task.url} - {result.error}")
+        return self._finished("fetch", DownloadOutcome(task, False, error=f"下载失败: {task.url} - {result.error}"))
+
+    def _existing_output(self, output_dir: Path, filename: str) -> Optional[Path]:
+        """
+        查找已存在的输出文件
+
+        配置了转码格式时，文件可能已以目标扩展名保存（动图不转码，保持原扩展名），两者都检查
+        """
+        candidates = [output_dir / filename]
+        extension = self.transcoder.extension if self.transcoder else None
+        if extension:
+            candidates.insert(0, output_dir / Path(filename).with_suffix(extension))
+        return next((path for path in candidates if path.exists()), None)
+
+    def _part_path(self, task: DownloadTask) -> Path:
+        """
+        未完成下载的临时文件路径
+
+        由 URL 和输出位置（目录 + 指定文件名）确定，中断后重新执行同一任务时可找到并续传；
+        同一 URL 输出到不同文件的任务各自使用独立的临时文件
+        """
+        key = f"{task.url}\0{Path(task.output_dir).resolve()}\0{task.filename or ''}"
+        name = f".{hashlib.md5(key.encode()).hexdigest()}.part"
+        if self.store:
+            return self.store.tmp_dir / name
+        return Path(task.output_dir) / name
+
+    async def _fetch_once(
+        self,
+        task: DownloadTask,
+        filename: Optional[str],
+        timing: Optional[Dict[str, float]] = None
+    ) -> DownloadOutcome:
+        """
+        发起一次请求并流式写入 .part 临时文件，完成后原子重命名
+
+        .part 文件已存在时通过 HTTP Range 从断点继续；服务器不支持 Range 时从头下载。
+        timing 非空时写入响应头到达耗时 latency（秒）
+        """
+        url = task.url
+        part_path = self._part_path(task)
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+
+        started = time.monotonic()
+        async with self._session.get(url, proxy=self.proxy, headers=headers, allow_redirects=True) as response:
+            if timing is not None:
+                timing['latency'] = time.monotonic() - started
+            if response.status == 416 and offset:
+                # 断点超出文件范围（文件已变化），丢弃临时文件重新下载
+                part_path.unlink(missing_ok=True)
+                raise _RetryableError("续传位置无效，重新下载")
+            if response.status in RETRY_STATUSES:
+                retry_after = response.headers.get('Retry-After', '')
+                raise _RetryableError(
+                    f"HTTP {response.status}",
+                    float(retry_after) if retry_after.isdigit() else None,
+                    status=response.status
+                )
+            if response.status >= 400:
+                raise DownloadError(f"HTTP {response.status} {response.reason}")
+            if offset and response.status != 206:
+                offset = 0  # 服务器忽略了 Range，从头写入
+
+            content_type = response.headers.get('Content-Type', '')
+            if not content_type.startswith('image/') and not self.validator:
+                # 某些CDN可能不返回正确的content-type，继续下载
+                logger.warning(f"Content-Type不是图片: {content_type}, URL: {url}")
+
+            output_dir = Path(task.output_dir)
+            output_name = filename or filename_from_url(url, content_type)
+            if not self.store:
+                output_dir.mkdir(parents=True, exist_ok=True)
+                existing = self._existing_output(output_dir, output_name) if self.skip_existing else None
+                if existing:
+                    logger.info(f"文件已存在，跳过: {existing}")
+                    part_path.unlink(missing_ok=True)
+                    return DownloadOutcome(task, True, path=str(existing), skipped=True)
+
+            hasher = hashlib.sha256()
+            if offset:
+                logger.debug(f"断点续传: {url} 从 {offset} bytes 开始")
+                self._hash_file(part_path, hasher)
+            try:
+                written = await self._stream_to_file(response, part_path, hasher, offset)
+            except InvalidImageError as e:
+                part_path.unlink(missing_ok=True)
+                raise DownloadError(f"无效图片: {e}")
+
+        size = offset + written
+        extension = source_extension = extension_for(url, content_type)
+        if self.validator or self.transcoder:
+            try:
+                if self.validator:
+                    self.validator.check_size(size)
+                if self.transcoder:
+                    size, extension, hasher = await self._transcode(part_path, size, extension, hasher)
+            except InvalidImageError as e:
+                part_path.unlink(missing_ok=True)
+                raise DownloadError(f"无效图片: {e}")
+
+        digest = hasher.hexdigest()
+        if self.store:
+            obj = self.store.commit(part_path, digest, extension, url=url)
+            file_path = self.store.link(obj, task.output_dir, task.filename)
+        else:
+            # 扩展名以实际转码结果为准（动图等未转码的文件保持原名）
+            if extension != source_extension:
+                output_name = str(Path(output_name).with_suffix(extension))
+            file_path = output_dir / output_name
+            os.replace(part_path, file_path)
+
+        logger.info(f"下载成功: {file_path} ({size / 1024:.1f} KB)")
+        return DownloadOutcome(task, True, path=str(file_path), size=size, digest=digest)
+
+    async def _transcode(self, part_path: Path, size: int, extension: str, hasher):
+        """
+        转码已下载的临时文件（原地替换）
+
+        Returns:
+            (大小, 扩展名, 哈希)：未转码时原样返回
+        """
+        try:
+            output = await self.transcoder.apply(part_path)
+        except Exception as e:
+            raise InvalidImageError(f"无法解码: {e}")
+        if output is None:
+            return size, extension, hasher
+
+        os.replace(output, part_path)
+        hasher = hashlib.sha256()
+        self._hash_file(part_path, hasher)
+        new_size = part_path.stat().st_size
+        logger.debug(f"转码: {size / 1024:.1f} KB -> {new_size / 1024:.1f} KB")
+        return new_size, self.transcoder.extension or extension, hasher
+
+    def _hash_file(self, path: Path, hasher) -> None:
+        """将已有文件内容计入哈希（续传时）"""
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                hasher.update(chunk)
+
+    async def _stream_to_file(
+        self,
+        response: aiohttp.ClientResponse,
+        file_path: Path,
+        hasher=None,
+        offset: int = 0
+    ) -> int:
+        """
+        流式写入响应体并更新哈希
+
+        offset > 0 时追加到已有内容之后。中断或不完整时保留已写入部分供续传，
+        并抛出可重试错误。设置了校验器时，文件头足以判定前持续校验，
+        不合格时抛出 InvalidImageError（此时剩余响应体不再读取）
+        """
+        expected = response.content_length or 0
+        written = 0
+
+        header = None
+        if self.validator:
+            header = bytearray()
+            if offset:
+                with open(file_path, 'rb') as f:
+                    header += f.read(HEADER_LIMIT)
+                if self.validator.check_header(bytes(header)):
+                    header = None
+
+        with open(file_path, 'ab' if offset else 'wb') as f:
+            async for chunk in response.content.iter_chunked(self.chunk_size):
+                if header is not None:
+                    header += chunk
+                    if self.validator.check_header(bytes(header)):
+                        header = None
+                f.write(chunk)
+                if hasher:
+                    hasher.update(chunk)
+                written += len(chunk)
+
+        if expected and written != expected:
+            raise _RetryableError(f"下载不完整: {written}/{expected} bytes")
+        if header is not None:
+            self.validator.check_header(bytes(header), final=True)
+        return written
+
+    def _new_scheduler(self) -> HostScheduler:
+        """创建按主机调度器，并保留为 self.scheduler 便于查看各主机状态"""
+        self.scheduler = HostScheduler(
+            per_host=self.per_host,
+            rate=self.host_rate,
+            breaker_threshold=self.breaker_threshold,
+            cooldown=self.breaker_cooldown
+        )
+        return self.scheduler
+
+    async def _work(
+        self,
+        scheduler: HostScheduler,
+        name: str,
+        finish: Callable[[Any, DownloadOutcome, str], None]
+    ) -> None:
+        """工作协程：从调度器取任务执行，失败时经调度器重新排队，直到没有任务"""
+        while True:
+            acquired = await scheduler.acquire()
+            if acquired is None:
+                return
+            item, host = acquired
+            key, task, filename, attempts = item
+
+            attempt = await self._attempt(task, filename, name)
+            scheduler.release(host, attempt.result, attempt.latency, attempt.retry_after)
+
+            if attempt.outcome:
+                finish(key, attempt.outcome, name)
+            elif attempts < self.max_retries:
+                item[3] = attempts + 1
+                logger.debug(f"下载重试 ({attempts + 1}/{self.max_retries}): {task.url} - {attempt.error}")
+                scheduler.requeue(host, item)
+            else:
+                logger.error(f"下载失败: {task.url} - {attempt.error}")
+                finish(key, DownloadOutcome(task, False, error=f"下载失败: {task.url} - {attempt.error}"), name)
+
+            self._finish_abandoned(scheduler, finish, name)
+
+    @staticmethod
+    def _finish_abandoned(scheduler: HostScheduler, finish: Callable, name: str) -> None:
+        """被放弃主机上的剩余任务直接记为失败"""
+        for key, task, _, _ in scheduler.take_abandoned():
+            finish(key, DownloadOutcome(task, False, error=f"主机不可用，已放弃: {task.url}"), name)
+
+    async def run(
+        self,
+        tasks: Iterable[DownloadTask],
+        on_done: Optional[Callable[[DownloadOutcome], None]] = None
+    ) -> List[DownloadOutcome]:
+        """
+        并发执行一批下载任务
+
+        concurrent 个工作协程从按主机调度器（HostScheduler）取任务：每个主机独立限速、
+        按延迟和 429/503 调整并发，连续失败的主机被熔断暂停，其任务排到队列末尾，
+        其余主机的下载不受影响。重试同样经由调度器安排，等待期间不占用协程。
+
+        Args:
+            tasks: 下载任务
+            on_done: 每个任务完成时的回调（在事件循环线程中调用）
+
+        Returns:
+            List[DownloadOutcome]: 与输入顺序一致的结果列表
+        """
+        tasks = list(tasks)
+        outcomes: List[Optional[DownloadOutcome]] = [None] * len(tasks)
+        if not tasks:
+            return []
+
+        def finish(index: int, outcome: DownloadOutcome, worker: str = "precheck") -> None:
+            outcomes[index] = self._finished(worker, outcome)
+            if on_done:
+                on_done(outcome)
+
+        scheduler = self._new_scheduler()
+        for index, task in enumerate(tasks):
+            outcome, filename = self._precheck(task)
+            if outcome:
+                finish(index, outcome)
+            else:
+                # [序号, 任务, 文件名, 已尝试次数]
+                scheduler.add(task.url, [index, task, filename, 0])
+
+        if not scheduler.pending:
+            return outcomes
+
+        await self.start()
+        await asyncio.gather(
+            *(self._work(scheduler, f"worker-{i}", finish) for i in range(min(self.concurrent, len(tasks))))
+        )
+        logger.debug(f"主机调度状态: {scheduler.snapshot()}")
+        return outcomes
+
+    async def run_stream(
+        self,
+        tasks: AsyncIterable[DownloadTask],
+        on_done: Optional[Callable[[DownloadOutcome], None]] = None,
+        max_pending: Optional[int] = None
+    ) -> int:
+        """
+        流式执行下载任务：边接收任务边下载
+
+        与 run() 使用同一调度策略，但任务来自异步迭代器（如正在滚动的爬虫或逐行读取的 stdin），
+        第一个任务到达即开始下载。排队任务达到 max_pending 时暂停读取输入，内存占用不随输入规模增长；
+        结果只通过 on_done 回调返回。
+
+        Args:
+            tasks: 下载任务的异步迭代器
+            on_done: 每个任务完成时的回调（在事件循环线程中调用）
+            max_pending: 排队和进行中任务数上限，默认 concurrent * 4
+
+        Returns:
+            int: 接收的任务总数
+        """
+        max_pending = max_pending or self.concurrent * 4
+        received = 0
+
+        def finish(_key: Any, outcome: DownloadOutcome, worker: str = "precheck") -> None:
+            self._finished(worker, outcome)
+            if on_done:
+                on_done(outcome)
+
+        scheduler = self._new_scheduler()
+        scheduler.open_input()
+
+        async def feed() -> None:
+            nonlocal received
+            try:
+                async for task in tasks:
+                    received += 1
+                    outcome, filename = self._precheck(task)
+                    if outcome:
+                        finish(None, outcome)
+                        continue
+                    await scheduler.wait_capacity(max_pending)
+                    scheduler.add(task.url, [None, task, filename, 0])
+                    self._finish_abandoned(scheduler, finish, "precheck")
+            finally:
+                scheduler.close_input()
+
+        await self.start()
+        results = await asyncio.gather(
+            feed(),
+            *(self._work(scheduler, f"worker-{i}", finish) for i in range(self.concurrent)),
+            return_exceptions=True
+        )
+        logger.debug(f"主机调度状态: {scheduler.snapshot()}")
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return received
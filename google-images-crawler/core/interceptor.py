@@ -0,0 +1,160 @@
+"""
+Google 图片网络响应拦截模块
+监听 Playwright 页面响应，直接从 Google 返回的搜索结果数据（首屏 HTML 内嵌数据、
+batchexecute / async 分页接口）中解析原图 URL、尺寸和来源网页，无需等待缩略图渲染
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import re
+from typing import List, Optional, Set, Dict, Any, Callable
+
+from playwright.async_api import Page, Response
+
+
+# 缩略图与原图元组: ["https://encrypted-tbn0.gstatic.com/images?...",h,w],["https://原图",h,w]
+_IMAGE_TUPLE_RE = re.compile(
+    r'\["(https://encrypted-tbn\d\.gstatic\.com/images\?[^"]+)",(\d+),(\d+)\],'
+    r'\["(https?://[^"]+)",(\d+),(\d+)\]'
+)
+
+# 来源信息块: "2003":[null,"<docid>","<来源网页>","<标题>",...]
+_SOURCE_RE = re.compile(r'"2003":\[null,"[^"]*","(https?://[^"]+)","([^"]*)"')
+
+# 一层 JSON 字符串转义（batchexecute 响应中数据以字符串形式嵌套）
+_ESCAPED_CHAR_RE = re.compile(r'\\(["\\/])')
+_UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
+
+# 需要解析的响应 URL 特征
+RESULT_URL_PATTERNS = ("batchexecute", "/search?", "/async/")
+
+# 需要解析的资源类型
+RESULT_RESOURCE_TYPES = ("document", "xhr", "fetch")
+
+
+def _decode_unicode_escapes(value: str) -> str:
+    """解码 \\uXXXX 转义（如 \\u003d -> =）"""
+    return _UNICODE_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)), value)
+
+
+def _unescape_layers(text: str, max_layers: int = 2):
+    """依次产出原文及逐层去除 JSON 字符串转义后的文本"""
+    yield text
+    for _ in range(max_layers):
+        if '\\"' not in text:
+            break
+        text = _ESCAPED_CHAR_RE.sub(r'\1', text)
+        yield text
+
+
+def parse_image_metadata(text: str) -> List[Dict[str, Any]]:
+    """
+    从 Google 图片搜索响应文本中解析图片元数据
+
+    Args:
+        text: 响应正文（HTML、batchexecute 或 async 响应）
+
+    Returns:
+        List[Dict]: 与 DOM 提取路径相同结构的图片信息字典列表
+            (original_url, thumbnail_url, source_url, title, width, height)
+    """
+    results: List[Dict[str, Any]] = []
+    seen: Set[str] = set()
+
+    if not text:
+        return results
+
+    for layer in _unescape_layers(text):
+        matches = list(_IMAGE_TUPLE_RE.finditer(layer))
+        for i, match in enumerate(matches):
+            original_url = _decode_unicode_escapes(match.group(4))
+            if original_url in seen:
+                continue
+            seen.add(original_url)
+
+            # 来源信息位于当前元组之后、下一个元组之前
+            window_end = matches[i + 1].start() if i + 1 < len(matches) else len(layer)
+            source = _SOURCE_RE.search(layer, match.end(), window_end)
+
+            results.append({
+                "original_url": original_url,
+                "thumbnail_url": _decode_unicode_escapes(match.group(1)),
+                "source_url": _decode_unicode_escapes(source.group(1)) if source else "",
+                "title": _decode_unicode_escapes(source.group(2)) if source else "",
+                "height": int(match.group(5)),
+                "width": int(match.group(6)),
+            })
+
+    return results
+
+
+class ResponseHarvester:
+    """
+    响应拦截收集器
+
+    挂载到页面后，解析匹配的搜索结果响应并缓存新发现的图片，
+    由爬虫在滚动循环中通过 drain() 取走
+    """
+
+    def __init__(self, is_valid_url: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            is_valid_url: 原图 URL 校验函数（可选）
+        """
+        self.is_valid_url = is_valid_url
+        self._pending: List[Dict[str, Any]] = []
+        self._seen: Set[str] = set()
+        self.intercepted = 0  # 当前搜索中解析出的图片总数
+
+    def attach(self, page: Page) -> None:
+        """开始监听页面响应"""
+        page.on("response", self._on_response)
+
+    def detach(self, page: Page) -> None:
+        """停止监听页面响应"""
+        page.remove_listener("response", self._on_response)
+
+    def reset(self) -> None:
+        """开始新的搜索前清空状态"""
+        self._pending = []
+        self._seen = set()
+        self.intercepted = 0
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """取走自上次调用以来新解析到的图片"""
+        items, self._pending = self._pending, []
+        return items
+
+    @staticmethod
+    def is_result_response(response: Response) -> bool:
+        """判断响应是否可能包含搜索结果数据"""
+        if response.request.resource_type not in RESULT_RESOURCE_TYPES:
+            return False
+        url = response.url
+        return "google." in url and any(p in url for p in RESULT_URL_PATTERNS)
+
+    async def _on_response(self, response: Response) -> None:
+        """响应回调：解析并缓存新图片"""
+        if not self.is_result_response(response) or response.status != 200:
+            return
+
+        try:
+            text = await response.text()
+        except Exception as e:
+            # 页面跳转或响应体已释放
+            logger.debug(f"读取响应失败: {response.url[:80]} - {e}")
+            return
+
+        for item in parse_image_metadata(text):
+            url = item["original_url"]
+            if url in self._seen:
+                continue
+            if self.is_valid_url and not self.is_valid_url(url):
+                continue
+            self._seen.add(url)
+            self._pending.append(item)
+            self.intercepted += 1
@@ -0,0 +1,182 @@
+"""
+下载任务清单模块
+以追加写入的 JSONL 文件记录每个 URL 的下载状态、字节数、摘要和错误，
+进程中断后可据此跳过已完成的 URL 继续执行
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, Iterable, List
+
+
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+class JobManifest:
+    """
+    下载任务清单（追加写入的 JSONL）
+
+    每完成一个 URL 追加一行:
+        {"url": "...", "state": "done", "path": "...", "bytes": 1234, "digest": "...", "error": null, "ts": ...}
+
+    打开时按行重放，同一 URL 以最后一条记录为准；文件末尾不完整的行（写入时被中断）会被截掉，
+    之后的记录从新行开始追加。
+
+    Example:
+        >>> with JobManifest("./downloads/download-manifest.jsonl") as manifest:
+        ...     pending = [u for u in urls if not manifest.completed(u)]
+    """
+
+    def __init__(self, path: str, fsync: bool = False):
+        """
+        打开（或创建）任务清单
+
+        Args:
+            path: JSONL 文件路径
+            fsync: 每条记录后是否 fsync（更安全，但在慢速磁盘上更慢）
+        """
+        self.path = Path(path)
+        self.fsync = fsync
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        """重放已有记录"""
+        if not self.path.exists():
+            return
+
+        self._truncate_partial_line()
+        skipped = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    self._entries[entry["url"]] = entry
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    skipped += 1
+
+        if skipped:
+            logger.warning(f"任务清单中有 {skipped} 行无法解析，已忽略: {self.path}")
+        logger.info(f"载入任务清单: {self.path} ({len(self._entries)} 个 URL)")
+
+    def _truncate_partial_line(self) -> None:
+        """去掉末尾未以换行结束的行（写入时被中断），否则下一条记录会接在它后面而一起丢失"""
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+
+            # 从末尾向前查找最后一个换行符
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                block = f.read(end - start)
+                index = block.rfind(b"\n")
+                if index >= 0:
+                    end = start + index + 1
+                    break
+                end = start
+            f.truncate(end)
+        logger.warning(f"任务清单末尾有不完整的记录，已截掉 {size - end} bytes: {self.path}")
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """获取 URL 的最新记录"""
+        return self._entries.get(url)
+
+    def completed(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        查询已完成且文件仍存在的记录
+
+        Returns:
+            Optional[Dict]: 已完成时返回记录，否则 None
+        """
+        entry = self._entries.get(url)
+        if entry and entry.get("state") == STATE_DONE and entry.get("path") and Path(entry["path"]).exists():
+            return entry
+        return None
+
+    def pending(self, urls: Iterable[str]) -> List[str]:
+        """过滤出尚未完成的 URL（保持顺序）"""
+        return [url for url in urls if not self.completed(url)]
+
+    def record(
+        self,
+        url: str,
+        state: str,
+        path: Optional[str] = None,
+        size: int = 0,
+        digest: Optional[str] = None,
+        error: Optional[str] = None
+    ) -> None:
+        """
+        追加一条记录
+
+        Args:
+            url: 图片 URL
+            state: done / failed
+            path: 文件路径
+            size: 字节数
+            digest: 内容 SHA-256
+            error: 失败原因
+        """
+        entry = {
+            "url": url,
+            "state": state,
+            "path": path,
+            "bytes": size,
+            "digest": digest,
+            "error": error,
+            "ts": round(time.time(), 3),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            self._entries[url] = entry
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def counts(self) -> Dict[str, int]:
+        """各状态的 URL 数量"""
+        counts: Dict[str, int] = {}
+        for entry in self._entries.values():
+            counts[entry["state"]] = counts.get(entry["state"], 0) + 1
+        return counts
+
+    def close(self) -> None:
+        """关闭清单文件"""
+        with self._lock:
+            if self._file and not self._file.closed:
+                self._file.close()
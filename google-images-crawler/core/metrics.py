@@ -0,0 +1,339 @@
+"""
+下载指标模块
+按工作协程分片记录计数（各分片只由其所属协程写入，汇总时求和，无需加锁），
+并记录响应延迟、下载耗时和文件大小的直方图以及每个主机的流量；
+快照可导出为 JSON 或 Prometheus 文本格式，并可通过本地 HTTP 端点查看
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import bisect
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, List, Sequence
+
+
+# 直方图桶上界
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)                 # 秒
+SIZE_BUCKETS = (10e3, 50e3, 100e3, 250e3, 500e3, 1e6, 2.5e6, 5e6, 10e6, 25e6)      # 字节
+
+# 每次尝试的结果类别（与 scheduler.RESULT_* 一致）
+ATTEMPT_RESULTS = ("ok", "throttled", "error", "fatal")
+
+# 最终结果类别
+OUTCOMES = ("success", "failed", "skipped")
+
+
+class Histogram:
+    """固定桶直方图"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)   # 最后一个桶为 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """按桶线性插值估算分位数（超出最大桶时返回最大桶上界）"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket in enumerate(self.counts):
+            if bucket and seen + bucket >= rank:
+                if i >= len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[i - 1] if i else 0.0
+                return lower + (self.bounds[i] - lower) * (rank - seen) / bucket
+            seen += bucket
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 4) if value is not None else None
+
+        cumulative, buckets = 0, {}
+        for bound, bucket in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += bucket
+            buckets["+Inf" if bound == float("inf") else f"{bound:g}"] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": rounded(self.quantile(0.5)),
+            "p90": rounded(self.quantile(0.9)),
+            "p99": rounded(self.quantile(0.99)),
+            "buckets": buckets,
+        }
+
+
+class _Shard:
+    """单个工作协程的计数与直方图（只由该协程写入）"""
+
+    def __init__(self):
+        self.attempts = dict.fromkeys(ATTEMPT_RESULTS, 0)
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+        self.bytes = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.duration = Histogram(LATENCY_BUCKETS)
+        self.size = Histogram(SIZE_BUCKETS)
+        # 主机 -> [字节数, 传输耗时, 请求数, 失败数]
+        self.hosts: Dict[str, List[float]] = {}
+
+
+class DownloadMetrics:
+    """
+    下载指标
+
+    Example:
+        >>> metrics = DownloadMetrics()
+        >>> engine = DownloadEngine(metrics=metrics)
+        >>> ...
+        >>> print(metrics.to_json())
+        >>> server = MetricsServer(metrics, port=9108).start()   # GET /metrics, /metrics.json
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self._shards: Dict[str, _Shard] = {}
+
+    def shard(self, worker: str) -> _Shard:
+        """获取工作协程的分片（首次使用时创建）"""
+        shard = self._shards.get(worker)
+        if shard is None:
+            shard = self._shards.setdefault(worker, _Shard())
+        return shard
+
+    def record_attempt(
+        self,
+        worker: str,
+        host: str,
+        result: str,
+        latency: Optional[float] = None,
+        duration: Optional[float] = None,
+        size: int = 0
+    ) -> None:
+        """
+        记录一次请求
+
+        Args:
+            worker: 工作协程标识
+            host: 主机名
+            result: ok / throttled / error / fatal
+            latency: 响应头到达耗时（秒）
+            duration: 整个请求耗时（秒）
+            size: 下载字节数（成功时）
+        """
+        shard = self.shard(worker)
+        shard.attempts[result] = shard.attempts.get(result, 0) + 1
+        if latency is not None:
+            shard.latency.observe(latency)
+        if duration is not None:
+            shard.duration.observe(duration)
+
+        traffic = shard.hosts.get(host)
+        if traffic is None:
+            traffic = shard.hosts[host] = [0, 0.0, 0, 0]
+        traffic[2] += 1
+        if result == "ok":
+            if size:
+                shard.bytes += size
+                shard.size.observe(size)
+                traffic[0] += size
+            if duration is not None:
+                traffic[1] += duration
+        else:
+            traffic[3] += 1
+
+    def record_outcome(self, worker: str, success: bool, skipped: bool = False) -> None:
+        """记录一个任务的最终结果"""
+        outcome = "skipped" if skipped else ("success" if success else "failed")
+        self.shard(worker).outcomes[outcome] += 1
+
+    def totals(self) -> Dict[str, int]:
+        """各最终结果的总数"""
+        totals = dict.fromkeys(OUTCOMES, 0)
+        for shard in list(self._shards.values()):
+            for key, value in shard.outcomes.items():
+                totals[key] += value
+        return totals
+
+    @staticmethod
+    def _merge(histograms: List[Histogram], bounds: Sequence[float]) -> Histogram:
+        merged = Histogram(bounds)
+        for histogram in histograms:
+            merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+            merged.sum += histogram.sum
+            merged.count += histogram.count
+        return merged
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        当前指标快照
+
+        Returns:
+            Dict: elapsed, bytes, bytes_per_sec, outcomes, attempts, latency, duration, size, hosts, workers
+        """
+        shards = list(self._shards.items())
+        elapsed = max(time.time() - self.started, 1e-9)
+
+        attempts = dict.fromkeys(ATTEMPT_RESULTS, 0)
+        hosts: Dict[str, Dict[str, Any]] = {}
+        workers: Dict[str, Dict[str, Any]] = {}
+        total_bytes = 0
+        for worker, shard in shards:
+            for key, value in list(shard.attempts.items()):
+                attempts[key] = attempts.get(key, 0) + value
+            total_bytes += shard.bytes
+            for host, (size, seconds, requests, errors) in list(shard.hosts.items()):
+                entry = hosts.setdefault(host, {"bytes": 0, "seconds": 0.0, "requests": 0, "errors": 0})
+                entry["bytes"] += size
+                entry["seconds"] += seconds
+                entry["requests"] += requests
+                entry["errors"] += errors
+            workers[worker] = {
+                "attempts": sum(shard.attempts.values()),
+                "bytes": shard.bytes,
+                **shard.outcomes,
+            }
+
+        for entry in hosts.values():
+            entry["bytes_per_sec"] = round(entry["bytes"] / entry["seconds"]) if entry["seconds"] else 0
+            entry["seconds"] = round(entry["seconds"], 3)
+
+        return {
+            "elapsed": round(elapsed, 3),
+            "bytes": total_bytes,
+            "bytes_per_sec": round(total_bytes / elapsed),
+            "outcomes": self.totals(),
+            "attempts": attempts,
+            "latency": self._merge([s.latency for _, s in shards], LATENCY_BUCKETS).snapshot(),
+            "duration": self._merge([s.duration for _, s in shards], LATENCY_BUCKETS).snapshot(),
+            "size": self._merge([s.size for _, s in shards], SIZE_BUCKETS).snapshot(),
+            "hosts": hosts,
+            "workers": workers,
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """JSON 格式快照"""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "image_download") -> str:
+        """Prometheus 文本格式（text/plain; version=0.0.4）"""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[tuple]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{suffix}{{{label_text}}} {value}" if labels
+                             else f"{prefix}_{name}{suffix} {value}")
+
+        def histogram(name: str, help_text: str, data: Dict[str, Any]) -> None:
+            samples = [("_bucket", {"le": le}, count) for le, count in data["buckets"].items()]
+            samples += [("_sum", {}, data["sum"]), ("_count", {}, data["count"])]
+            metric(name, "histogram", help_text, samples)
+
+        metric("outcomes_total", "counter", "Finished downloads by outcome",
+               [("", {"outcome": k}, v) for k, v in snapshot["outcomes"].items()])
+        metric("attempts_total", "counter", "HTTP attempts by result",
+               [("", {"result": k}, v) for k, v in snapshot["attempts"].items()])
+        metric("bytes_total", "counter", "Downloaded bytes", [("", {}, snapshot["bytes"])])
+        histogram("latency_seconds", "Time to response headers", snapshot["latency"])
+        histogram("duration_seconds", "Total request duration", snapshot["duration"])
+        histogram("size_bytes", "Downloaded file size", snapshot["size"])
+        metric("host_bytes_total", "counter", "Downloaded bytes per host",
+               [("", {"host": h}, e["bytes"]) for h, e in snapshot["hosts"].items()])
+        metric("host_requests_total", "counter", "HTTP attempts per host",
+               [("", {"host": h}, e["requests"]) for h, e in snapshot["hosts"].items()])
+        metric("host_errors_total", "counter", "Failed HTTP attempts per host",
+               [("", {"host": h}, e["errors"]) for h, e in snapshot["hosts"].items()])
+        metric("host_throughput_bytes_per_second", "gauge", "Transfer throughput per host",
+               [("", {"host": h}, e["bytes_per_sec"]) for h, e in snapshot["hosts"].items()])
+        metric("worker_attempts_total", "counter", "HTTP attempts per worker",
+               [("", {"worker": w}, e["attempts"]) for w, e in snapshot["workers"].items()])
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsServer:
+    """
+    本地指标 HTTP 端点（后台线程）
+
+    GET /metrics 返回 Prometheus 文本格式，GET /metrics.json 返回 JSON 快照
+    """
+
+    def __init__(self, metrics: DownloadMetrics, port: int = 0, host: str = "127.0.0.1"):
+        """
+        Args:
+            metrics: 指标对象
+            port: 监听端口，0 表示随机分配
+            host: 监听地址（默认仅本机）
+        """
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        """启动服务"""
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/metrics":
+                    body, content_type = metrics.to_prometheus(), "text/plain; version=0.0.4"
+                elif path in ("/", "/metrics.json"):
+                    body, content_type = metrics.to_json(), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug("指标请求: " + format % args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"指标端点: http://{self.host}:{self.port}/metrics")
+        return self
+
+    def close(self) -> None:
+        """停止服务"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
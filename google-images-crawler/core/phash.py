@@ -0,0 +1,310 @@
+"""
+感知哈希近似去重模块
+在缩略图上批量计算 aHash / dHash / pHash（NumPy 向量化），用 BK 树做汉明距离半径查询，
+在下载原图之前剔除同一图片的不同分辨率/重新编码版本
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import base64
+import io
+from typing import List, Optional, Dict, Any, Tuple, Sequence
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError:  # 可选依赖，仅近似去重功能需要
+    np = None
+    Image = None
+
+
+HASH_KINDS = ("ahash", "dhash", "phash")
+
+# 64 位哈希之间的默认汉明距离阈值
+DEFAULT_RADIUS = 8
+
+_HASH_SIZE = 8          # 哈希边长（8x8 = 64 位）
+_DCT_SIZE = 32          # pHash 的 DCT 输入边长
+
+
+def _require_deps() -> None:
+    if np is None or Image is None:
+        raise ImportError("近似去重需要 numpy 和 Pillow，请运行: pip install numpy pillow")
+
+
+def hamming(a: int, b: int) -> int:
+    """两个哈希之间的汉明距离"""
+    return bin(a ^ b).count("1")
+
+
+def _dct_matrix(n: int):
+    """正交 DCT-II 变换矩阵"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+def _pack_bits(bits) -> List[int]:
+    """将 (N, 64) 布尔矩阵按行打包为 64 位整数"""
+    packed = np.packbits(bits.astype(np.uint8), axis=1)
+    return [int(v) for v in packed.view(">u8").ravel()]
+
+
+def _prepare(images: Sequence["Image.Image"]) -> Tuple[Any, Any]:
+    """将图片缩放为灰度矩阵: (N, 32, 32) 用于 aHash/pHash，(N, 8, 9) 用于 dHash"""
+    square, wide = [], []
+    for image in images:
+        gray = image.convert("L")
+        square.append(np.asarray(gray.resize((_DCT_SIZE, _DCT_SIZE), Image.LANCZOS), dtype=np.float64))
+        wide.append(np.asarray(gray.resize((_HASH_SIZE + 1, _HASH_SIZE), Image.LANCZOS), dtype=np.float64))
+    return np.stack(square), np.stack(wide)
+
+
+def compute_hashes(images: Sequence["Image.Image"]) -> List[Dict[str, int]]:
+    """
+    批量计算感知哈希
+
+    Args:
+        images: PIL 图片列表
+
+    Returns:
+        List[Dict[str, int]]: 每张图片的 {"ahash", "dhash", "phash"}（64 位整数）
+    """
+    _require_deps()
+    if not images:
+        return []
+
+    square, wide = _prepare(images)
+    n = len(images)
+
+    # aHash: 32x32 按 4x4 块求均值得到 8x8，与整体均值比较
+    block = _DCT_SIZE // _HASH_SIZE
+    small = square.reshape(n, _HASH_SIZE, block, _HASH_SIZE, block).mean(axis=(2, 4))
+    ahash_bits = small.reshape(n, -1) > small.reshape(n, -1).mean(axis=1, keepdims=True)
+
+    # dHash: 相邻像素水平梯度的符号
+    dhash_bits = (wide[:, :, 1:] > wide[:, :, :-1]).reshape(n, -1)
+
+    # pHash: 二维 DCT 取左上 8x8 低频系数，与中位数（不含直流分量）比较
+    dct = _dct_matrix(_DCT_SIZE)
+    coeffs = (dct @ square @ dct.T)[:, :_HASH_SIZE, :_HASH_SIZE].reshape(n, -1)
+    median = np.median(coeffs[:, 1:], axis=1, keepdims=True)
+    phash_bits = coeffs > median
+
+    return [
+        {"ahash": a, "dhash": d, "phash": p}
+        for a, d, p in zip(_pack_bits(ahash_bits), _pack_bits(dhash_bits), _pack_bits(phash_bits))
+    ]
+
+
+class BKTree:
+    """
+    基于汉明距离的 BK 树
+
+    查询半径 r 内的所有哈希时，利用三角不等式只访问距离在 [d-r, d+r] 内的子树
+    """
+
+    def __init__(self):
+        # 节点: [hash, value, {distance: child}]
+        self._root: Optional[list] = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, hash_value: int, value: Any) -> None:
+        """插入哈希及其关联值"""
+        node = [hash_value, value, {}]
+        self._size += 1
+        if self._root is None:
+            self._root = node
+            return
+
+        current = self._root
+        while True:
+            distance = hamming(hash_value, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+
+    def search(self, hash_value: int, radius: int) -> List[Tuple[int, Any]]:
+        """
+        查询半径内的所有条目
+
+        Returns:
+            List[Tuple[int, Any]]: (距离, 关联值) 列表，按距离升序
+        """
+        if self._root is None:
+            return []
+
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming(hash_value, node[0])
+            if distance <= radius:
+                found.append((distance, node[1]))
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+
+        found.sort(key=lambda item: item[0])
+        return found
+
+
+class NearDuplicateFilter:
+    """
+    增量近似去重过滤器
+
+    每次 check() 一个哈希：与已接受的哈希距离不超过 radius 时视为重复，
+    否则接受并加入索引。可跨多批结果持续使用。
+    """
+
+    def __init__(self, kind: str = "phash", radius: int = DEFAULT_RADIUS):
+        """
+        Args:
+            kind: 使用的哈希类型 (ahash/dhash/phash)
+            radius: 汉明距离阈值（64 位中不同的位数）
+        """
+        if kind not in HASH_KINDS:
+            raise ValueError(f"不支持的哈希类型: {kind}，可选: {', '.join(HASH_KINDS)}")
+        self.kind = kind
+        self.radius = radius
+        self._tree = BKTree()
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def check(self, hashes: Dict[str, int], key: Any) -> Optional[Any]:
+        """
+        检查并登记
+
+        Args:
+            hashes: compute_hashes 返回的哈希字典
+            key: 关联值（如图片 URL）
+
+        Returns:
+            Optional[Any]: 重复时返回最相近的已接受条目的 key，否则 None（并登记）
+        """
+        hash_value = hashes[self.kind]
+        matches = self._tree.search(hash_value, self.radius)
+        if matches:
+            return matches[0][1]
+        self._tree.add(hash_value, key)
+        return None
+
+
+def decode_data_uri(uri: str) -> Optional[bytes]:
+    """解码 base64 data: URI，非 base64 时返回 None"""
+    header, _, data = uri.partition(",")
+    if not header.startswith("data:") or ";base64" not in header:
+        return None
+    try:
+        return base64.b64decode(data)
+    except (ValueError, TypeError):
+        return None
+
+
+async def _load_thumbnail(session, url: str, semaphore: asyncio.Semaphore) -> Optional[bytes]:
+    """读取缩略图字节（data: URI 直接解码，http(s) 发起请求）"""
+    if url.startswith("data:"):
+        return decode_data_uri(url)
+    if not url.startswith(("http://", "https://")):
+        return None
+
+    async with semaphore:
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.read()
+        except Exception as e:
+            logger.debug(f"缩略图下载失败: {url[:80]} - {e}")
+            return None
+
+
+def _open_image(data: Optional[bytes]) -> Optional["Image.Image"]:
+    if not data:
+        return None
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+    except Exception:
+        return None
+
+
+async def filter_near_duplicates(
+    results: Sequence[Any],
+    kind: str = "phash",
+    radius: int = DEFAULT_RADIUS,
+    concurrency: int = 16,
+    dedupe_filter: Optional[NearDuplicateFilter] = None
+) -> List[Any]:
+    """
+    基于缩略图剔除近似重复的搜索结果
+
+    同一组重复图片中保留分辨率最高的一张；缩略图无法获取的结果原样保留。
+
+    Args:
+        results: ImageResult 列表（需有 url、thumbnail_url、width、height 属性）
+        kind: 哈希类型 (ahash/dhash/phash)
+        radius: 汉明距离阈值
+        concurrency: 缩略图并发下载数
+        dedupe_filter: 复用的过滤器（跨批次去重时传入），默认新建
+
+    Returns:
+        List: 去重后的结果（保持原顺序）
+    """
+    _require_deps()
+    if not results:
+        return []
+
+    import aiohttp
+    from .engine import DEFAULT_HEADERS
+
+    semaphore = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(
+        headers=DEFAULT_HEADERS,
+        timeout=aiohttp.ClientTimeout(total=15),
+        trust_env=True
+    ) as session:
+        payloads = await asyncio.gather(
+            *(_load_thumbnail(session, r.thumbnail_url or "", semaphore) for r in results)
+        )
+
+    loop = asyncio.get_running_loop()
+    images = [_open_image(data) for data in payloads]
+    indexed = [(i, image) for i, image in enumerate(images) if image is not None]
+    hashes = await loop.run_in_executor(None, compute_hashes, [image for _, image in indexed])
+    hash_by_index = {i: h for (i, _), h in zip(indexed, hashes)}
+
+    # 不能用 `or`：空的共享过滤器 len() 为 0，会被当成假值替换掉
+    if dedupe_filter is None:
+        dedupe_filter = NearDuplicateFilter(kind, radius)
+
+    # 按分辨率从高到低登记，保证每组重复中保留最大的那张
+    order = sorted(
+        hash_by_index,
+        key=lambda i: (results[i].width or 0) * (results[i].height or 0),
+        reverse=True
+    )
+    dropped = set()
+    for i in order:
+        duplicate_of = dedupe_filter.check(hash_by_index[i], results[i].url)
+        if duplicate_of is not None:
+            dropped.add(i)
+            logger.debug(f"近似重复: {results[i].url} ~ {duplicate_of}")
+
+    if dropped:
+        logger.info(f"近似去重: {len(results)} -> {len(results) - len(dropped)}")
+    return [r for i, r in enumerate(results) if i not in dropped]
@@ -0,0 +1,320 @@
+"""
+Google 图片爬虫池模块
+共享一个常驻浏览器，维护 N 个可复用的上下文/页面，并发执行多个关键词搜索
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import List, Optional, Dict, Iterable, AsyncIterator
+from dataclasses import dataclass, field, asdict
+
+from playwright.async_api import async_playwright, Browser
+
+from .cache import CrawlCache
+from .crawler import GoogleImageCrawler, ImageResult
+
+
+@dataclass
+class KeywordResult:
+    """单个关键词的搜索结果"""
+    keyword: str                                        # 搜索关键词
+    results: List[ImageResult] = field(default_factory=list)
+    error: Optional[str] = None                         # 搜索失败时的错误信息
+
+    @property
+    def success(self) -> bool:
+        return self.error is None
+
+
+class GoogleImageCrawlerPool:
+    """
+    Google 图片爬虫池
+
+    启动一个浏览器，并在其上创建 size 个 GoogleImageCrawler（各自拥有独立的
+    BrowserContext/Page）。多个关键词通过空闲爬虫队列分发，并发数受 size 限制，
+    页面在关键词之间复用，避免重复启动 Chromium。
+
+    Example:
+        >>> async with GoogleImageCrawlerPool(size=4) as pool:
+        ...     async for item in pool.search_many(["cat", "dog"], num_images=20):
+        ...         print(item.keyword, len(item.results))
+    """
+
+    DEFAULT_SIZE = 4
+
+    def __init__(
+        self,
+        size: int = DEFAULT_SIZE,
+        headless: bool = True,
+        proxy: Optional[str] = None,
+        cache: Optional[CrawlCache] = None,
+        **crawler_kwargs
+    ):
+        """
+        初始化爬虫池
+
+        Args:
+            size: 并发页面数（同时进行的搜索数量）
+            headless: 是否无头模式运行浏览器
+            proxy: 代理服务器地址
+            cache: 爬取结果缓存（可选）。命中的关键词不占用页面，
+                全部命中时不会启动浏览器
+            **crawler_kwargs: 传递给每个 GoogleImageCrawler 的其他参数
+                (timeout, scroll_pause, max_retries 等)
+        """
+        if size < 1:
+            raise ValueError(f"size 必须大于 0: {size}")
+
+        self.size = size
+        self.headless = headless
+        self.proxy = proxy
+        self.cache = cache
+        self.crawler_kwargs = crawler_kwargs
+
+        # 运行时状态
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._crawlers: List[GoogleImageCrawler] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        """异步上下文管理器入口"""
+        # 有缓存时延迟到首次未命中再启动浏览器
+        if not self.cache:
+            await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """异步上下文管理器出口"""
+        await self.close()
+
+    async def start(self) -> None:
+        """启动浏览器并创建 size 个工作爬虫"""
+        async with self._start_lock:
+            if not self._browser:
+                await self._start()
+
+    async def _start(self) -> None:
+        """启动浏览器并创建工作爬虫（需持有 _start_lock）"""
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            **GoogleImageCrawler.browser_launch_args(self.headless, self.proxy)
+        )
+
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            crawler = GoogleImageCrawler(
+                headless=self.headless,
+                proxy=self.proxy,
+                browser=self._browser,
+                **self.crawler_kwargs
+            )
+            self._crawlers.append(crawler)
+
+        # 并行创建上下文和页面
+        await asyncio.gather(*(c._init_browser() for c in self._crawlers))
+        for crawler in self._crawlers:
+            self._idle.put_nowait(crawler)
+
+        logger.info(f"爬虫池已启动: {self.size} 个页面")
+
+    async def search(self, keyword: str, num_images: int = 10, **search_kwargs) -> List[ImageResult]:
+        """
+        使用池中的空闲页面执行一次搜索
+
+        Args:
+            keyword: 搜索关键词
+            num_images: 需要获取的图片数量
+            **search_kwargs: 传递给 GoogleImageCrawler.search 的其他参数
+
+        Returns:
+            List[ImageResult]: 图片结果列表
+        """
+        filters = (
+            search_kwargs.get('safe_search', True),
+            search_kwargs.get('min_width'),
+            search_kwargs.get('min_height'),
+        )
+        if self.cache:
+            cached = self.cache.get(keyword, num_images, *filters)
+            if cached is not None:
+                return [ImageResult(**item) for item in cached]
+
+        async with self.acquire() as crawler:
+            results = await crawler.search(keyword, num_images, **search_kwargs)
+
+        if self.cache:
+            self.cache.put(keyword, [asdict(r) for r in results], *filters)
+        return results
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[GoogleImageCrawler]:
+        """
+        独占一个空闲页面，退出上下文时归还
+
+        Example:
+            >>> async with pool.acquire() as crawler:
+            ...     results = await crawler.search("cat", 20)
+        """
+        await self.start()
+        crawler = await self._idle.get()
+        try:
+            yield crawler
+        finally:
+            self._idle.put_nowait(crawler)
+
+    async def iter_search(
+        self,
+        keyword: str,
+        num_images: int = 10,
+        safe_search: bool = True,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None,
+        crawler: Optional[GoogleImageCrawler] = None
+    ) -> AsyncIterator[ImageResult]:
+        """
+        流式搜索（见 GoogleImageCrawler.iter_search），缓存命中时不占用页面
+
+        Args:
+            crawler: 已通过 acquire() 取得的页面；不传时自动取得一个空闲页面
+            其余参数同 GoogleImageCrawler.iter_search
+        """
+        filters = (safe_search, min_width, min_height)
+        if self.cache:
+            cached = self.cache.get(keyword, num_images, *filters)
+            if cached is not None:
+                for item in cached:
+                    yield ImageResult(**item)
+                return
+
+        results: List[ImageResult] = []
+        if crawler is not None:
+            async for result in crawler.iter_search(keyword, num_images, *filters):
+                results.append(result)
+                yield result
+        else:
+            async with self.acquire() as crawler:
+                async for result in crawler.iter_search(keyword, num_images, *filters):
+                    results.append(result)
+                    yield result
+
+        # 与 GoogleImageCrawler.iter_search 一致：完整产出后才写入缓存
+        if self.cache:
+            self.cache.put(keyword, [asdict(r) for r in results], *filters)
+
+    async def _search_keyword(self, keyword: str, num_images: int, **search_kwargs) -> KeywordResult:
+        """执行单个关键词搜索，将异常转换为 KeywordResult.error"""
+        try:
+            results = await self.search(keyword, num_images, **search_kwargs)
+            return KeywordResult(keyword=keyword, results=results)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"关键词搜索失败: {keyword} - {e}")
+            return KeywordResult(keyword=keyword, error=str(e))
+
+    async def search_many(
+        self,
+        keywords: Iterable[str],
+        num_images: int = 10,
+        **search_kwargs
+    ) -> AsyncIterator[KeywordResult]:
+        """
+        并发搜索多个关键词，按完成顺序逐个产出结果
+
+        Args:
+            keywords: 关键词列表
+            num_images: 每个关键词需要获取的图片数量
+            **search_kwargs: 传递给 GoogleImageCrawler.search 的其他参数
+
+        Yields:
+            KeywordResult: 每个关键词的结果（失败时 error 非空）
+        """
+        tasks = [
+            asyncio.create_task(self._search_keyword(keyword, num_images, **search_kwargs))
+            for keyword in dict.fromkeys(keywords)  # 去重并保持顺序
+        ]
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 调用方提前停止迭代时取消剩余搜索
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def search_all(
+        self,
+        keywords: Iterable[str],
+        num_images: int = 10,
+        **search_kwargs
+    ) -> Dict[str, KeywordResult]:
+        """
+        并发搜索多个关键词并收集全部结果
+
+        Returns:
+            Dict[str, KeywordResult]: 关键词到结果的映射（保持输入顺序）
+        """
+        keywords = list(dict.fromkeys(keywords))
+        collected: Dict[str, KeywordResult] = {}
+        async for item in self.search_many(keywords, num_images, **search_kwargs):
+            collected[item.keyword] = item
+        return {k: collected[k] for k in keywords if k in collected}
+
+    @property
+    def transfer_stats(self) -> Dict[str, int]:
+        """所有页面的流量统计合计"""
+        totals: Dict[str, int] = {}
+        for crawler in self._crawlers:
+            for key, value in crawler.transfer_stats.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    async def close(self) -> None:
+        """关闭所有页面和浏览器"""
+        for crawler in self._crawlers:
+            try:
+                await crawler.close()
+            except Exception as e:
+                logger.debug(f"关闭爬虫失败: {e}")
+        self._crawlers = []
+        self._idle = None
+
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+async def search_images_many(
+    keywords: Iterable[str],
+    num_images: int = 10,
+    size: int = GoogleImageCrawlerPool.DEFAULT_SIZE,
+    **kwargs
+) -> Dict[str, KeywordResult]:
+    """
+    便捷函数：使用爬虫池并发搜索多个关键词
+
+    Args:
+        keywords: 关键词列表
+        num_images: 每个关键词的图片数量
+        size: 并发页面数
+        **kwargs: 传递给 GoogleImageCrawlerPool 的其他参数
+
+    Returns:
+        Dict[str, KeywordResult]: 关键词到结果的映射
+    """
+    async with GoogleImageCrawlerPool(size=size, **kwargs) as pool:
+        return await pool.search_all(keywords, num_images)
@@ -0,0 +1,79 @@
+"""
+爬虫页面配置模块
+定义浏览器上下文的视口、资源拦截策略和页面加载等待方式
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+from typing import Dict, Optional, Tuple, FrozenSet, Union
+from dataclasses import dataclass, field
+
+
+# 常见第三方统计/广告域名（含子域名）
+TRACKER_DOMAINS: Tuple[str, ...] = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "play.google.com",
+    "ogs.google.com",
+)
+
+
+@dataclass(frozen=True)
+class CrawlProfile:
+    """爬虫页面配置"""
+    name: str
+    viewport: Dict[str, int] = field(default_factory=lambda: {"width": 1920, "height": 1080})
+    blocked_resource_types: FrozenSet[str] = frozenset()   # 直接中止的资源类型
+    blocked_domains: Tuple[str, ...] = ()                  # 直接中止的域名（含子域名）
+    wait_until: str = "networkidle"                        # page.goto 的等待条件
+    result_selector: str = "img"                           # 加载后等待出现的结果元素
+
+    def is_blocked_host(self, host: str) -> bool:
+        """判断主机名是否在拦截域名列表中"""
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+
+# 完整加载：与浏览器正常访问一致
+FULL_PROFILE = CrawlProfile(name="full")
+
+# 精简加载：不下载图片/媒体/字体和第三方统计脚本，DOM 就绪且结果出现即开始提取
+LEAN_PROFILE = CrawlProfile(
+    name="lean",
+    viewport={"width": 1280, "height": 800},
+    blocked_resource_types=frozenset({"image", "media", "font"}),
+    blocked_domains=TRACKER_DOMAINS,
+    wait_until="domcontentloaded",
+    result_selector='a[href*="/imgres"], div[data-ved] img',
+)
+
+PROFILES: Dict[str, CrawlProfile] = {
+    FULL_PROFILE.name: FULL_PROFILE,
+    LEAN_PROFILE.name: LEAN_PROFILE,
+}
+
+
+def get_profile(profile: Optional[Union[str, CrawlProfile]]) -> CrawlProfile:
+    """
+    获取页面配置
+
+    Args:
+        profile: 配置名称 ("full"/"lean")、CrawlProfile 实例或 None（使用 full）
+
+    Returns:
+        CrawlProfile: 页面配置
+
+    Raises:
+        ValueError: 未知的配置名称
+    """
+    if profile is None:
+        return FULL_PROFILE
+    if isinstance(profile, CrawlProfile):
+        return profile
+    if profile not in PROFILES:
+        raise ValueError(f"不支持的页面配置: {profile}，可选: {', '.join(PROFILES)}")
+    return PROFILES[profile]
@@ -0,0 +1,540 @@
+"""
+多来源图片搜索模块
+统一的搜索来源接口（Google/Playwright、Bing HTML、Wikimedia API、本地目录），
+MultiSearch 并发查询所有来源，每个来源有独立的截止时间，按 URL 去重后按到达顺序流式产出，
+凑够所需数量即返回，最终结果按分辨率排序
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import html
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import List, Optional, Dict, Any, AsyncIterator, Sequence, Union
+from urllib.parse import urlsplit, urlunsplit
+
+import aiohttp
+
+from .crawler import ImageResult
+from .engine import DEFAULT_HEADERS
+
+
+class SearchProvider:
+    """
+    图片搜索来源基类
+
+    子类实现 search()：异步生成器，按来源自身的相关度顺序逐个产出 ImageResult；
+    需要独占资源（如浏览器页面）的来源另外实现 slot()
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.session: Optional[aiohttp.ClientSession] = None   # 由 MultiSearch 注入的共享会话
+        self.proxy: Optional[str] = None
+
+    async def search(self, query: str, count: int) -> AsyncIterator[ImageResult]:
+        """
+        搜索图片
+
+        Args:
+            query: 搜索关键词
+            count: 需要的数量（来源可以少于该数量）
+
+        Yields:
+            ImageResult: 搜索结果
+        """
+        raise NotImplementedError
+        yield  # pragma: no cover
+
+    @asynccontextmanager
+    async def slot(self, query: str, count: int) -> AsyncIterator[None]:
+        """
+        在上下文中取得搜索所需的独占资源，search() 在上下文内调用
+
+        MultiSearch 进入上下文后才开始计算截止时间，排队等待资源的时间不计入。默认无需等待
+        """
+        yield
+
+    async def close(self) -> None:
+        """释放来源持有的资源"""
+        pass
+
+
+class GoogleProvider(SearchProvider):
+    """
+    Google 图片（Playwright 浏览器，见 GoogleImageCrawlerPool）
+
+    共享一个浏览器上的 pages 个页面，每个页面同一时间只执行一个搜索；
+    slot() 取得空闲页面（缓存命中时不占用页面）
+    """
+
+    name = "google"
+
+    def __init__(
+        self,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None,
+        safe_search: bool = True,
+        pages: int = 1,
+        **crawler_options
+    ):
+        """
+        Args:
+            min_width: 最小宽度过滤
+            min_height: 最小高度过滤
+            safe_search: 是否开启安全搜索
+            pages: 并发页面数（同时进行的 Google 搜索数）
+            **crawler_options: 传给 GoogleImageCrawlerPool 的参数（headless、proxy、profile、cache 等）
+        """
+        super().__init__()
+        self.min_width = min_width
+        self.min_height = min_height
+        self.safe_search = safe_search
+        self.pages = max(1, pages)
+        self.crawler_options = crawler_options
+        self._pool = None
+        # 当前任务在 slot() 中取得的页面（每个搜索任务各自的上下文）
+        self._crawler: ContextVar = ContextVar(f"google_crawler_{id(self)}", default=None)
+
+    def _get_pool(self):
+        if self._pool is None:
+            from .pool import GoogleImageCrawlerPool
+            self._pool = GoogleImageCrawlerPool(size=self.pages, **self.crawler_options)
+        return self._pool
+
+    @asynccontextmanager
+    async def slot(self, query: str, count: int) -> AsyncIterator[None]:
+        pool = self._get_pool()
+        if pool.cache and pool.cache.get(query, count, self.safe_search, self.min_width, self.min_height) is not None:
+            yield
+            return
+        async with pool.acquire() as crawler:
+            token = self._crawler.set(crawler)
+            try:
+                yield
+            finally:
+                self._crawler.reset(token)
+
+    async def search(self, query: str, count: int) -> AsyncIterator[ImageResult]:
+        async for result in self._get_pool().iter_search(
+            query, count, self.safe_search, self.min_width, self.min_height,
+            crawler=self._crawler.get()
+        ):
+            yield result
+
+    async def close(self) -> None:
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+
+class BingProvider(SearchProvider):
+    """Bing 图片（解析搜索结果页 HTML，无需浏览器）"""
+
+    name = "bing"
+    SEARCH_URL = "https://www.bing.com/images/search"
+
+    # 结果锚点上的 m='{"murl": ..., "turl": ..., "purl": ..., "t": ...}' 元数据
+    _META_RE = re.compile(r'class="iusc"[^>]*?\sm="([^"]+)"')
+    _MURL_RE = re.compile(r'murl&quot;:&quot;(https?://.+?)&quot;')
+
+    def __init__(self, safe_search: bool = True):
+        super().__init__()
+        self.safe_search = safe_search
+
+    async def search(self, query: str, count: int) -> AsyncIterator[ImageResult]:
+        params = {"q": query, "form": "HDRSC2", "first": "1", "count": str(max(count, 35))}
+        if not self.safe_search:
+            params["adlt"] = "off"
+        async with self.session.get(self.SEARCH_URL, params=params, proxy=self.proxy) as response:
+            response.raise_for_status()
+            page = await response.text()
+
+        emitted = 0
+        for raw in self._META_RE.findall(page):
+            try:
+                meta = json.loads(html.unescape(raw))
+            except json.JSONDecodeError:
+                continue
+            url = meta.get("murl")
+            if not url:
+                continue
+            yield ImageResult(
+                url=url,
+                thumbnail_url=meta.get("turl", ""),
+                title=meta.get("t", ""),
+                source_url=meta.get("purl", ""),
+            )
+            emitted += 1
+            if emitted >= count:
+                return
+
+        # 页面结构变化时回退到直接匹配原图地址
+        if not emitted:
+            for url in dict.fromkeys(self._MURL_RE.findall(page)):
+                yield ImageResult(url=html.unescape(url), thumbnail_url="", title="", source_url="")
+                emitted += 1
+                if emitted >= count:
+                    return
+
+
+class WikimediaProvider(SearchProvider):
+    """Wikimedia Commons（一次 API 请求同时完成搜索和 imageinfo 查询）"""
+
+    name = "wikimedia"
+    API_URL = "https://commons.wikimedia.org/w/api.php"
+    IMAGE_MIMES = ("image/jpeg", "image/png", "image/webp", "image/gif")
+    THUMB_WIDTH = 320
+
+    async def search(self, query: str, count: int) -> AsyncIterator[ImageResult]:
+        params = {
+            "action": "query",
+            "format": "json",
+            "generator": "search",
+            "gsrsearch": query,
+            "gsrnamespace": "6",                   # File: 命名空间
+            "gsrlimit": str(min(50, count * 2)),   # 部分结果不是位图，多取一些
+            "prop": "imageinfo",
+            "iiprop": "url|size|mime",
+            "iiurlwidth": str(self.THUMB_WIDTH),
+        }
+        async with self.session.get(self.API_URL, params=params, proxy=self.proxy) as response:
+            response.raise_for_status()
+            data = await response.json(content_type=None)
+
+        pages = sorted(data.get("query", {}).get("pages", {}).values(), key=lambda p: p.get("index", 0))
+        emitted = 0
+        for page in pages:
+            info = (page.get("imageinfo") or [None])[0]
+            if not info or info.get("mime") not in self.IMAGE_MIMES or not info.get("url"):
+                continue
+            yield ImageResult(
+                url=info["url"],
+                thumbnail_url=info.get("thumburl", ""),
+                title=page.get("title", "").replace("File:", "", 1),
+                source_url=info.get("descriptionurl", ""),
+                width=info.get("width"),
+                height=info.get("height"),
+            )
+            emitted += 1
+            if emitted >= count:
+                return
+
+
+class LocalProvider(SearchProvider):
+    """
+    本地目录：预先整理的 关键词 -> 图片 映射
+
+    目录为 JSON 文件或字典，值为 URL 字符串或 {"url", "title", "width", "height"} 字典列表；
+    关键词（不区分大小写）出现在查询中即视为匹配
+    """
+
+    name = "local"
+
+    def __init__(self, catalog: Union[str, Path, Dict[str, List[Any]]]):
+        super().__init__()
+        if isinstance(catalog, (str, Path)):
+            catalog = json.loads(Path(catalog).expanduser().read_text(encoding="utf-8"))
+        self.catalog = {key.lower(): items for key, items in catalog.items()}
+
+    async def search(self, query: str, count: int) -> AsyncIterator[ImageResult]:
+        query_lower = query.lower()
+        emitted = 0
+        for key, items in self.catalog.items():
+            if key not in query_lower:
+                continue
+            for item in items:
+                if isinstance(item, str):
+                    item = {"url": item}
+                yield ImageResult(
+                    url=item["url"],
+                    thumbnail_url=item.get("thumbnail_url", ""),
+                    title=item.get("title", key),
+                    source_url=item.get("source_url", ""),
+                    width=item.get("width"),
+                    height=item.get("height"),
+                )
+                emitted += 1
+                if emitted >= count:
+                    return
+
+
+PROVIDERS = {
+    GoogleProvider.name: GoogleProvider,
+    BingProvider.name: BingProvider,
+    WikimediaProvider.name: WikimediaProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+
+def create_providers(
+    names: Sequence[str],
+    catalog: Optional[Union[str, Path, Dict[str, List[Any]]]] = None,
+    min_width: Optional[int] = None,
+    min_height: Optional[int] = None,
+    safe_search: bool = True,
+    **crawler_options
+) -> List[SearchProvider]:
+    """
+    按名称创建搜索来源
+
+    Args:
+        names: 来源名称（google/bing/wikimedia/local）
+        catalog: local 来源的目录（JSON 文件路径或字典）
+        min_width: 最小宽度（google 来源在页面上过滤）
+        min_height: 最小高度
+        safe_search: 是否开启安全搜索
+        **crawler_options: 传给 GoogleProvider 的参数（pages 及 GoogleImageCrawlerPool 的参数）
+
+    Returns:
+        List[SearchProvider]: 来源实例（保持顺序）
+    """
+    providers: List[SearchProvider] = []
+    for name in names:
+        if name not in PROVIDERS:
+            raise ValueError(f"未知的搜索来源: {name}，可选: {', '.join(PROVIDERS)}")
+        if name == GoogleProvider.name:
+            providers.append(GoogleProvider(min_width, min_height, safe_search, **crawler_options))
+        elif name == BingProvider.name:
+            providers.append(BingProvider(safe_search))
+        elif name == LocalProvider.name:
+            if catalog is None:
+                raise ValueError("local 来源需要指定目录文件（catalog）")
+            providers.append(LocalProvider(catalog))
+        else:
+            providers.append(PROVIDERS[name]())
+    return providers
+
+
+_WIKIMEDIA_THUMB_RE = re.compile(r"^(/wikipedia/[^/]+)/thumb(/[0-9a-f]/[0-9a-f]{2}/[^/]+)/[^/]+$")
+
+
+def canonical_url(url: str) -> str:
+    """
+    用于去重的规范化 URL
+
+    忽略协议（http/https 视为同一地址），主机名小写、去掉片段；Wikimedia 缩略图地址还原为原图地址
+    """
+    parts = urlsplit(url)
+    path = parts.path
+    if parts.netloc.lower() == "upload.wikimedia.org":
+        match = _WIKIMEDIA_THUMB_RE.match(path)
+        if match:
+            path = match.group(1) + match.group(2)
+    return urlunsplit(("", parts.netloc.lower(), path, parts.query, ""))
+
+
+def rank_results(results: Sequence[ImageResult]) -> List[ImageResult]:
+    """按分辨率（像素数）从高到低排序，尺寸未知的排在最后，其余保持到达顺序"""
+    return sorted(results, key=lambda r: -((r.width or 0) * (r.height or 0)))
+
+
+_DONE = object()
+
+
+class MultiSearch:
+    """
+    多来源并发搜索
+
+    - 所有来源同时查询，每个来源最多 deadline 秒（从取得来源的独占资源后开始计算，见
+      SearchProvider.slot），超时或出错的来源被跳过，不影响其它来源
+    - 结果按到达顺序产出，按规范化 URL 去重，凑够 count 张即停止其余来源
+    - 尺寸已知且小于 min_width/min_height 的结果被过滤；尺寸未知的保留（由下载时的文件头校验把关）
+
+    Example:
+        >>> async with MultiSearch(create_providers(["wikimedia", "bing"]), deadline=8) as multi:
+        ...     results = await multi.search("tatlin tower", count=5)   # 按分辨率排序
+        ...     stats = {}
+        ...     async for result in multi.iter_search("constructivism", count=5, stats=stats):
+        ...         print(result.url)
+        ...     print(stats)    # {"wikimedia": {"results": 5, "elapsed": 0.4, "error": None}, ...}
+    """
+
+    DEFAULT_DEADLINE = 15.0
+
+    def __init__(
+        self,
+        providers: Sequence[SearchProvider],
+        deadline: float = DEFAULT_DEADLINE,
+        min_width: Optional[int] = None,
+        min_height: Optional[int] = None,
+        proxy: Optional[str] = None
+    ):
+        """
+        Args:
+            providers: 搜索来源
+            deadline: 每个来源的截止时间（秒）
+            min_width: 最小宽度过滤
+            min_height: 最小高度过滤
+            proxy: HTTP 来源使用的代理
+        """
+        if not providers:
+            raise ValueError("至少需要一个搜索来源")
+        self.providers = list(providers)
+        self.deadline = deadline
+        self.min_width = min_width
+        self.min_height = min_height
+        self.proxy = proxy
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self) -> None:
+        """创建 HTTP 来源共享的会话"""
+        if self._session and not self._session.closed:
+            return
+        self._session = aiohttp.ClientSession(
+            headers=DEFAULT_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.deadline),
+            trust_env=True
+        )
+        for provider in self.providers:
+            provider.session = self._session
+            provider.proxy = self.proxy
+
+    async def close(self) -> None:
+        """关闭所有来源和会话"""
+        for provider in self.providers:
+            try:
+                await provider.close()
+            except Exception as e:
+                logger.debug(f"关闭来源失败: {provider.name} - {e}")
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def _acceptable(self, result: ImageResult) -> bool:
+        if self.min_width and result.width is not None and result.width < self.min_width:
+            return False
+        if self.min_height and result.height is not None and result.height < self.min_height:
+            return False
+        return True
+
+    async def _drain(
+        self,
+        provider: SearchProvider,
+        query: str,
+        count: int,
+        queue: asyncio.Queue,
+        stats: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """在截止时间内将来源的结果放入队列（等待 slot 的时间不计入截止时间）"""
+        started = time.monotonic()
+        entry = stats[provider.name] = {"results": 0, "elapsed": None, "error": None}
+        try:
+            async with provider.slot(query, count):
+                started = time.monotonic()
+                results = provider.search(query, count)
+                try:
+                    while True:
+                        remaining = self.deadline - (time.monotonic() - started)
+                        if remaining <= 0:
+                            raise asyncio.TimeoutError()
+                        try:
+                            result = await asyncio.wait_for(results.__anext__(), remaining)
+                        except StopAsyncIteration:
+                            break
+                        entry["results"] += 1
+                        await queue.put(result)
+                finally:
+                    await results.aclose()
+        except asyncio.TimeoutError:
+            entry["error"] = f"超过截止时间 {self.deadline:.0f}s"
+            logger.warning(f"搜索来源超时: {provider.name} ({query})")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            entry["error"] = str(e) or type(e).__name__
+            logger.warning(f"搜索来源失败: {provider.name} ({query}) - {entry['error']}")
+        finally:
+            entry["elapsed"] = round(time.monotonic() - started, 3)
+            queue.put_nowait(_DONE)
+
+    async def iter_search(
+        self,
+        query: str,
+        count: int,
+        stats: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> AsyncIterator[ImageResult]:
+        """
+        并发查询所有来源，按到达顺序产出去重后的结果
+
+        Args:
+            query: 搜索关键词
+            count: 需要的数量，凑够后立即取消其余来源
+            stats: 传入字典时写入本次搜索各来源的情况
+                {name: {"results": n, "elapsed": 秒, "error": 错误或 None}}（并发搜索各自传入）
+
+        Yields:
+            ImageResult: 搜索结果
+        """
+        await self.start()
+        if stats is None:
+            stats = {}
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks = [
+            asyncio.ensure_future(self._drain(provider, query, count, queue, stats))
+            for provider in self.providers
+        ]
+
+        seen = set()
+        emitted = 0
+        running = len(tasks)
+        try:
+            while running:
+                result = await queue.get()
+                if result is _DONE:
+                    running -= 1
+                    continue
+                key = canonical_url(result.url)
+                if key in seen or not self._acceptable(result):
+                    continue
+                seen.add(key)
+                yield result
+                emitted += 1
+                if emitted >= count:
+                    return
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def search(
+        self,
+        query: str,
+        count: int,
+        stats: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> List[ImageResult]:
+        """
+        并发查询所有来源，凑够 count 张（或所有来源结束）后按分辨率排序返回
+
+        Args:
+            stats: 见 iter_search
+
+        Returns:
+            List[ImageResult]: 最多 count 张结果
+        """
+        if stats is None:
+            stats = {}
+        results = [result async for result in self.iter_search(query, count, stats)]
+        ranked = rank_results(results)
+        logger.info(
+            f"多来源搜索: {query} -> {len(ranked)} 张 "
+            + ", ".join(f"{name}={s['results']}" for name, s in stats.items())
+        )
+        return ranked
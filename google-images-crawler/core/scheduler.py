@@ -0,0 +1,294 @@
+"""
+按主机调度模块
+为每个主机维护独立的任务队列、令牌桶限速、AIMD 并发窗口和熔断器，
+使慢速或返回 429/503 的主机只影响自己的任务，不会占满全部下载协程
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional, Dict, Any, Deque, Tuple, List
+from urllib.parse import urlparse
+
+
+# 请求结果类别（用于调整主机状态）
+RESULT_OK = "ok"                # 成功
+RESULT_THROTTLED = "throttled"  # 429 / 503：主机要求降速
+RESULT_ERROR = "error"          # 网络错误、超时、5xx 等可重试错误
+RESULT_FATAL = "fatal"          # 4xx 等不可重试错误（主机本身正常）
+
+
+def host_of(url: str) -> str:
+    """提取 URL 的主机名"""
+    return urlparse(url).netloc.lower()
+
+
+class HostState:
+    """单个主机的调度状态"""
+
+    def __init__(self, host: str, max_concurrency: int, rate: float):
+        self.host = host
+        self.queue: Deque[Any] = deque()
+
+        # AIMD 并发窗口（浮点，取整后作为上限）
+        self.max_concurrency = max_concurrency
+        self.window = float(min(2, max_concurrency))
+        self.in_flight = 0
+
+        # 令牌桶
+        self.max_rate = rate
+        self.rate = rate
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+
+        # 延迟统计（响应头到达时间）
+        self.min_latency: Optional[float] = None
+        self.latency: Optional[float] = None  # EWMA
+
+        # 熔断器
+        self.failures = 0           # 连续失败次数
+        self.trips = 0              # 连续熔断次数
+        self.paused_until = 0.0     # 熔断或 Retry-After 暂停截止时间
+        self.dead = False           # 连续熔断次数过多，放弃该主机
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self.window))
+
+    def refill(self, now: float) -> None:
+        """按当前速率补充令牌（桶容量为 1 秒的请求量）"""
+        capacity = max(1.0, self.rate)
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, now: float) -> float:
+        """可以发起下一个请求的时间（now 表示立即可用）"""
+        wait_token = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(now + wait_token, self.paused_until)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'queued': len(self.queue),
+            'in_flight': self.in_flight,
+            'limit': self.limit,
+            'rate': round(self.rate, 2),
+            'latency_ms': round(self.latency * 1000) if self.latency is not None else None,
+            'failures': self.failures,
+            'paused': self.paused_until > time.monotonic(),
+            'dead': self.dead,
+        }
+
+
+class HostScheduler:
+    """
+    按主机的任务调度器
+
+    - 令牌桶：每个主机的请求速率不超过 rate（请求/秒）
+    - AIMD：成功且延迟正常时并发窗口加性增长（每个窗口约 +1），429/503 时窗口和速率减半，
+      延迟明显高于历史最小值时窗口缓慢收缩
+    - 熔断：连续失败 breaker_threshold 次后暂停该主机 cooldown 秒（连续熔断时指数增长），
+      失败的任务重新排到该主机队列末尾，其它主机不受影响；连续熔断 max_trips 次后放弃该主机，
+      其剩余任务通过 take_abandoned() 取出
+
+    Example:
+        >>> scheduler = HostScheduler(per_host=6)
+        >>> scheduler.add(url, task)
+        >>> item = await scheduler.acquire()       # (task, host)，全部完成时为 None
+        >>> scheduler.release(host, RESULT_OK, latency=0.12)
+    """
+
+    DEFAULT_RATE = 8.0
+    DEFAULT_BREAKER_THRESHOLD = 5
+    DEFAULT_COOLDOWN = 10.0
+    MAX_COOLDOWN = 300.0
+    DEFAULT_MAX_TRIPS = 3
+    MIN_RATE = 0.2
+    LATENCY_FACTOR = 3.0            # 延迟超过最小值的倍数（且至少多出 LATENCY_SLACK 秒）时视为拥塞
+    LATENCY_SLACK = 0.2
+
+    def __init__(
+        self,
+        per_host: int = 6,
+        rate: float = DEFAULT_RATE,
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        max_trips: int = DEFAULT_MAX_TRIPS
+    ):
+        """
+        Args:
+            per_host: 每个主机的最大并发数（AIMD 窗口上限）
+            rate: 每个主机的最大请求速率（请求/秒）
+            breaker_threshold: 触发熔断的连续失败次数
+            cooldown: 首次熔断的暂停时间（秒）
+            max_trips: 连续熔断多少次后放弃该主机
+        """
+        self.per_host = max(1, per_host)
+        self.rate = rate
+        self.breaker_threshold = breaker_threshold
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+
+        self.hosts: Dict[str, HostState] = {}
+        self._order: Deque[str] = deque()   # 轮询顺序
+        self._changed = asyncio.Event()
+        self._abandoned: List[Any] = []
+        self.accepting = False      # 流式模式下仍可能加入新任务（队列为空时 acquire 等待而不是结束）
+
+    def _host(self, host: str) -> HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = HostState(host, self.per_host, self.rate)
+            self.hosts[host] = state
+            self._order.append(host)
+        return state
+
+    def add(self, url: str, item: Any) -> None:
+        """将任务加入其主机队列末尾（主机已放弃时直接归入放弃列表）"""
+        self.requeue(host_of(url), item)
+
+    def open_input(self) -> None:
+        """进入流式模式：任务全部完成后 acquire 继续等待新任务，直到 close_input()"""
+        self.accepting = True
+
+    def close_input(self) -> None:
+        """不再加入新任务"""
+        self.accepting = False
+        self._changed.set()
+
+    async def wait_capacity(self, limit: int) -> None:
+        """等待排队和进行中的任务数低于 limit（流式输入的背压）"""
+        while self.pending >= limit:
+            self._changed.clear()
+            await self._changed.wait()
+
+    def requeue(self, host: str, item: Any) -> None:
+        """将重试的任务排到主机队列末尾（主机已放弃时直接归入放弃列表）"""
+        state = self._host(host)
+        if state.dead:
+            self._abandoned.append(item)
+        else:
+            state.queue.append(item)
+        self._changed.set()
+
+    def take_abandoned(self) -> List[Any]:
+        """取出因主机被放弃而未执行的任务"""
+        items, self._abandoned = self._abandoned, []
+        return items
+
+    @property
+    def pending(self) -> int:
+        """排队和进行中的任务总数"""
+        return sum(len(s.queue) + s.in_flight for s in self.hosts.values())
+
+    async def acquire(self) -> Optional[Tuple[Any, str]]:
+        """
+        取出下一个可执行的任务
+
+        按轮询顺序选择有排队任务、未达并发上限、未熔断且有令牌的主机；
+        暂时没有可执行任务时等待，直到有任务完成或最早可用时间到达。
+
+        Returns:
+            Optional[Tuple[Any, str]]: (任务, 主机)，所有任务完成且不再接收新任务时为 None
+        """
+        while True:
+            now = time.monotonic()
+            earliest = None
+
+            for _ in range(len(self._order)):
+                host = self._order[0]
+                self._order.rotate(-1)
+                state = self.hosts[host]
+                if not state.queue or state.in_flight >= state.limit:
+                    continue
+
+                state.refill(now)
+                ready = state.ready_at(now)
+                if ready <= now:
+                    state.tokens -= 1
+                    state.in_flight += 1
+                    return state.queue.popleft(), host
+                earliest = ready if earliest is None else min(earliest, ready)
+
+            if self.pending == 0 and not self.accepting:
+                return None
+
+            # 等待任务完成/重新入队，或最早可用时间到达
+            self._changed.clear()
+            timeout = None if earliest is None else max(0.0, earliest - now)
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(
+        self,
+        host: str,
+        result: str,
+        latency: Optional[float] = None,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        任务结束，按结果调整主机状态
+
+        Args:
+            host: 主机名
+            result: RESULT_OK / RESULT_THROTTLED / RESULT_ERROR / RESULT_FATAL
+            latency: 响应头到达耗时（秒）
+            retry_after: 服务器要求的等待时间（秒）
+        """
+        state = self.hosts[host]
+        state.in_flight -= 1
+        now = time.monotonic()
+
+        if latency is not None:
+            state.min_latency = latency if state.min_latency is None else min(state.min_latency, latency)
+            state.latency = latency if state.latency is None else 0.8 * state.latency + 0.2 * latency
+
+        if result in (RESULT_OK, RESULT_FATAL):
+            state.failures = 0
+            state.trips = 0
+            congested = state.latency is not None and state.latency > max(
+                self.LATENCY_FACTOR * state.min_latency,
+                state.min_latency + self.LATENCY_SLACK
+            )
+            if result == RESULT_OK and congested:
+                state.window = max(1.0, state.window - 1.0 / state.window)
+            elif result == RESULT_OK:
+                state.window = min(state.max_concurrency, state.window + 1.0 / state.window)
+                state.rate = min(state.max_rate, state.rate + 0.1 * state.max_rate / state.window)
+        else:
+            state.failures += 1
+            if result == RESULT_THROTTLED:
+                state.window = max(1.0, state.window / 2)
+                state.rate = max(self.MIN_RATE, state.rate / 2)
+            if retry_after:
+                state.paused_until = max(state.paused_until, now + retry_after)
+
+            if state.failures >= self.breaker_threshold:
+                state.trips += 1
+                if state.trips >= self.max_trips:
+                    state.dead = True
+                    self._abandoned.extend(state.queue)
+                    state.queue.clear()
+                    logger.warning(f"主机连续熔断 {state.trips} 次，放弃: {host}")
+                    self._changed.set()
+                    return
+
+                pause = min(self.MAX_COOLDOWN, self.cooldown * 2 ** (state.trips - 1))
+                state.paused_until = max(state.paused_until, now + pause)
+                # 恢复后以单并发试探，再失败一次立即重新熔断
+                state.failures = self.breaker_threshold - 1
+                state.window = 1.0
+                logger.warning(f"主机熔断 {pause:.0f}s: {host}（剩余 {len(state.queue)} 个任务）")
+
+        self._changed.set()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """各主机当前状态"""
+        return {host: state.snapshot() for host, state in self.hosts.items()}
@@ -0,0 +1,240 @@
+"""
+内容寻址图片存储模块
+按图片内容的 SHA-256 保存唯一副本，维护 URL -> 摘要 -> 文件 的全局索引，
+下载目录中的文件以硬链接（失败时符号链接/复制）指向存储中的对象
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+from dataclasses import dataclass
+
+
+DEFAULT_STORE_DIR = Path(
+    os.environ.get("IMAGE_STORE_DIR", Path.home() / ".cache" / "image-store")
+)
+
+
+@dataclass
+class StoredObject:
+    """存储中的一个对象"""
+    digest: str             # 内容 SHA-256（十六进制）
+    path: Path              # 对象文件路径
+    size: int               # 字节数
+
+    @property
+    def extension(self) -> str:
+        return self.path.suffix
+
+
+class ContentStore:
+    """
+    内容寻址图片存储
+
+    目录结构:
+        <root>/objects/ab/abcdef....jpg   # 以摘要前两位分目录
+        <root>/tmp/                       # 下载中的临时文件（与对象同一文件系统，便于原子移动）
+        <root>/index.sqlite3              # urls(url -> digest), objects(digest -> path)
+
+    同一图片无论来自哪个 URL 只保存一份；已索引的 URL 再次下载时直接链接，不发起请求。
+
+    Example:
+        >>> store = ContentStore("~/.cache/image-store")
+        >>> obj = store.lookup(url)
+        >>> if obj:
+        ...     store.link(obj, Path("./downloads/cat"))
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        初始化存储
+
+        Args:
+            root: 存储根目录，默认 $IMAGE_STORE_DIR 或 ~/.cache/image-store
+        """
+        self.root = Path(root).expanduser() if root else DEFAULT_STORE_DIR
+        self.objects_dir = self.root / "objects"
+        self.tmp_dir = self.root / "tmp"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+        # 本实例的统计
+        self.url_hits = 0           # URL 已索引，未发起请求
+        self.content_hits = 0       # 新 URL，但内容已存在
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / "index.sqlite3"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+    def object_path(self, digest: str, extension: str) -> Path:
+        """对象文件路径"""
+        return self.objects_dir / digest[:2] / f"{digest}{extension}"
+
+    def _get_object(self, digest: str) -> Optional[StoredObject]:
+        """按摘要查询对象（需持有锁），文件已被删除时清理索引"""
+        row = self._conn.execute(
+            "SELECT path, size FROM objects WHERE digest = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        path = self.root / row[0]
+        if not path.exists():
+            self._conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            self._conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+            self._conn.commit()
+            return None
+        return StoredObject(digest=digest, path=path, size=row[1])
+
+    def lookup(self, url: str) -> Optional[StoredObject]:
+        """
+        查询 URL 对应的已存储对象
+
+        Args:
+            url: 图片 URL
+
+        Returns:
+            Optional[StoredObject]: 已下载过时返回对象，否则 None
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+            obj = self._get_object(row[0]) if row else None
+
+        if obj:
+            self.url_hits += 1
+        return obj
+
+    def commit(self, temp_path: Path, digest: str, extension: str, url: Optional[str] = None) -> StoredObject:
+        """
+        将下载完成的临时文件存入存储
+
+        Args:
+            temp_path: 临时文件路径（调用后归存储所有）
+            digest: 内容 SHA-256
+            extension: 文件扩展名（如 .jpg）
+            url: 来源 URL，记录到索引
+
+        Returns:
+            StoredObject: 存储中的对象（内容已存在时为已有对象）
+        """
+        now = time.time()
+        with self._lock:
+            obj = self._get_object(digest)
+            if obj:
+                temp_path.unlink(missing_ok=True)
+                self.content_hits += 1
+            else:
+                path = self.object_path(digest, extension)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(temp_path, path)
+                obj = StoredObject(digest=digest, path=path, size=path.stat().st_size)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO objects (digest, path, size, created_at) VALUES (?, ?, ?, ?)",
+                    (digest, str(path.relative_to(self.root)), obj.size, now)
+                )
+
+            if url:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, digest, created_at) VALUES (?, ?, ?)",
+                    (url, digest, now)
+                )
+            self._conn.commit()
+
+        return obj
+
+    @staticmethod
+    def link(obj: StoredObject, output_dir: Path, filename: Optional[str] = None) -> Path:
+        """
+        在输出目录中创建指向对象的链接
+
+        依次尝试硬链接、符号链接、复制。目标已指向同一对象时直接返回。
+
+        Args:
+            obj: 存储对象
+            output_dir: 输出目录（如按关键词划分的子目录）
+            filename: 文件名，默认为摘要前 16 位 + 扩展名
+
+        Returns:
+            Path: 输出目录中的文件路径
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        target = output_dir / (filename or f"{obj.digest[:16]}{obj.extension}")
+
+        if target.exists() or target.is_symlink():
+            try:
+                if os.path.samefile(target, obj.path):
+                    return target
+            except OSError:
+                pass
+            target.unlink()
+
+        try:
+            os.link(obj.path, target)
+        except OSError:
+            try:
+                os.symlink(obj.path.resolve(), target)
+            except OSError:
+                shutil.copy2(obj.path, target)
+        return target
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取存储统计
+
+        Returns:
+            Dict: objects, bytes, urls, url_hits, content_hits
+        """
+        with self._lock:
+            objects, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects"
+            ).fetchone()
+            urls = self._conn.execute("SELECT COUNT(*) FROM urls").fetchone()[0]
+
+        return {
+            'objects': objects,
+            'bytes': total,
+            'urls': urls,
+            'url_hits': self.url_hits,
+            'content_hits': self.content_hits,
+        }
+
+    def close(self) -> None:
+        """关闭索引数据库"""
+        with self._lock:
+            if self._conn:
+                self._conn.close()
+                self._conn = None
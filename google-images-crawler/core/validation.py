@@ -0,0 +1,330 @@
+"""
+图片校验与转码模块
+下载时根据首个数据块的魔数识别格式、从文件头读取尺寸（无需完整解码），
+对非图片（HTML 错误页等）、格式不符或尺寸过小的内容提前中止；
+下载完成后可选地在线程池中转码为目标格式并限制最长边
+
+Author: Core Developer
+Date: 2025-02-06
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple, Iterable
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 可选依赖，仅转码功能需要
+    Image = None
+    ImageOps = None
+
+
+# 读取尺寸时最多缓冲的文件头字节数（JPEG 的 EXIF 段可能较长）
+HEADER_LIMIT = 64 * 1024
+
+# 识别格式所需的最少字节数
+_SNIFF_BYTES = 32
+
+# 转码目标格式: 名称 -> (Pillow 格式, 扩展名)
+TRANSCODE_FORMATS = {
+    "jpeg": ("JPEG", ".jpg"),
+    "png": ("PNG", ".png"),
+    "webp": ("WEBP", ".webp"),
+}
+
+
+class InvalidImageError(Exception):
+    """内容不是有效图片或不满足校验条件"""
+    pass
+
+
+@dataclass
+class ImageInfo:
+    """从文件头识别出的图片信息"""
+    format: str                     # jpeg / png / gif / webp / bmp / tiff / ico / avif / heic / svg
+    width: Optional[int] = None     # 无法从文件头读取时为 None
+    height: Optional[int] = None
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    根据魔数识别图片格式
+
+    Args:
+        data: 文件开头的字节
+
+    Returns:
+        Optional[str]: 格式名称，无法识别时返回 None
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data.startswith(b"BM"):
+        return "bmp"
+    if data.startswith((b"II*\x00", b"MM\x00*")):
+        return "tiff"
+    if data.startswith(b"\x00\x00\x01\x00"):
+        return "ico"
+    if data[4:8] == b"ftyp":
+        brand = data[8:12]
+        if brand in (b"avif", b"avis"):
+            return "avif"
+        if brand in (b"heic", b"heix", b"mif1", b"msf1"):
+            return "heic"
+    head = data[:1024].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+        return "svg"
+    return None
+
+
+def _jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """扫描 JPEG 段，读取 SOFn 中的尺寸"""
+    i = 2
+    while i + 9 < len(data):
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        # 无长度字段的标记
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">HH", data[i + 5:i + 9])
+            return width, height
+        length = struct.unpack(">H", data[i + 2:i + 4])[0]
+        i += 2 + length
+    return None
+
+
+def _webp_size(data: bytes) -> Optional[Tuple[int, int]]:
+    chunk = data[12:16]
+    if chunk == b"VP8 " and len(data) >= 30:
+        width, height = struct.unpack("<HH", data[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L" and len(data) >= 25:
+        bits = struct.unpack("<I", data[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(data) >= 30:
+        width = int.from_bytes(data[24:27], "little") + 1
+        height = int.from_bytes(data[27:30], "little") + 1
+        return width, height
+    return None
+
+
+def read_dimensions(data: bytes, fmt: str) -> Optional[Tuple[int, int]]:
+    """
+    从文件头读取图片尺寸
+
+    Args:
+        data: 文件开头的字节
+        fmt: sniff_format 识别出的格式
+
+    Returns:
+        Optional[Tuple[int, int]]: (宽, 高)，数据不足或格式不支持时返回 None
+    """
+    try:
+        if fmt == "png" and len(data) >= 24:
+            return struct.unpack(">II", data[16:24])
+        if fmt == "gif" and len(data) >= 10:
+            return struct.unpack("<HH", data[6:10])
+        if fmt == "bmp" and len(data) >= 26:
+            width, height = struct.unpack("<ii", data[18:26])
+            return abs(width), abs(height)
+        if fmt == "ico" and len(data) >= 8:
+            return data[6] or 256, data[7] or 256
+        if fmt == "webp":
+            return _webp_size(data)
+        if fmt == "jpeg":
+            return _jpeg_size(data)
+    except struct.error:
+        return None
+    return None
+
+
+class ImageValidator:
+    """
+    流式图片校验器
+
+    下载过程中将已收到的文件头传给 check_header()，能够判定时立即返回或抛出
+    InvalidImageError，调用方据此中止下载，不必等待完整响应。
+
+    Example:
+        >>> validator = ImageValidator(min_width=200, min_height=200)
+        >>> info = validator.check_header(first_chunk)   # 数据不足时返回 None
+        >>> validator.check_size(total_bytes)
+    """
+
+    def __init__(
+        self,
+        min_width: int = 0,
+        min_height: int = 0,
+        min_bytes: int = 0,
+        formats: Optional[Iterable[str]] = None
+    ):
+        """
+        Args:
+            min_width: 最小宽度（像素），0 表示不限
+            min_height: 最小高度（像素），0 表示不限
+            min_bytes: 最小文件大小（字节），0 表示不限
+            formats: 允许的格式（如 {"jpeg", "png", "webp"}），默认允许所有可识别的图片格式
+        """
+        self.min_width = min_width
+        self.min_height = min_height
+        self.min_bytes = min_bytes
+        self.formats = frozenset(formats) if formats else None
+
+    def check_header(self, data: bytes, final: bool = False) -> Optional[ImageInfo]:
+        """
+        校验文件头
+
+        Args:
+            data: 目前已收到的文件开头字节
+            final: 是否已是完整内容（响应已结束）
+
+        Returns:
+            Optional[ImageInfo]: 校验通过时返回图片信息；需要更多数据时返回 None
+
+        Raises:
+            InvalidImageError: 不是图片、格式不允许或尺寸过小
+        """
+        fmt = sniff_format(data)
+        if fmt is None:
+            if len(data) < _SNIFF_BYTES and not final:
+                return None
+            head = data[:64].lstrip()
+            if head[:1] == b"<":
+                raise InvalidImageError("内容是 HTML/XML 而不是图片")
+            raise InvalidImageError("无法识别的图片格式")
+
+        if self.formats and fmt not in self.formats:
+            raise InvalidImageError(f"不允许的图片格式: {fmt}")
+
+        size = read_dimensions(data, fmt)
+        if size is None:
+            # 尺寸在文件头更后面（或格式不支持读取），数据足够多时放弃读取尺寸
+            if not final and len(data) < HEADER_LIMIT and fmt not in ("tiff", "avif", "heic", "svg"):
+                return None
+            return ImageInfo(fmt)
+
+        width, height = size
+        if width < self.min_width or height < self.min_height:
+            raise InvalidImageError(
+                f"尺寸过小: {width}x{height}（要求至少 {self.min_width}x{self.min_height}）"
+            )
+        return ImageInfo(fmt, width, height)
+
+    def check_size(self, size: int) -> None:
+        """
+        校验下载完成后的文件大小
+
+        Raises:
+            InvalidImageError: 文件过小
+        """
+        if size < self.min_bytes:
+            raise InvalidImageError(f"文件过小: {size} bytes（要求至少 {self.min_bytes} bytes）")
+
+
+class Transcoder:
+    """
+    图片转码器
+
+    下载完成后将图片转换为目标格式并按最长边等比缩小。Pillow 在解码、缩放和编码时释放 GIL，
+    因此在线程池中执行即可利用多核，不阻塞事件循环。动图保持原样。
+
+    Example:
+        >>> transcoder = Transcoder("webp", max_edge=1920)
+        >>> new_path = await transcoder.apply(Path("a.part"))   # 无需转码时返回 None
+    """
+
+    def __init__(
+        self,
+        format: Optional[str] = None,
+        max_edge: Optional[int] = None,
+        quality: int = 85,
+        workers: Optional[int] = None
+    ):
+        """
+        Args:
+            format: 目标格式 (jpeg/png/webp)，None 表示保持原格式只缩放
+            max_edge: 最长边上限（像素），None 表示不缩放
+            quality: JPEG/WebP 编码质量
+            workers: 线程池大小，默认为 CPU 核数
+        """
+        if Image is None:
+            raise ImportError("图片转码需要 Pillow，请运行: pip install pillow")
+        if format is not None and format not in TRANSCODE_FORMATS:
+            raise ValueError(f"不支持的转码格式: {format}，可选: {', '.join(TRANSCODE_FORMATS)}")
+        if format is None and not max_edge:
+            raise ValueError("format 和 max_edge 至少指定一个")
+
+        self.format = format
+        self.max_edge = max_edge
+        self.quality = quality
+        self._pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4)
+
+    @property
+    def extension(self) -> Optional[str]:
+        """转码后的扩展名（保持原格式时为 None）"""
+        return TRANSCODE_FORMATS[self.format][1] if self.format else None
+
+    def transcode(self, path: Path) -> Optional[Path]:
+        """
+        同步转码
+
+        Args:
+            path: 源文件
+
+        Returns:
+            Optional[Path]: 转码结果的临时文件（与源文件同目录），无需转码时返回 None
+        """
+        with Image.open(path) as image:
+            if getattr(image, "is_animated", False):
+                return None
+
+            source_format = (image.format or "").upper()
+            target_format = TRANSCODE_FORMATS[self.format][0] if self.format else source_format
+            too_large = self.max_edge and max(image.size) > self.max_edge
+            if not too_large and target_format == source_format:
+                return None
+
+            image = ImageOps.exif_transpose(image)
+            if too_large:
+                image.thumbnail((self.max_edge, self.max_edge), Image.LANCZOS)
+
+            if target_format == "JPEG" and image.mode != "RGB":
+                rgba = image.convert("RGBA")
+                background = Image.new("RGB", rgba.size, (255, 255, 255))
+                background.paste(rgba, mask=rgba.getchannel("A"))
+                image = background
+            elif image.mode not in ("RGB", "RGBA", "L", "LA", "P"):
+                image = image.convert("RGBA")
+
+            output = path.with_name(path.name + ".out")
+            options = {"optimize": True} if target_format == "PNG" else {"quality": self.quality}
+            image.save(output, format=target_format, **options)
+        return output
+
+    async def apply(self, path: Path) -> Optional[Path]:
+        """在线程池中转码，见 transcode()"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.transcode, path)
+
+    def close(self) -> None:
+        """关闭线程池"""
+        self._pool.shutdown(wait=False)
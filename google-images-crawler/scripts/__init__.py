@@ -10,11 +10,12 @@ Google 图片爬虫 Skill - 脚本模块
     from scripts.download import download_images
 """
 
-from .crawl import crawl_images, main as crawl_main
+from .crawl import crawl_images, crawl_images_batch, main as crawl_main
 from .download import download_images, main as download_main
 
 __all__ = [
     'crawl_images',
+    'crawl_images_batch',
     'crawl_main',
     'download_images', 
     'download_main',
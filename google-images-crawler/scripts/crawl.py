@@ -4,10 +4,14 @@ Google 图片爬虫 - 爬取图片 URL
 
 用法:
     python crawl.py --keyword "cat" --count 10 --output images.json
+    python crawl.py --keywords-file keywords.txt --workers 4 --output batch.json
+    python crawl.py --keyword "cat" --count 50 --ndjson | python download.py --ndjson
+    python crawl.py --keyword "cat" --count 20 --providers wikimedia,bing
     
 作为模块使用:
-    from scripts.crawl import crawl_images
+    from scripts.crawl import crawl_images, crawl_images_batch
     results = await crawl_images(keyword="cat", count=10)
+    batch = await crawl_images_batch(keywords=["cat", "dog"], count=10)
 """
 
 import os
@@ -16,14 +20,25 @@ import json
 import asyncio
 import argparse
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, AsyncIterator, TextIO
 
 # 添加项目根目录到路径
 SCRIPT_DIR = Path(__file__).parent.resolve()
 PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
 sys.path.insert(0, str(PROJECT_ROOT))
 
+from core.cache import CrawlCache, DEFAULT_CACHE_PATH
 from core.crawler import GoogleImageCrawler, ImageResult
+from core.pool import GoogleImageCrawlerPool
+from core.profiles import PROFILES
+from core.phash import DEFAULT_RADIUS
+from core.providers import PROVIDERS, MultiSearch, create_providers, rank_results
+
+# 启用近似去重时多搜索的比例，以弥补被剔除的重复结果
+DEDUPE_OVERFETCH = 1.5
+
+# 流式输出时近似去重的批大小
+DEDUPE_BATCH = 10
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -45,14 +60,36 @@ def create_parser() -> argparse.ArgumentParser:
   
   # 使用代理
   python crawl.py -k "anime" --proxy "http://127.0.0.1:8080"
+  
+  # 批量关键词（共享一个浏览器，4 个页面并发）
+  python crawl.py -K keywords.txt -w 4 -c 30 -o batch.json
+  
+  # 按缩略图感知哈希剔除近似重复图片
+  python crawl.py -k "eiffel tower" -c 30 --dedupe
+  
+  # 启用结果缓存（重复关键词不再启动浏览器）
+  python crawl.py -k "cat" -c 20 --cache --cache-ttl 3600
+  
+  # 流式输出 NDJSON（每找到一张输出一行），与 download.py 串联边爬边下载
+  python crawl.py -k "cat" -c 50 --ndjson | python download.py --ndjson -o ./downloads/cat
+  
+  # 多搜索源并发查询（无需浏览器），按分辨率排序合并
+  python crawl.py -k "eiffel tower" -c 20 --providers wikimedia,bing --provider-timeout 8
+  
+  # 本地目录优先，其余由 Google 补足
+  python crawl.py -k "company logo" -c 10 --providers local,google --catalog catalog.json
         """
     )
     
     # 搜索参数
-    parser.add_argument(
+    keyword_group = parser.add_mutually_exclusive_group(required=True)
+    keyword_group.add_argument(
         '-k', '--keyword',
-        required=True,
-        help='搜索关键词（必填）'
+        help='搜索关键词'
+    )
+    keyword_group.add_argument(
+        '-K', '--keywords-file',
+        help='关键词列表文件（每行一个关键词，# 开头为注释），启用批量模式'
     )
     parser.add_argument(
         '-c', '--count',
@@ -84,6 +121,32 @@ def create_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='格式化 JSON 输出'
     )
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='流式输出 NDJSON：每找到一张图片立即输出一行（含 keyword 字段），不等待搜索结束'
+    )
+    
+    # 搜索源
+    parser.add_argument(
+        '--providers',
+        type=parse_providers,
+        default=['google'],
+        metavar='NAMES',
+        help=f'搜索源（逗号分隔，可选: {", ".join(PROVIDERS)}）。多个来源时并发查询，'
+             '按 URL 去重后按分辨率排序（默认: google）'
+    )
+    parser.add_argument(
+        '--provider-timeout',
+        type=float,
+        default=MultiSearch.DEFAULT_DEADLINE,
+        help=f'多搜索源时每个来源的截止时间（秒），超时的来源被跳过（默认: {MultiSearch.DEFAULT_DEADLINE:.0f}）'
+    )
+    parser.add_argument(
+        '--catalog',
+        default=None,
+        help='local 搜索源的目录文件（JSON: 关键词 -> 图片 URL 或 {url,title,width,height} 列表）'
+    )
     
     # 爬虫选项
     parser.add_argument(
@@ -113,6 +176,48 @@ def create_parser() -> argparse.ArgumentParser:
         action='store_true',
         help='关闭安全搜索'
     )
+    parser.add_argument(
+        '--engine',
+        choices=GoogleImageCrawler.ENGINES,
+        default=GoogleImageCrawler.ENGINE_DOM,
+        help='结果收集引擎: dom=读取渲染后的结果锚点, network=拦截搜索结果响应（不加载图片，未拦截到时回退 dom）（默认: dom）'
+    )
+    parser.add_argument(
+        '--profile',
+        choices=list(PROFILES),
+        default='full',
+        help='页面配置: full=完整加载, lean=不加载图片/字体/媒体和统计脚本、较小视口、DOM 就绪即提取（默认: full）'
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=GoogleImageCrawlerPool.DEFAULT_SIZE,
+        help=f'批量模式下的并发页面数（默认: {GoogleImageCrawlerPool.DEFAULT_SIZE}）'
+    )
+    
+    parser.add_argument(
+        '--dedupe',
+        nargs='?',
+        type=int,
+        const=DEFAULT_RADIUS,
+        default=None,
+        metavar='RADIUS',
+        help=f'基于缩略图感知哈希剔除近似重复图片，可指定汉明距离阈值（默认: {DEFAULT_RADIUS}，需要 numpy 和 Pillow）'
+    )
+    parser.add_argument(
+        '--cache',
+        nargs='?',
+        const=str(DEFAULT_CACHE_PATH),
+        default=None,
+        metavar='PATH',
+        help=f'启用结果缓存（SQLite），可指定文件路径（默认: {DEFAULT_CACHE_PATH}）'
+    )
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=CrawlCache.DEFAULT_TTL,
+        help=f'缓存有效期（秒，<=0 表示永不过期，默认: {CrawlCache.DEFAULT_TTL}）'
+    )
     
     # 其他
     parser.add_argument(
@@ -129,6 +234,17 @@ def create_parser() -> argparse.ArgumentParser:
     return parser
 
 
+def parse_providers(value: str) -> List[str]:
+    """解析逗号分隔的搜索源列表"""
+    names = list(dict.fromkeys(n.strip().lower() for n in value.split(',') if n.strip()))
+    unknown = [n for n in names if n not in PROVIDERS]
+    if not names or unknown:
+        raise argparse.ArgumentTypeError(
+            f"未知的搜索源: {', '.join(unknown) or value}，可选: {', '.join(PROVIDERS)}"
+        )
+    return names
+
+
 def image_result_to_dict(result: ImageResult) -> Dict[str, Any]:
     """将 ImageResult 转换为字典"""
     return {
@@ -151,7 +267,12 @@ async def crawl_images(
     max_retries: int = 3,
     proxy: Optional[str] = None,
     safe_search: bool = True,
-    verbose: bool = False
+    verbose: bool = False,
+    engine: str = GoogleImageCrawler.ENGINE_DOM,
+    profile: str = 'full',
+    cache: Optional[CrawlCache] = None,
+    dedupe_radius: Optional[int] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
 ) -> List[Dict[str, Any]]:
     """
     爬取 Google 图片 URL
@@ -167,6 +288,12 @@ async def crawl_images(
         proxy: 代理地址
         safe_search: 是否开启安全搜索
         verbose: 是否显示详细日志
+        engine: 结果收集引擎 (dom/network)
+        profile: 页面配置 (full/lean)
+        cache: 爬取结果缓存（可选）
+        dedupe_radius: 近似去重的汉明距离阈值，None 表示不去重
+        on_result: 每得到一张图片时的回调（流式输出）。设置后页面滚动的同时即回调，
+            近似去重按 DEDUPE_BATCH 张一批进行
         
     Returns:
         List[Dict]: 图片信息列表，每个字典包含:
@@ -185,24 +312,304 @@ async def crawl_images(
         headless=headless,
         timeout=timeout,
         max_retries=max_retries,
-        proxy=proxy
+        proxy=proxy,
+        engine=engine,
+        profile=profile,
+        cache=cache
     ) as crawler:
-        results = await crawler.search(
+        found = crawler.iter_search(
             keyword=keyword,
-            num_images=count,
+            num_images=search_count(count, dedupe_radius),
             safe_search=safe_search,
             min_width=min_width,
             min_height=min_height
         )
+        batch_size = DEDUPE_BATCH if on_result else None
+        
+        results = []
+        async for result in dedupe_stream(found, count, dedupe_radius, batch_size):
+            results.append(result)
+            if on_result:
+                on_result(image_result_to_dict(result))
         
         if verbose:
             print(f"[INFO] 获取到 {len(results)} 张图片", file=sys.stderr)
+            print(f"[INFO] {format_transfer_stats(crawler.transfer_stats)}", file=sys.stderr)
+            if cache:
+                print(f"[INFO] {format_cache_stats(cache.stats())}", file=sys.stderr)
         
         return [image_result_to_dict(r) for r in results]
 
 
+async def crawl_images_batch(
+    keywords: List[str],
+    count: int = 10,
+    workers: int = GoogleImageCrawlerPool.DEFAULT_SIZE,
+    min_width: Optional[int] = None,
+    min_height: Optional[int] = None,
+    headless: bool = True,
+    timeout: int = 30,
+    max_retries: int = 3,
+    proxy: Optional[str] = None,
+    safe_search: bool = True,
+    verbose: bool = False,
+    engine: str = GoogleImageCrawler.ENGINE_DOM,
+    profile: str = 'full',
+    cache: Optional[CrawlCache] = None,
+    dedupe_radius: Optional[int] = None,
+    on_results: Optional[Callable[[str, List[Dict[str, Any]]], None]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    批量爬取多个关键词的 Google 图片 URL
+    
+    所有关键词共享一个浏览器，最多 workers 个页面同时搜索。
+    
+    Args:
+        keywords: 关键词列表
+        count: 每个关键词需要的图片数量
+        workers: 并发页面数
+        on_results: 每个关键词完成时的回调 (关键词, 图片信息列表)，用于流式输出
+        其余参数同 crawl_images
+        
+    Returns:
+        Dict[str, List[Dict]]: 关键词到图片信息列表的映射（保持输入顺序），
+            搜索失败的关键词对应空列表
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if verbose:
+        print(f"[INFO] 批量搜索 {len(keywords)} 个关键词，并发页面: {workers}", file=sys.stderr)
+    
+    collected: Dict[str, List[Dict[str, Any]]] = {}
+    
+    async with GoogleImageCrawlerPool(
+        size=min(workers, len(keywords)) or 1,
+        headless=headless,
+        timeout=timeout,
+        max_retries=max_retries,
+        proxy=proxy,
+        engine=engine,
+        profile=profile,
+        cache=cache
+    ) as pool:
+        async for item in pool.search_many(
+            keywords,
+            num_images=search_count(count, dedupe_radius),
+            safe_search=safe_search,
+            min_width=min_width,
+            min_height=min_height
+        ):
+            results = await dedupe_results(item.results, count, dedupe_radius)
+            collected[item.keyword] = [image_result_to_dict(r) for r in results]
+            if on_results:
+                on_results(item.keyword, collected[item.keyword])
+            if verbose:
+                if item.success:
+                    print(f"[INFO] {item.keyword}: {len(results)} 张图片", file=sys.stderr)
+                else:
+                    print(f"[WARNING] {item.keyword}: 搜索失败 - {item.error}", file=sys.stderr)
+        
+        if verbose:
+            print(f"[INFO] {format_transfer_stats(pool.transfer_stats)}", file=sys.stderr)
+            if cache:
+                print(f"[INFO] {format_cache_stats(cache.stats())}", file=sys.stderr)
+    
+    return {k: collected.get(k, []) for k in keywords}
+
+
+async def crawl_images_multi(
+    keywords: List[str],
+    providers: List[str],
+    count: int = 10,
+    workers: int = GoogleImageCrawlerPool.DEFAULT_SIZE,
+    provider_timeout: float = MultiSearch.DEFAULT_DEADLINE,
+    catalog: Optional[str] = None,
+    min_width: Optional[int] = None,
+    min_height: Optional[int] = None,
+    headless: bool = True,
+    timeout: int = 30,
+    max_retries: int = 3,
+    proxy: Optional[str] = None,
+    safe_search: bool = True,
+    verbose: bool = False,
+    engine: str = GoogleImageCrawler.ENGINE_DOM,
+    profile: str = 'full',
+    cache: Optional[CrawlCache] = None,
+    dedupe_radius: Optional[int] = None,
+    on_result: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    使用多个搜索源爬取图片 URL
+    
+    每个关键词同时查询所有搜索源（各自有截止时间），按 URL 去重后合并；最多 workers 个关键词并发。
+    google 来源在所有关键词间共享一个浏览器，每个并发关键词一个页面。
+    
+    Args:
+        keywords: 关键词列表
+        providers: 搜索源名称列表（见 core.providers.PROVIDERS）
+        count: 每个关键词需要的图片数量
+        workers: 并发关键词数
+        provider_timeout: 每个来源的截止时间（秒）
+        catalog: local 来源的目录文件
+        on_result: 每得到一张图片时的回调 (关键词, 图片信息)，设置后结果按到达顺序回调且不排序
+        其余参数同 crawl_images
+        
+    Returns:
+        Dict[str, List[Dict]]: 关键词到图片信息列表的映射（保持输入顺序），
+            未设置 on_result 时每个列表按分辨率从高到低排序
+    """
+    keywords = list(dict.fromkeys(keywords))
+    if verbose:
+        print(f"[INFO] 搜索源: {', '.join(providers)}，{len(keywords)} 个关键词", file=sys.stderr)
+    
+    sources = create_providers(
+        providers,
+        catalog=catalog,
+        min_width=min_width,
+        min_height=min_height,
+        safe_search=safe_search,
+        pages=min(workers, len(keywords)) or 1,
+        headless=headless,
+        timeout=timeout,
+        max_retries=max_retries,
+        proxy=proxy,
+        engine=engine,
+        profile=profile,
+        cache=cache
+    )
+    collected: Dict[str, List[Dict[str, Any]]] = {}
+    semaphore = asyncio.Semaphore(max(1, workers))
+    
+    async with MultiSearch(
+        sources,
+        deadline=provider_timeout,
+        min_width=min_width,
+        min_height=min_height,
+        proxy=proxy
+    ) as multi:
+        
+        async def run(keyword: str) -> None:
+            async with semaphore:
+                stats: Dict[str, Dict[str, Any]] = {}
+                found = multi.iter_search(keyword, search_count(count, dedupe_radius), stats)
+                batch_size = DEDUPE_BATCH if on_result else None
+                results = []
+                async for result in dedupe_stream(found, count, dedupe_radius, batch_size):
+                    results.append(result)
+                    if on_result:
+                        on_result(keyword, image_result_to_dict(result))
+                if not on_result:
+                    results = rank_results(results)
+                collected[keyword] = [image_result_to_dict(r) for r in results]
+                
+                if verbose:
+                    per_source = ", ".join(
+                        f"{name}={s['results']}" + (f" ({s['error']})" if s['error'] else "")
+                        for name, s in stats.items()
+                    )
+                    print(f"[INFO] {keyword}: {len(results)} 张图片 [{per_source}]", file=sys.stderr)
+        
+        await asyncio.gather(*(run(keyword) for keyword in keywords))
+    
+    return {k: collected.get(k, []) for k in keywords}
+
+
+def search_count(count: int, dedupe_radius: Optional[int]) -> int:
+    """启用近似去重时多搜索一些结果"""
+    return int(count * DEDUPE_OVERFETCH) if dedupe_radius is not None else count
+
+
+async def dedupe_results(
+    results: List[ImageResult],
+    count: int,
+    dedupe_radius: Optional[int]
+) -> List[ImageResult]:
+    """按缩略图剔除近似重复结果并截取 count 张"""
+    if dedupe_radius is None:
+        return results
+    
+    from core.phash import filter_near_duplicates
+    return (await filter_near_duplicates(results, radius=dedupe_radius))[:count]
+
+
+async def dedupe_stream(
+    results: AsyncIterator[ImageResult],
+    count: int,
+    dedupe_radius: Optional[int],
+    batch_size: Optional[int] = None
+) -> AsyncIterator[ImageResult]:
+    """
+    流式近似去重：每 batch_size 张一批去重后产出（跨批次共享过滤器），最多 count 张
+    
+    batch_size 为 None 时收集全部结果后一次去重（与 dedupe_results 相同）；不去重时原样产出
+    """
+    if dedupe_radius is None:
+        async for result in results:
+            yield result
+        return
+    
+    from core.phash import NearDuplicateFilter, filter_near_duplicates
+    dedupe_filter = NearDuplicateFilter(radius=dedupe_radius)
+    
+    async def batches() -> AsyncIterator[List[ImageResult]]:
+        batch = []
+        async for result in results:
+            batch.append(result)
+            if batch_size and len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    emitted = 0
+    async for batch in batches():
+        for result in await filter_near_duplicates(batch, radius=dedupe_radius, dedupe_filter=dedupe_filter):
+            yield result
+            emitted += 1
+            if emitted >= count:
+                return
+
+
+def format_transfer_stats(stats: Dict[str, int]) -> str:
+    """格式化浏览器流量统计"""
+    return (
+        f"流量: {stats.get('requests', 0)} 个请求, "
+        f"{stats.get('blocked', 0)} 个已拦截, "
+        f"接收 {stats.get('bytes_received', 0) / 1024:.1f} KB, "
+        f"发送 {stats.get('bytes_sent', 0) / 1024:.1f} KB"
+    )
+
+
+def format_cache_stats(stats: Dict[str, Any]) -> str:
+    """格式化缓存统计"""
+    return (
+        f"缓存: 命中 {stats['hits']}, 未命中 {stats['misses']} "
+        f"(命中率 {stats['hit_rate']:.0%}), "
+        f"{stats['entries']} 条 / {stats['bytes'] / 1024:.1f} KB"
+    )
+
+
+def read_keywords_file(filepath: str) -> List[str]:
+    """读取关键词文件（每行一个关键词，忽略空行和 # 注释）"""
+    path = Path(filepath)
+    if not path.exists():
+        raise FileNotFoundError(f"文件不存在: {filepath}")
+    
+    keywords = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            keywords.append(line)
+    return keywords
+
+
+def write_ndjson(item: Dict[str, Any], stream: TextIO) -> None:
+    """输出一行 NDJSON 并立即刷新，使下游进程可以马上读取"""
+    stream.write(json.dumps(item, ensure_ascii=False) + '\n')
+    stream.flush()
+
+
 def output_results(
-    results: List[Dict[str, Any]],
+    results: Any,
     output_path: Optional[str] = None,
     pretty: bool = False
 ) -> None:
@@ -224,21 +631,72 @@ async def main_async():
     parser = create_parser()
     args = parser.parse_args()
     
+    common = dict(
+        count=args.count,
+        min_width=args.min_width,
+        min_height=args.min_height,
+        headless=not args.no_headless,
+        timeout=args.timeout,
+        max_retries=args.max_retries,
+        proxy=args.proxy,
+        safe_search=not args.unsafe,
+        verbose=args.verbose,
+        engine=args.engine,
+        profile=args.profile,
+        dedupe_radius=args.dedupe
+    )
+    
+    cache = CrawlCache(args.cache, ttl=args.cache_ttl) if args.cache else None
+    common['cache'] = cache
+    
+    stream = None
+    if args.ndjson:
+        if args.output:
+            Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+            stream = open(args.output, 'w', encoding='utf-8')
+        else:
+            stream = sys.stdout
+    
+    def emit(keyword: str, items: List[Dict[str, Any]]) -> None:
+        for item in items:
+            write_ndjson({**item, 'keyword': keyword}, stream)
+    
     try:
-        results = await crawl_images(
-            keyword=args.keyword,
-            count=args.count,
-            min_width=args.min_width,
-            min_height=args.min_height,
-            headless=not args.no_headless,
-            timeout=args.timeout,
-            max_retries=args.max_retries,
-            proxy=args.proxy,
-            safe_search=not args.unsafe,
-            verbose=args.verbose
-        )
+        keywords = None
+        if args.keywords_file:
+            keywords = read_keywords_file(args.keywords_file)
+            if not keywords:
+                print("[ERROR] 关键词文件为空", file=sys.stderr)
+                sys.exit(1)
+        
+        if args.providers != ['google']:
+            results = await crawl_images_multi(
+                keywords=keywords or [args.keyword],
+                providers=args.providers,
+                workers=args.workers,
+                provider_timeout=args.provider_timeout,
+                catalog=args.catalog,
+                on_result=(lambda keyword, item: emit(keyword, [item])) if stream else None,
+                **common
+            )
+            if not keywords:
+                results = results[args.keyword]
+        elif keywords:
+            results = await crawl_images_batch(
+                keywords=keywords,
+                workers=args.workers,
+                on_results=emit if stream else None,
+                **common
+            )
+        else:
+            results = await crawl_images(
+                keyword=args.keyword,
+                on_result=(lambda item: emit(args.keyword, [item])) if stream else None,
+                **common
+            )
         
-        output_results(results, args.output, args.pretty)
+        if not stream:
+            output_results(results, args.output, args.pretty)
         
     except KeyboardInterrupt:
         print("\n[WARNING] 用户中断", file=sys.stderr)
@@ -246,6 +704,11 @@ async def main_async():
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if cache:
+            cache.close()
+        if stream and stream is not sys.stdout:
+            stream.close()
 
 
 def main():
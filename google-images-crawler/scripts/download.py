@@ -5,6 +5,7 @@ Google 图片下载器 - 批量下载图片
 用法:
     python download.py --urls-file images.json --output-dir ./downloads
     cat urls.txt | python download.py --output-dir ./downloads
+    python crawl.py -k "cat" -c 50 --ndjson | python download.py --ndjson -o ./downloads
     
 作为模块使用:
     from scripts.download import download_images
@@ -14,9 +15,11 @@ Google 图片下载器 - 批量下载图片
 import os
 import sys
 import json
+import logging
 import argparse
+import itertools
 from pathlib import Path
-from typing import List, Optional, Dict, Any, TextIO
+from typing import List, Optional, Dict, Any, TextIO, Iterable, Iterator
 
 # 添加项目根目录到路径
 SCRIPT_DIR = Path(__file__).parent.resolve()
@@ -24,6 +27,30 @@ PROJECT_ROOT = SCRIPT_DIR.parent.resolve()
 sys.path.insert(0, str(PROJECT_ROOT))
 
 from core.downloader import ImageDownloader
+from core.engine import DownloadEngine
+from core.metrics import MetricsServer
+from core.store import DEFAULT_STORE_DIR
+from core.validation import TRANSCODE_FORMATS
+
+DEFAULT_MANIFEST_NAME = 'download-manifest.jsonl'
+
+
+def setup_logging(verbose: bool = False, log_file: Optional[str] = None) -> None:
+    """
+    配置日志输出（仅命令行入口调用，作为模块使用时由调用方配置）
+    
+    Args:
+        verbose: 输出 INFO 级别日志，否则只输出警告和错误
+        log_file: 同时写入的日志文件（可选）
+    """
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file, encoding='utf-8'))
+    logging.basicConfig(
+        level=logging.INFO if verbose else logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
 
 
 def create_parser() -> argparse.ArgumentParser:
@@ -48,6 +75,15 @@ def create_parser() -> argparse.ArgumentParser:
   
   # 只提取 JSON 中的 URL 字段
   python download.py -f images.json --url-field url -o ./downloads
+  
+  # 与 crawl.py 串联：爬虫边滚动边输出，下载器边读边下载
+  python crawl.py -k "cat" -c 50 --ndjson | python download.py --ndjson -o ./downloads/cat
+  
+  # 长时间批量任务：记录任务清单，中断后继续
+  python download.py -f urls.txt -o ./downloads --resume
+  
+  # 使用共享的内容寻址存储（跨运行、跨目录去重）
+  python download.py -f cat.json -o ./downloads/cat --store
         """
     )
     
@@ -62,6 +98,11 @@ def create_parser() -> argparse.ArgumentParser:
         default='url',
         help='JSON 文件中 URL 字段名（默认: url）'
     )
+    parser.add_argument(
+        '--ndjson',
+        action='store_true',
+        help='流式模式：逐行读取（每行一个 JSON 对象、JSON 字符串或纯 URL），边读边下载'
+    )
     
     # 输出选项
     parser.add_argument(
@@ -69,6 +110,24 @@ def create_parser() -> argparse.ArgumentParser:
         default='./downloads',
         help='输出目录（默认: ./downloads）'
     )
+    parser.add_argument(
+        '--store',
+        nargs='?',
+        const=str(DEFAULT_STORE_DIR),
+        default=None,
+        metavar='DIR',
+        help=f'启用内容寻址存储：相同内容只保存一份，输出目录中为链接（默认目录: {DEFAULT_STORE_DIR}，可用 IMAGE_STORE_DIR 覆盖）'
+    )
+    parser.add_argument(
+        '--manifest',
+        default=None,
+        help='任务清单 JSONL 路径，逐条记录每个 URL 的状态（默认: 启用 --resume 时为 <输出目录>/download-manifest.jsonl）'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='断点续传：跳过任务清单中已完成的 URL，未完成的 .part 文件通过 HTTP Range 继续下载'
+    )
     parser.add_argument(
         '--save-report',
         default=None,
@@ -99,6 +158,18 @@ def create_parser() -> argparse.ArgumentParser:
         default=3,
         help='最大重试次数（默认: 3）'
     )
+    parser.add_argument(
+        '--per-host',
+        type=int,
+        default=DownloadEngine.DEFAULT_PER_HOST,
+        help=f'每个主机的最大并发数，实际并发按延迟和 429/503 自动调整（默认: {DownloadEngine.DEFAULT_PER_HOST}）'
+    )
+    parser.add_argument(
+        '--host-rate',
+        type=float,
+        default=DownloadEngine.DEFAULT_HOST_RATE,
+        help=f'每个主机的最大请求速率（请求/秒，默认: {DownloadEngine.DEFAULT_HOST_RATE}）'
+    )
     parser.add_argument(
         '-l', '--limit',
         type=int,
@@ -106,6 +177,43 @@ def create_parser() -> argparse.ArgumentParser:
         help='限制下载数量'
     )
     
+    # 校验与转码选项
+    parser.add_argument(
+        '--min-width',
+        type=int,
+        default=0,
+        help='最小宽度（像素），从文件头读取，不满足时中止下载'
+    )
+    parser.add_argument(
+        '--min-height',
+        type=int,
+        default=0,
+        help='最小高度（像素）'
+    )
+    parser.add_argument(
+        '--min-bytes',
+        type=int,
+        default=0,
+        help='最小文件大小（字节）'
+    )
+    parser.add_argument(
+        '--no-validate',
+        action='store_true',
+        help='不校验下载内容（默认按魔数识别格式，非图片内容立即中止）'
+    )
+    parser.add_argument(
+        '--convert',
+        choices=sorted(TRANSCODE_FORMATS),
+        default=None,
+        help='下载后转码为指定格式（需要 Pillow）'
+    )
+    parser.add_argument(
+        '--max-edge',
+        type=int,
+        default=None,
+        help='下载后将最长边缩小到不超过该值（像素，需要 Pillow）'
+    )
+    
     # 网络选项
     parser.add_argument(
         '--proxy',
@@ -118,12 +226,30 @@ def create_parser() -> argparse.ArgumentParser:
         help='自定义 User-Agent'
     )
     
+    # 指标选项
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        default=None,
+        help='在本机该端口提供指标端点（/metrics 为 Prometheus 格式，/metrics.json 为 JSON）'
+    )
+    parser.add_argument(
+        '--metrics-json',
+        default=None,
+        help='下载结束后将完整指标快照保存到 JSON 文件'
+    )
+    
     # 其他
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
         help='显示详细日志'
     )
+    parser.add_argument(
+        '--log-file',
+        default=None,
+        help='同时将日志写入文件'
+    )
     parser.add_argument(
         '--no-progress',
         action='store_true',
@@ -235,8 +361,34 @@ def read_urls_from_stdin(url_field: str = 'url') -> List[str]:
     return urls
 
 
+def iter_ndjson_urls(stream: TextIO, url_field: str = 'url') -> Iterator[str]:
+    """
+    逐行读取 URL（不等待输入结束）
+    
+    每行可以是 JSON 对象（取 url_field 字段）、JSON 字符串或纯文本 URL；
+    空行、# 注释和无法解析的行被忽略
+    """
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        
+        if line[0] in '{"':
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"[WARNING] 无法解析的行: {line[:80]}", file=sys.stderr)
+                continue
+            if isinstance(item, dict):
+                item = item.get(url_field)
+            if isinstance(item, str) and item:
+                yield item
+        else:
+            yield line
+
+
 def download_images(
-    urls: List[str],
+    urls: Iterable[str],
     output_dir: str = './downloads',
     concurrent: int = 5,
     timeout: int = 30,
@@ -245,13 +397,27 @@ def download_images(
     user_agent: Optional[str] = None,
     verbose: bool = False,
     show_progress: bool = True,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    store_dir: Optional[str] = None,
+    manifest_path: Optional[str] = None,
+    resume: bool = False,
+    per_host: int = DownloadEngine.DEFAULT_PER_HOST,
+    host_rate: float = DownloadEngine.DEFAULT_HOST_RATE,
+    validate: bool = True,
+    min_width: int = 0,
+    min_height: int = 0,
+    min_bytes: int = 0,
+    convert_to: Optional[str] = None,
+    max_edge: Optional[int] = None,
+    metrics_port: Optional[int] = None,
+    metrics_path: Optional[str] = None,
+    stream: bool = False
 ) -> Dict[str, Any]:
     """
     批量下载图片
     
     Args:
-        urls: 图片 URL 列表
+        urls: 图片 URL 列表（stream 时可以是任意迭代器）
         output_dir: 输出目录
         concurrent: 并发下载数
         timeout: 超时时间（秒）
@@ -261,6 +427,20 @@ def download_images(
         verbose: 是否显示详细日志
         show_progress: 是否显示进度条
         limit: 限制下载数量
+        store_dir: 内容寻址存储目录（可选）
+        manifest_path: 任务清单路径（可选），resume 时默认 <output_dir>/download-manifest.jsonl
+        resume: 是否跳过任务清单中已完成的 URL
+        per_host: 每个主机的最大并发数
+        host_rate: 每个主机的最大请求速率（请求/秒）
+        validate: 是否在下载时校验内容
+        min_width: 最小宽度（像素）
+        min_height: 最小高度（像素）
+        min_bytes: 最小文件大小（字节）
+        convert_to: 转码目标格式 (jpeg/png/webp)
+        max_edge: 最长边上限（像素）
+        metrics_port: 指标端点端口（可选），下载期间可通过 HTTP 查看
+        metrics_path: 完整指标快照的保存路径（可选）
+        stream: 流式模式，边迭代 urls 边下载（适用于管道输入）
         
     Returns:
         Dict: 下载结果报告，包含:
@@ -268,22 +448,23 @@ def download_images(
             - success: 成功列表 [{url, path}, ...]
             - failed: 失败列表 [{url, error}, ...]
             - success_rate: 成功率
+            - metrics: 指标摘要（字节数、吞吐、延迟分位数、各类请求结果数）
     """
-    if not urls:
-        return {
-            'total': 0,
-            'success': [],
-            'failed': [],
-            'success_rate': 0.0
-        }
-    
-    if limit:
-        urls = urls[:limit]
+    if stream:
+        if limit:
+            urls = itertools.islice(urls, limit)
+    else:
+        urls = list(urls)[:limit] if limit else list(urls)
+        if not urls:
+            return {
+                'total': 0,
+                'success': [],
+                'failed': [],
+                'success_rate': 0.0
+            }
     
-    # 设置代理环境变量
-    if proxy:
-        os.environ['HTTP_PROXY'] = proxy
-        os.environ['HTTPS_PROXY'] = proxy
+    if resume and not manifest_path:
+        manifest_path = str(Path(output_dir) / DEFAULT_MANIFEST_NAME)
     
     # 准备请求头
     headers = None
@@ -296,16 +477,31 @@ def download_images(
         timeout=timeout,
         max_retries=retries,
         concurrent=concurrent,
-        headers=headers
+        headers=headers,
+        proxy=proxy,
+        show_progress=show_progress,
+        store_dir=store_dir,
+        manifest_path=manifest_path,
+        resume=resume,
+        per_host=per_host,
+        host_rate=host_rate,
+        validate=validate,
+        min_width=min_width,
+        min_height=min_height,
+        min_bytes=min_bytes,
+        convert_to=convert_to,
+        max_edge=max_edge
     )
+    server = MetricsServer(downloader.metrics, port=metrics_port).start() if metrics_port is not None else None
     
     try:
-        # 注意：ImageDownloader 使用 tqdm 显示进度
-        # 暂时无法直接控制进度条显示/隐藏
-        results = downloader.download_batch(urls)
+        if stream:
+            results = downloader.download_stream(urls)
+        else:
+            results = downloader.download_batch(urls)
         
         # 构建报告
-        total = len(urls)
+        total = downloader.stats['total']
         success_count = len(results.get('success', []))
         failed_count = len(results.get('failed', []))
         
@@ -315,10 +511,27 @@ def download_images(
             'failed': results.get('failed', []),
             'success_rate': (success_count / total * 100) if total > 0 else 0.0
         }
+        if downloader.store:
+            report['store'] = downloader.store.stats()
+        
+        snapshot = downloader.metrics.snapshot()
+        report['metrics'] = {
+            'bytes': snapshot['bytes'],
+            'bytes_per_sec': snapshot['bytes_per_sec'],
+            'latency_p50': snapshot['latency']['p50'],
+            'latency_p90': snapshot['latency']['p90'],
+            'attempts': snapshot['attempts'],
+        }
+        if metrics_path:
+            path = Path(metrics_path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(downloader.metrics.to_json(), encoding='utf-8')
         
         return report
         
     finally:
+        if server:
+            server.close()
         downloader.close()
 
 
@@ -336,6 +549,17 @@ def print_report(report: Dict[str, Any]) -> None:
     print(f"成功:   {success} 张", file=sys.stderr)
     print(f"失败:   {failed} 张", file=sys.stderr)
     print(f"成功率: {rate:.1f}%", file=sys.stderr)
+    
+    store = report.get('store')
+    if store:
+        print(f"存储:   命中 URL {store['url_hits']} 张, 内容去重 {store['content_hits']} 张, "
+              f"共 {store['objects']} 个对象 ({store['bytes'] / 1024 / 1024:.1f} MB)", file=sys.stderr)
+    
+    metrics = report.get('metrics')
+    if metrics and metrics.get('bytes'):
+        latency = metrics.get('latency_p50')
+        print(f"吞吐:   {metrics['bytes'] / 1024 / 1024:.1f} MB, {metrics['bytes_per_sec'] / 1024:.0f} KB/s"
+              + (f", 延迟 p50 {latency * 1000:.0f} ms" if latency is not None else ""), file=sys.stderr)
     print("=" * 50, file=sys.stderr)
 
 
@@ -372,10 +596,21 @@ def main():
     """主函数"""
     parser = create_parser()
     args = parser.parse_args()
+    setup_logging(args.verbose, args.log_file)
     
+    source = None
     try:
         # 读取 URL 列表
-        if args.urls_file:
+        if args.ndjson:
+            if args.urls_file:
+                source = open(args.urls_file, 'r', encoding='utf-8')
+            elif sys.stdin.isatty():
+                print("[ERROR] --ndjson 需要 URL 文件或管道输入", file=sys.stderr)
+                sys.exit(1)
+            if args.verbose:
+                print(f"[INFO] 流式读取: {args.urls_file or 'stdin'}", file=sys.stderr)
+            urls = iter_ndjson_urls(source or sys.stdin, args.url_field)
+        elif args.urls_file:
             if args.verbose:
                 print(f"[INFO] 从文件读取: {args.urls_file}", file=sys.stderr)
             urls = read_urls_from_file(args.urls_file, args.url_field)
@@ -388,12 +623,12 @@ def main():
             parser.print_help()
             sys.exit(1)
         
-        if not urls:
-            print("[ERROR] 没有找到有效的 URL", file=sys.stderr)
-            sys.exit(1)
-        
-        if args.verbose:
-            print(f"[INFO] 找到 {len(urls)} 个 URL", file=sys.stderr)
+        if not args.ndjson:
+            if not urls:
+                print("[ERROR] 没有找到有效的 URL", file=sys.stderr)
+                sys.exit(1)
+            if args.verbose:
+                print(f"[INFO] 找到 {len(urls)} 个 URL", file=sys.stderr)
         
         # 执行下载
         report = download_images(
@@ -406,7 +641,21 @@ def main():
             user_agent=args.user_agent,
             verbose=args.verbose,
             show_progress=not args.no_progress,
-            limit=args.limit
+            limit=args.limit,
+            store_dir=args.store,
+            manifest_path=args.manifest,
+            resume=args.resume,
+            per_host=args.per_host,
+            host_rate=args.host_rate,
+            validate=not args.no_validate,
+            min_width=args.min_width,
+            min_height=args.min_height,
+            min_bytes=args.min_bytes,
+            convert_to=args.convert,
+            max_edge=args.max_edge,
+            metrics_port=args.metrics_port,
+            metrics_path=args.metrics_json,
+            stream=args.ndjson
         )
         
         # 打印报告
@@ -433,6 +682,9 @@ def main():
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        if source:
+            source.close()
 
 
 if __name__ == '__main__':
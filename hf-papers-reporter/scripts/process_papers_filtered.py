@@ -7,6 +7,8 @@ import requests
 import json
 import os
 import re
+import argparse
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from pathlib import Path
 from bs4 import BeautifulSoup
 import fitz
@@ -16,6 +18,8 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from io import BytesIO
 from PIL import Image
 import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # 配置
 WORK_DIR = Path(__file__).parent.parent  # skill根目录
@@ -38,6 +42,10 @@ PAPERS = [
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36"}
 
+# 并发参数
+NETWORK_WORKERS = 6        # 同时进行的下载数（PDF + 封面图）
+CPU_WORKERS = None         # PDF 解析/图片筛选进程数（None 为 CPU 核数）
+
 # 图片筛选参数
 MIN_IMAGE_WIDTH = 150      # 最小宽度（过滤小图标）
 MIN_IMAGE_HEIGHT = 100     # 最小高度
@@ -46,7 +54,18 @@ MAX_IMAGE_HEIGHT = 1500    # 最大高度
 MIN_CONTENT_RATIO = 0.05   # 最小内容比例（过滤空白/纯背景图片）
 MAX_TEXT_LIKE_RATIO = 0.85 # 最大类文本比例（过滤纯文本截图）
 
-def download_pdf(arxiv_id):
+def make_session(pool_size=NETWORK_WORKERS):
+    """创建共享的 HTTP 会话（连接池复用 keep-alive 连接，对 429/5xx 自动重试）"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=1, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, pool_size), max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def download_pdf(arxiv_id, session=None):
     """从 arxiv.org 下载 PDF"""
     pdf_path = PDF_DIR / f"{arxiv_id}.pdf"
     if pdf_path.exists():
@@ -57,7 +76,7 @@ def download_pdf(arxiv_id):
     
     url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=60)
+        resp = (session or requests).get(url, headers=HEADERS, timeout=60)
         if resp.status_code == 200 and resp.content.startswith(b'%PDF'):
             with open(pdf_path, 'wb') as f:
                 f.write(resp.content)
@@ -68,14 +87,14 @@ def download_pdf(arxiv_id):
         print(f"    下载错误: {e}")
     return None
 
-def download_cover_image(img_url, arxiv_id):
+def download_cover_image(img_url, arxiv_id, session=None):
     """下载并压缩封面图"""
     img_path = IMAGE_DIR / f"{arxiv_id}_cover.png"
     if img_path.exists():
         return str(img_path)
     
     try:
-        resp = requests.get(img_url, headers=HEADERS, timeout=30)
+        resp = (session or requests).get(img_url, headers=HEADERS, timeout=30)
         if resp.status_code == 200:
             img = Image.open(BytesIO(resp.content))
             if img.mode in ('RGBA', 'P'):
@@ -150,8 +169,12 @@ def is_likely_figure(img_data):
     return True, "通过"
 
 def extract_from_pdf(pdf_path):
-    """从PDF提取文本和图片（带筛选）"""
-    result = {"abstract": "", "introduction": "", "images": []}
+    """
+    从PDF提取文本和图片（带筛选）
+
+    在进程池中运行时输出会交错，因此过程信息收集到 result["log"]，由调用方统一打印
+    """
+    result = {"abstract": "", "introduction": "", "images": [], "log": []}
     
     try:
         doc = fitz.open(pdf_path)
@@ -207,7 +230,7 @@ def extract_from_pdf(pdf_path):
                     
                     if not is_valid:
                         filtered_count += 1
-                        print(f"    过滤图片 {img_idx}: {reason}")
+                        result["log"].append(f"过滤图片 {img_idx}: {reason}")
                         continue
                     
                     # 压缩并保存
@@ -228,53 +251,110 @@ def extract_from_pdf(pdf_path):
                 break
         
         if filtered_count > 0:
-            print(f"    过滤了 {filtered_count} 张不相关图片")
+            result["log"].append(f"过滤了 {filtered_count} 张不相关图片")
         
         doc.close()
     except Exception as e:
-        print(f"    PDF处理错误: {e}")
+        result["log"].append(f"PDF处理错误: {e}")
     
     return result
 
-def process_paper(paper_info, index):
-    """处理单篇论文"""
-    print(f"\n[{index+1}/10] {paper_info['title'][:50]}...")
-    
-    arxiv_id = paper_info['arxiv_id']
-    result = {
+def empty_result(paper_info):
+    """单篇论文的结果结构"""
+    return {
         "title": paper_info['title'],
-        "arxiv_id": arxiv_id,
+        "arxiv_id": paper_info['arxiv_id'],
         "cover_image": None,
         "pdf_images": [],
         "abstract": "",
         "introduction": ""
     }
+
+def report_paper(result, index, total, pdf_ok, log=()):
+    """打印单篇论文的处理结果"""
+    print(f"\n[{index+1}/{total}] {result['title'][:50]}...")
+    if not pdf_ok:
+        print(f"    ❌ PDF下载失败")
+        return
+    print(f"    ✓ PDF下载完成")
+    if result['cover_image']:
+        print(f"    ✓ 封面图")
+    for line in log:
+        print(f"    {line}")
+    print(f"    ✓ 摘要: {len(result['abstract'])} 字符")
+    print(f"    ✓ 介绍: {len(result['introduction'])} 字符")
+    print(f"    ✓ 相关图片: {len(result['pdf_images'])} 张")
+
+def apply_content(result, content):
+    result['abstract'] = content['abstract']
+    result['introduction'] = content['introduction']
+    result['pdf_images'] = content['images']
+
+def process_paper(paper_info, index, session=None):
+    """处理单篇论文（串行）"""
+    result = empty_result(paper_info)
     
     # 1. 下载 PDF
-    pdf_path = download_pdf(arxiv_id)
+    pdf_path = download_pdf(paper_info['arxiv_id'], session)
     if not pdf_path:
-        print(f"    ❌ PDF下载失败")
+        report_paper(result, index, len(PAPERS), False)
         return result
-    print(f"    ✓ PDF下载完成")
     
     # 2. 下载封面图
-    cover_path = download_cover_image(paper_info['img_url'], arxiv_id)
-    if cover_path:
-        result['cover_image'] = cover_path
-        print(f"    ✓ 封面图")
+    result['cover_image'] = download_cover_image(paper_info['img_url'], paper_info['arxiv_id'], session)
     
     # 3. 提取内容（带图片筛选）
     content = extract_from_pdf(pdf_path)
-    result['abstract'] = content['abstract']
-    result['introduction'] = content['introduction']
-    result['pdf_images'] = content['images']
-    
-    print(f"    ✓ 摘要: {len(content['abstract'])} 字符")
-    print(f"    ✓ 介绍: {len(content['introduction'])} 字符")
-    print(f"    ✓ 相关图片: {len(content['images'])} 张")
+    apply_content(result, content)
+    report_paper(result, index, len(PAPERS), True, content['log'])
     
     return result
 
+def process_papers(papers, network_workers=NETWORK_WORKERS, cpu_workers=CPU_WORKERS):
+    """
+    并发处理论文，结果按 papers 的顺序返回
+
+    分两级流水线：
+    1. 下载（PDF + 封面图）在线程池中进行，共享一个带连接池的 Session
+    2. 每篇 PDF 下载完成后立即提交到进程池做 PyMuPDF 解析和 NumPy 图片筛选，
+       与其余下载重叠进行（CPU 密集部分不受 GIL 限制）
+    """
+    results = [empty_result(paper) for paper in papers]
+    session = make_session(network_workers)
+    
+    with ThreadPoolExecutor(max_workers=max(1, network_workers)) as fetch_pool, \
+         ProcessPoolExecutor(max_workers=cpu_workers) as extract_pool:
+        pdf_futures = {}
+        cover_futures = {}
+        for idx, paper in enumerate(papers):
+            pdf_futures[fetch_pool.submit(download_pdf, paper['arxiv_id'], session)] = idx
+            cover_futures[idx] = fetch_pool.submit(download_cover_image, paper['img_url'], paper['arxiv_id'], session)
+        
+        # 阶段1 -> 阶段2：PDF 一到就开始解析
+        extract_futures = {}
+        for future in as_completed(pdf_futures):
+            idx = pdf_futures[future]
+            pdf_path = future.result()
+            if pdf_path:
+                extract_futures[extract_pool.submit(extract_from_pdf, pdf_path)] = idx
+            else:
+                report_paper(results[idx], idx, len(papers), False)
+        
+        # 按完成顺序汇总并打印，结果仍放回原位置
+        for future in as_completed(extract_futures):
+            idx = extract_futures[future]
+            try:
+                content = future.result()
+            except Exception as e:
+                # 工作进程异常退出（如 PyMuPDF 崩溃）
+                content = {"abstract": "", "introduction": "", "images": [], "log": [f"PDF处理错误: {e}"]}
+            results[idx]['cover_image'] = cover_futures[idx].result()
+            apply_content(results[idx], content)
+            report_paper(results[idx], idx, len(papers), True, content['log'])
+    
+    session.close()
+    return results
+
 def create_word_report(results):
     """生成 Word 报告"""
     doc = Document()
@@ -350,6 +430,12 @@ def create_word_report(results):
     return str(output_path)
 
 def main():
+    parser = argparse.ArgumentParser(description="Hugging Face Daily Papers 报告生成器（图片筛选版）")
+    parser.add_argument("--network-workers", type=int, default=NETWORK_WORKERS, help="并发下载数")
+    parser.add_argument("--cpu-workers", type=int, default=CPU_WORKERS, help="PDF 解析进程数（默认 CPU 核数）")
+    parser.add_argument("--serial", action="store_true", help="逐篇串行处理（调试用）")
+    args = parser.parse_args()
+    
     print("="*60)
     print("Hugging Face Daily Papers 报告生成器（图片筛选版）")
     print("="*60)
@@ -359,10 +445,11 @@ def main():
         img.unlink()
     print("已清理旧图片文件\n")
     
-    results = []
-    for idx, paper in enumerate(PAPERS):
-        result = process_paper(paper, idx)
-        results.append(result)
+    if args.serial:
+        session = make_session(1)
+        results = [process_paper(paper, idx, session) for idx, paper in enumerate(PAPERS)]
+    else:
+        results = process_papers(PAPERS, args.network_workers, args.cpu_workers)
     
     print("\n" + "="*60)
     print("生成 Word 报告...")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+长文本分段与音频拼接工具
+- 按中英文标点切分句子，合并为不超过接口长度限制的分段
+- 解析 MP3 帧头 / WAV 文件头计算时长（无需解码）
+- 按帧拼接 MP3（去掉 ID3 标签和 Xing/Info 帧），WAV/PCM 直接拼接采样数据并修正文件头
+"""
+
+import re
+import struct
+from pathlib import Path
+
+# 火山引擎 HTTP 接口单次请求的文本上限为 1024 字节（UTF-8），留出余量
+DEFAULT_MAX_CHUNK_BYTES = 900
+
+# 句末标点（中文、英文），其后切分；英文句号等要求后面跟空白或结尾，避免切开小数和缩写
+_SENTENCE_RE = re.compile(r'.*?(?:[。！？；…]+[”’」』）)]*|[.!?;]+[”’"\')\]]*(?=\s|$)|\n+)', re.S)
+
+# 句内停顿标点，句子过长时在此处切分
+_CLAUSE_RE = re.compile(r'.*?(?:[，、：,:]+\s*)', re.S)
+
+
+def _utf8_len(text):
+    return len(text.encode('utf-8'))
+
+
+def split_sentences(text):
+    """
+    按句末标点切分句子（保留标点）
+
+    Returns:
+        list: 去掉首尾空白后的非空句子
+    """
+    sentences = []
+    pos = 0
+    for match in _SENTENCE_RE.finditer(text):
+        if match.end() == pos:
+            continue
+        sentences.append(match.group())
+        pos = match.end()
+    sentences.append(text[pos:])
+    return [s.strip() for s in sentences if s.strip()]
+
+
+def _split_long(sentence, max_bytes):
+    """将超过上限的句子先按句内标点、再按字符切开"""
+    if _utf8_len(sentence) <= max_bytes:
+        return [sentence]
+
+    parts = []
+    pos = 0
+    for match in _CLAUSE_RE.finditer(sentence):
+        parts.append(match.group())
+        pos = match.end()
+    parts.append(sentence[pos:])
+
+    pieces = []
+    for part in filter(None, parts):
+        while _utf8_len(part) > max_bytes:
+            # 没有可用标点时按字符硬切
+            cut = len(part.encode('utf-8')[:max_bytes].decode('utf-8', errors='ignore'))
+            pieces.append(part[:cut])
+            part = part[cut:]
+        pieces.append(part)
+    return pieces
+
+
+def chunk_text(text, max_bytes=DEFAULT_MAX_CHUNK_BYTES):
+    """
+    将长文本切分为适合单次合成的分段
+
+    先按句子切分，再将相邻句子合并到不超过 max_bytes（UTF-8 字节），
+    单个句子过长时在逗号等处切开。
+
+    Args:
+        text: 原文
+        max_bytes: 每段最大字节数
+
+    Returns:
+        list: 分段文本（保持原文顺序）
+    """
+    chunks = []
+    current = ''
+    for sentence in split_sentences(text):
+        for piece in _split_long(sentence, max_bytes):
+            # 英文句子之间保留空格，中文直接相连
+            joiner = ' ' if current and (current[-1].isascii() or piece[0].isascii()) else ''
+            if current and _utf8_len(current + joiner + piece) > max_bytes:
+                chunks.append(current)
+                current = piece
+            else:
+                current = current + joiner + piece if current else piece
+    if current:
+        chunks.append(current)
+    return [c.strip() for c in chunks if c.strip()]
+
+
+# ---------------------------------------------------------------- MP3
+
+# 比特率表 (kbps)：键为 (是否 MPEG1, 层)
+_MP3_BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# 采样率表：键为版本位 (3=MPEG1, 2=MPEG2, 0=MPEG2.5)
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _mp3_frame(data, pos):
+    """
+    解析 pos 处的 MP3 帧头
+
+    Returns:
+        tuple or None: (帧长度, 每帧采样数, 采样率)，不是有效帧头时为 None
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = 4 - ((data[pos + 1] >> 1) & 0x03)
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate
+    samples = 1152 if (layer == 2 or mpeg1) else 576
+    return samples // 8 * bitrate // sample_rate + padding, samples, sample_rate
+
+
+def _id3v2_size(data):
+    """文件开头 ID3v2 标签的总长度（没有时为 0）"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def parse_mp3(data):
+    """
+    扫描 MP3 帧
+
+    跳过开头的 ID3v2 标签、结尾的 ID3v1 标签和 Xing/Info/VBRI 信息帧（这些帧不含音频，
+    拼接后其中的帧数也不再正确）。
+
+    Args:
+        data: MP3 文件内容
+
+    Returns:
+        dict: {"frames": [(起始, 结束)...], "duration": 秒, "sample_rate": 采样率}
+    """
+    end = len(data)
+    if end >= 128 and data[end - 128:end - 125] == b'TAG':
+        end -= 128
+
+    pos = _id3v2_size(data)
+    frames = []
+    samples = 0
+    sample_rate = None
+    while pos < end:
+        frame = _mp3_frame(data, pos)
+        if frame is None or pos + frame[0] > end:
+            pos += 1    # 失去同步，向后寻找下一个帧头
+            continue
+        length, frame_samples, rate = frame
+        body = data[pos:pos + length]
+        is_info = not frames and (b'Xing' in body[:64] or b'Info' in body[:64] or body[36:40] == b'VBRI')
+        if not is_info:
+            frames.append((pos, pos + length))
+            samples += frame_samples
+            sample_rate = rate
+        pos += length
+
+    return {
+        "frames": frames,
+        "duration": samples / sample_rate if sample_rate else 0.0,
+        "sample_rate": sample_rate,
+    }
+
+
+def mp3_duration(data):
+    """根据帧头计算 MP3 时长（秒）"""
+    return parse_mp3(data)["duration"]
+
+
+# ---------------------------------------------------------------- WAV / PCM
+
+def parse_wav(data):
+    """
+    解析 WAV 文件头
+
+    Returns:
+        dict: {"channels", "sample_rate", "bits", "data_offset", "data_size"}
+
+    Raises:
+        ValueError: 不是有效的 WAV 文件
+    """
+    if len(data) < 12 or data[:4] != b'RIFF' or data[8:12] != b'WAVE':
+        raise ValueError("不是有效的 WAV 文件")
+    info = {}
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id, size = data[pos:pos + 4], struct.unpack('<I', data[pos + 4:pos + 8])[0]
+        if chunk_id == b'fmt ':
+            _, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', data[pos + 8:pos + 24])
+            info.update(channels=channels, sample_rate=sample_rate, bits=bits)
+        elif chunk_id == b'data':
+            # 流式生成的 WAV 中 data 长度可能是占位值，以实际长度为准
+            info.update(data_offset=pos + 8, data_size=min(size, len(data) - pos - 8))
+            break
+        pos += 8 + size + (size & 1)
+    if 'sample_rate' not in info or 'data_offset' not in info:
+        raise ValueError("WAV 文件缺少 fmt 或 data 块")
+    return info
+
+
+def wav_header(sample_rate, channels=1, bits=16, data_size=0):
+    """生成 44 字节的 PCM WAV 文件头"""
+    block_align = channels * bits // 8
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, bits,
+        b'data', data_size,
+    )
+
+
+def audio_duration(data, encoding, sample_rate=24000):
+    """
+    计算音频时长（秒）
+
+    Args:
+        data: 音频内容
+        encoding: mp3 / wav / pcm（pcm 按 16 位单声道计算）
+        sample_rate: pcm 的采样率
+    """
+    if encoding == 'mp3':
+        return mp3_duration(data)
+    if encoding == 'wav':
+        info = parse_wav(data)
+        return info['data_size'] / (info['sample_rate'] * info['channels'] * info['bits'] // 8)
+    return len(data) / (sample_rate * 2)
+
+
+class AudioConcatenator:
+    """
+    逐段拼接音频并写入文件
+
+    - mp3: 只写入音频帧（去掉各段的 ID3 标签和 Xing/Info 帧），按帧拼接
+    - wav: 写入一个文件头，之后只追加各段的采样数据，关闭时修正长度字段
+    - pcm: 直接追加
+
+    Example:
+        >>> with AudioConcatenator("out.mp3", "mp3") as out:
+        ...     start, end = out.append(chunk_bytes)   # 该段在输出中的起止时间（秒）
+    """
+
+    def __init__(self, output_file, encoding='mp3', sample_rate=24000):
+        self.output_file = Path(output_file)
+        self.encoding = encoding
+        self.sample_rate = sample_rate
+        self.duration = 0.0
+        self._data_size = 0
+        self._wav_format = None
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.output_file, 'wb')
+        if encoding == 'wav':
+            self._file.write(wav_header(sample_rate))    # 占位，关闭时按实际格式和长度重写
+
+    def append(self, data):
+        """
+        追加一段音频
+
+        Returns:
+            tuple: (该段起始时间, 结束时间)，单位秒
+        """
+        start = self.duration
+        if self.encoding == 'mp3':
+            parsed = parse_mp3(data)
+            for begin, end in parsed['frames']:
+                self._file.write(data[begin:end])
+            self.duration += parsed['duration']
+        elif self.encoding == 'wav':
+            info = parse_wav(data)
+            fmt = (info['sample_rate'], info['channels'], info['bits'])
+            if self._wav_format is None:
+                self._wav_format = fmt
+            elif fmt != self._wav_format:
+                raise ValueError(f"WAV 分段格式不一致: {fmt} != {self._wav_format}")
+            samples = data[info['data_offset']:info['data_offset'] + info['data_size']]
+            self._file.write(samples)
+            self._data_size += len(samples)
+            self.duration += len(samples) / (fmt[0] * fmt[1] * fmt[2] // 8)
+        else:
+            self._file.write(data)
+            self._data_size += len(data)
+            self.duration += len(data) / (self.sample_rate * 2)
+        self._file.flush()
+        return start, self.duration
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self.encoding == 'wav':
+            sample_rate, channels, bits = self._wav_format or (self.sample_rate, 1, 16)
+            self._file.seek(0)
+            self._file.write(wav_header(sample_rate, channels, bits, self._data_size))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
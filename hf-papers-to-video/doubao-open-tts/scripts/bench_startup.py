@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+启动耗时基准
+在子进程中多次运行 `import tts`、`tts.py --list-voices` 和 `tts.py --help`，
+取中位数并减去空解释器的启动时间；任一项超过预算时以非零状态退出，可用于 CI 防止启动变慢
+"""
+
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# 相对空解释器的额外耗时预算（毫秒）
+DEFAULT_BUDGET_MS = 80
+
+
+def measure(cmd, runs):
+    """运行命令 runs 次，返回耗时中位数（毫秒）"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(cmd, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='tts.py 启动耗时基准')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='每项运行次数 (默认: 10)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'相对空解释器的额外耗时上限，毫秒 (默认: {DEFAULT_BUDGET_MS})')
+    args = parser.parse_args()
+
+    python = sys.executable
+    baseline = measure([python, '-c', 'pass'], args.runs)
+    cases = {
+        'import tts': [python, '-c', 'import tts'],
+        'tts.py --list-voices': [python, 'tts.py', '--list-voices'],
+        'tts.py --help': [python, 'tts.py', '--help'],
+    }
+
+    print(f"空解释器: {baseline:.1f} ms（{args.runs} 次中位数）")
+    failed = False
+    for name, cmd in cases.items():
+        overhead = measure(cmd, args.runs) - baseline
+        status = "OK" if overhead <= args.budget else "SLOW"
+        failed = failed or status == "SLOW"
+        print(f"[{status}] {name}: +{overhead:.1f} ms（预算 {args.budget:.0f} ms）")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
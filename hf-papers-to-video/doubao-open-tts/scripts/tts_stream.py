@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+流式语音合成（火山引擎 WebSocket 二进制协议）
+音频分片到达即写入文件或交给回调，不必等整段音频合成完毕后再一次性 base64 解码；
+同时记录首包时间 (TTFB) 和总耗时。需要 aiohttp（可选依赖，仅在流式合成时导入本模块）
+
+消息格式：4 字节头 + 负载
+    byte0: 协议版本(高4位) | 头长度/4(低4位)
+    byte1: 消息类型(高4位) | 类型标志(低4位)
+    byte2: 序列化方式(高4位, 1=JSON) | 压缩方式(低4位, 1=gzip)
+    byte3: 保留
+"""
+
+import gzip
+import json
+import time
+import asyncio
+import struct
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+PROTOCOL_VERSION = 0x1
+
+# 消息类型
+MSG_FULL_CLIENT_REQUEST = 0x1
+MSG_AUDIO_ONLY_RESPONSE = 0xB
+MSG_FRONTEND_RESPONSE = 0xC
+MSG_ERROR = 0xF
+
+SERIALIZATION_JSON = 0x1
+COMPRESSION_NONE = 0x0
+COMPRESSION_GZIP = 0x1
+
+
+class StreamError(Exception):
+    """服务端返回错误消息或连接异常结束"""
+
+    def __init__(self, message, code=None):
+        super().__init__(f"{message} (code={code})" if code is not None else message)
+        self.code = code
+
+
+def _header(message_type, flags=0, serialization=SERIALIZATION_JSON, compression=COMPRESSION_GZIP):
+    return bytes([
+        (PROTOCOL_VERSION << 4) | 1,
+        (message_type << 4) | flags,
+        (serialization << 4) | compression,
+        0,
+    ])
+
+
+def encode_request(payload):
+    """将请求体编码为 full client request 消息（gzip 压缩的 JSON）"""
+    body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+    return _header(MSG_FULL_CLIENT_REQUEST) + struct.pack('>I', len(body)) + body
+
+
+def decode_request(message):
+    """解析 full client request 消息，返回请求体（供本地模拟服务使用）"""
+    header_size = (message[0] & 0x0F) * 4
+    size = struct.unpack('>I', message[header_size:header_size + 4])[0]
+    body = message[header_size + 4:header_size + 4 + size]
+    if message[2] & 0x0F == COMPRESSION_GZIP:
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+def encode_audio_response(audio, sequence):
+    """
+    编码一条音频响应（供本地模拟服务使用）
+
+    Args:
+        audio: 音频分片
+        sequence: 分片序号，从 1 开始；最后一片取负数
+    """
+    return (_header(MSG_AUDIO_ONLY_RESPONSE, flags=1, serialization=0, compression=COMPRESSION_NONE)
+            + struct.pack('>iI', sequence, len(audio)) + audio)
+
+
+def encode_error_response(code, message):
+    """编码一条错误响应（供本地模拟服务使用）"""
+    body = gzip.compress(message.encode('utf-8'))
+    return _header(MSG_ERROR) + struct.pack('>II', code, len(body)) + body
+
+
+def decode_response(message):
+    """
+    解析服务端消息
+
+    Returns:
+        dict: {"type": "audio" | "ack" | "frontend" | "error", ...}
+              audio: {"audio", "sequence", "last"}；error: {"code", "message"}；frontend: {"payload"}
+    """
+    header_size = (message[0] & 0x0F) * 4
+    message_type = message[1] >> 4
+    flags = message[1] & 0x0F
+    compression = message[2] & 0x0F
+    payload = message[header_size:]
+
+    if message_type == MSG_AUDIO_ONLY_RESPONSE:
+        if flags == 0:
+            return {"type": "ack"}
+        sequence, size = struct.unpack('>iI', payload[:8])
+        return {"type": "audio", "audio": payload[8:8 + size], "sequence": sequence, "last": sequence < 0}
+
+    if message_type == MSG_ERROR:
+        code, size = struct.unpack('>II', payload[:8])
+        body = payload[8:8 + size]
+        if compression == COMPRESSION_GZIP:
+            body = gzip.decompress(body)
+        return {"type": "error", "code": code, "message": body.decode('utf-8', errors='replace')}
+
+    if message_type == MSG_FRONTEND_RESPONSE:
+        size = struct.unpack('>I', payload[:4])[0]
+        body = payload[4:4 + size]
+        if compression == COMPRESSION_GZIP:
+            body = gzip.decompress(body)
+        return {"type": "frontend", "payload": body}
+
+    raise StreamError(f"未知的消息类型: {message_type:#x}")
+
+
+async def stream_synthesis(url, headers, payload, on_audio, timeout=30):
+    """
+    建立 WebSocket 连接发送一次合成请求，逐片接收音频
+
+    Args:
+        url: ws_binary 接口地址
+        headers: 握手请求头（鉴权）
+        payload: 请求体（operation 为 submit）
+        on_audio: 每收到一片音频调用 on_audio(bytes)
+        timeout: 连接和相邻两片之间的最长等待时间（秒）
+
+    Returns:
+        dict: {"ttfb": 首片音频到达耗时, "latency": 总耗时, "bytes": 音频字节数, "frames": 分片数}
+    """
+    if aiohttp is None:
+        raise ImportError("流式合成需要 aiohttp，请运行: pip install aiohttp")
+
+    started = time.monotonic()
+    ttfb = None
+    received = 0
+    frames = 0
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout)
+    async with aiohttp.ClientSession(timeout=client_timeout) as session:
+        async with session.ws_connect(url, headers=headers, max_msg_size=0, receive_timeout=timeout) as ws:
+            await ws.send_bytes(encode_request(payload))
+            while True:
+                msg = await ws.receive()
+                if msg.type != aiohttp.WSMsgType.BINARY:
+                    raise StreamError(f"连接在音频结束前关闭: {msg.type.name}")
+                response = decode_response(msg.data)
+                if response["type"] == "error":
+                    raise StreamError(response["message"], response["code"])
+                if response["type"] != "audio":
+                    continue
+                if response["audio"]:
+                    if ttfb is None:
+                        ttfb = time.monotonic() - started
+                    received += len(response["audio"])
+                    frames += 1
+                    on_audio(response["audio"])
+                if response["last"]:
+                    break
+
+    return {
+        "ttfb": ttfb,
+        "latency": time.monotonic() - started,
+        "bytes": received,
+        "frames": frames,
+    }
+
+
+def stream_synthesis_sync(url, headers, payload, on_audio, timeout=30):
+    """stream_synthesis 的同步版本（在当前线程中运行一个事件循环，可在线程池中并发调用）"""
+    return asyncio.run(stream_synthesis(url, headers, payload, on_audio, timeout))
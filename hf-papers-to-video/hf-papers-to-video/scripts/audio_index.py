@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+音频时长索引 (audio-durations.json)
+在进程内计算每段配音的时长（优先使用 TTS 响应中的时长，否则解析 MP3 帧头 / WAV 文件头），
+每完成一段就更新索引文件，Remotion 按其中的帧数安排场景，不再为每段音频启动 ffprobe
+
+索引格式:
+    {
+      "fps": 30,
+      "padding": 0.5,
+      "scenes": {
+        "intro": {"file": "public/audio/intro.mp3", "duration": 12.384, "frames": 387,
+                  "size": 198144, "mtime": 1760000000.0}
+      }
+    }
+frames = ceil((duration + padding) * fps)，即场景时长 = 音频时长 + 停顿
+"""
+
+import os
+import sys
+import json
+import math
+import threading
+from pathlib import Path
+
+# 已安装的 doubao-open-tts 技能（提供 audio_utils）
+TTS_SCRIPTS_DIR = Path.home() / "clawd" / "skills" / "doubao-open-tts" / "scripts"
+
+DEFAULT_FPS = 30
+
+# 每个场景在配音结束后的停顿（秒）
+DEFAULT_PADDING = 0.5
+
+
+def probe_duration(path):
+    """
+    解析音频文件时长（秒），支持 mp3 / wav / pcm（24kHz 16 位单声道）
+
+    Raises:
+        ValueError: 无法解析
+    """
+    if str(TTS_SCRIPTS_DIR) not in sys.path:
+        sys.path.insert(0, str(TTS_SCRIPTS_DIR))
+    from audio_utils import audio_duration
+
+    path = Path(path)
+    encoding = path.suffix.lstrip(".").lower() or "mp3"
+    duration = audio_duration(path.read_bytes(), encoding)
+    if not duration:
+        raise ValueError(f"无法解析音频时长: {path}")
+    return duration
+
+
+class DurationIndex:
+    """
+    场景音频时长索引
+
+    每次 update() 后立即原子写入文件（可在批量合成的回调中从多个线程调用）；
+    音频文件大小和修改时间未变的场景不再重新解析。
+
+    Example:
+        >>> index = DurationIndex("audio-durations.json")
+        >>> index.update("intro", "public/audio/intro.mp3", duration=12.384)
+        >>> index.frames("intro")
+        387
+    """
+
+    def __init__(self, path, fps=DEFAULT_FPS, padding=DEFAULT_PADDING):
+        self.path = Path(path)
+        self.fps = fps
+        self.padding = padding
+        self._lock = threading.Lock()
+        self.scenes = self._load()
+
+    def _load(self):
+        """读取已有索引；旧格式（场景 -> 整数秒）或参数不同的索引视为空"""
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if not isinstance(data.get("scenes"), dict):
+            return {}
+        if data.get("fps") != self.fps or data.get("padding") != self.padding:
+            return {}
+        return data["scenes"]
+
+    def frames_for(self, duration):
+        """音频时长对应的场景帧数（含停顿，向上取整到整帧）"""
+        return math.ceil(round((duration + self.padding) * self.fps, 6))
+
+    def update(self, scene_id, audio_file, duration=None):
+        """
+        记录一个场景的音频时长并写入索引
+
+        Args:
+            scene_id: 场景ID
+            audio_file: 音频文件路径
+            duration: 已知时长（如 TTS 响应中的时长）；为 None 时解析音频文件，
+                      文件未变化时沿用索引中的时长
+
+        Returns:
+            dict: 该场景的索引条目
+        """
+        audio_file = Path(audio_file)
+        stat = audio_file.stat()
+        with self._lock:
+            previous = self.scenes.get(scene_id)
+        if duration is None:
+            if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+                duration = previous["duration"]
+            else:
+                duration = probe_duration(audio_file)
+
+        try:
+            file_name = str(audio_file.resolve().relative_to(self.path.resolve().parent))
+        except ValueError:
+            file_name = str(audio_file)
+        entry = {
+            "file": file_name,
+            "duration": round(duration, 3),
+            "frames": self.frames_for(duration),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+        }
+        with self._lock:
+            self.scenes[scene_id] = entry
+            self._save()
+        return entry
+
+    def retain(self, scene_ids):
+        """只保留给定场景（去掉已删除场景的条目）并写入索引"""
+        keep = set(scene_ids)
+        with self._lock:
+            self.scenes = {k: v for k, v in self.scenes.items() if k in keep}
+            self._save()
+
+    def frames(self, scene_id):
+        entry = self.scenes.get(scene_id)
+        return entry["frames"] if entry else None
+
+    @property
+    def total_frames(self):
+        return sum(e["frames"] for e in self.scenes.values())
+
+    def _save(self):
+        """原子写入索引（调用方持有锁）"""
+        data = {"fps": self.fps, "padding": self.padding, "scenes": self.scenes}
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
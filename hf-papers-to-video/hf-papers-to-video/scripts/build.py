@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Incremental papers-to-video build
+
+Runs extract -> filter -> figures -> tts -> render -> concat through the build graph
+(build_graph.py). Each scene is fingerprinted by its inputs (narration text, voice,
+layout, image files, audio, frame count, Remotion sources); only stages and scenes
+whose inputs changed are rebuilt, and independent scenes run in parallel.
+The manifest lives in .build/manifest.json.
+"""
+
+import sys
+import json
+import re
+import argparse
+import subprocess
+from functools import partial
+from pathlib import Path
+
+from build_graph import BuildGraph, Stage, Task
+from generate_tts import DEFAULT_VOICE, DURATIONS_FILE, scene_narration
+
+WORK_DIR = Path(__file__).parent.parent
+SCRIPTS_DIR = WORK_DIR / "scripts"
+SRC_DIR = WORK_DIR / "src"
+AUDIO_DIR = WORK_DIR / "public" / "audio"
+PUBLIC_IMAGES_DIR = WORK_DIR / "public" / "images"
+OUTPUT_DIR = WORK_DIR / "output"
+MANIFEST_FILE = WORK_DIR / ".build" / "manifest.json"
+
+# The scene file src/index.tsx renders
+SCENES_FILE = WORK_DIR / "scenes_papers.json"
+
+STAGES = ["extract", "filter", "figures", "tts", "render", "concat"]
+
+# 'scene-id': 'image file' entries in the Remotion sources (e.g. PAPER_IMAGES)
+IMAGE_REF_RE = re.compile(r"""['"]([\w-]+)['"]\s*:\s*['"]([^'"]+\.(?:png|jpe?g|webp))['"]""")
+
+
+def src_fingerprint(graph):
+    """Content hashes of the Remotion sources, plus the scene -> image references found in them"""
+    files = sorted(p for p in SRC_DIR.rglob("*") if p.suffix in (".ts", ".tsx"))
+    hashes = {str(p.relative_to(WORK_DIR)): graph.file_hash(p) for p in files}
+    refs = {}
+    for path in files:
+        for scene_id, image in IMAGE_REF_RE.findall(path.read_text(encoding="utf-8")):
+            refs.setdefault(scene_id, []).append(image)
+    return hashes, refs
+
+
+def render_scene(scene_id):
+    """Render one Scene-<id> composition to output/scene-<id>.mp4"""
+    output = OUTPUT_DIR / f"scene-{scene_id}.mp4"
+    subprocess.run(
+        ["npx", "remotion", "render", "src/index.tsx", f"Scene-{scene_id}", str(output), "--log=error"],
+        cwd=WORK_DIR, check=True
+    )
+    return {"file": output.name}
+
+
+def concat_clips(clips):
+    """Concatenate scene clips into final.mp4 and a Telegram-sized copy (as in render.sh)"""
+    filelist = OUTPUT_DIR / "filelist.txt"
+    filelist.write_text("".join(f"file '{clip.name}'\n" for clip in clips), encoding="utf-8")
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", str(filelist),
+         "-c", "copy", str(OUTPUT_DIR / "final.mp4")],
+        check=True
+    )
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", str(OUTPUT_DIR / "final.mp4"),
+         "-vcodec", "h264", "-acodec", "aac", "-b:v", "600k", "-b:a", "80k", "-movflags", "+faststart",
+         str(OUTPUT_DIR / "final_telegram.mp4")],
+        check=True
+    )
+    return {"clips": len(clips)}
+
+
+def make_stages(scenes, voice, jobs, render_jobs):
+    """Build the pipeline stages for a scene list"""
+
+    def plan_extract(graph):
+        inputs = {"script": graph.file_hash(SCRIPTS_DIR / "extract_papers.py")}
+
+        def run():
+            import extract_papers
+            extract_papers.main()
+
+        return [Task("papers", inputs, [OUTPUT_DIR / "papers_data.json"], action=run)]
+
+    def plan_filter(graph):
+        import filter_images
+        if not filter_images.IMAGE_DIR.exists():
+            return []
+        script = graph.file_hash(SCRIPTS_DIR / "filter_images.py")
+        images = sorted(filter_images.IMAGE_DIR.glob("*.png")) + sorted(filter_images.IMAGE_DIR.glob("*.jpg"))
+        return [Task(path.name, {"image": graph.file_hash(path), "script": script}) for path in images]
+
+    def run_filter(tasks, graph):
+        # Pixel analysis is CPU-bound: spread the changed images over processes
+        from concurrent.futures import ProcessPoolExecutor
+        import filter_images
+        paths = [filter_images.IMAGE_DIR / task.key for task in tasks]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            verdicts = list(pool.map(filter_images.is_likely_figure, paths, chunksize=4))
+        results = {}
+        for task, (is_valid, reason) in zip(tasks, verdicts):
+            print(f"{'✓' if is_valid else '✗'} {task.key}: {reason}")
+            results[task.key] = {"valid": is_valid, "reason": reason}
+        return results
+
+    def plan_figures(graph):
+        records = graph.manifest.tasks.get("filter", {})
+        verdicts = {name: record["result"] for name, record in sorted(records.items())}
+        output = OUTPUT_DIR / "figures.json"
+
+        def run():
+            OUTPUT_DIR.mkdir(exist_ok=True)
+            valid = [name for name, verdict in verdicts.items() if verdict["valid"]]
+            output.write_text(json.dumps(valid, indent=2), encoding="utf-8")
+            return {"valid": len(valid), "total": len(verdicts)}
+
+        return [Task("figures", verdicts, [output], action=run)]
+
+    def plan_tts(graph):
+        tasks = []
+        for scene in scenes:
+            text = scene_narration(scene)
+            if text.strip():
+                tasks.append(Task(scene["id"], {"text": text, "voice": voice},
+                                  [AUDIO_DIR / f"{scene['id']}.mp3"], scoped=True))
+        return tasks
+
+    def run_tts(tasks, graph):
+        from generate_tts import generate_tts_batch
+        AUDIO_DIR.mkdir(parents=True, exist_ok=True)
+        tts_jobs = [(task.key, task.inputs["text"], task.outputs[0]) for task in tasks]
+        results = generate_tts_batch(tts_jobs, voice=voice, workers=jobs)
+        if results is None:
+            return {}
+        return {
+            scene_id: RuntimeError(r["error"]) if r["error"] else {"duration": r["duration"], "cached": r["cached"]}
+            for scene_id, r in results.items()
+        }
+
+    def plan_render(graph):
+        from audio_index import DurationIndex
+        index = DurationIndex(DURATIONS_FILE)
+        src, image_refs = src_fingerprint(graph)
+
+        tasks = []
+        for scene in scenes:
+            scene_id = scene["id"]
+            audio = AUDIO_DIR / f"{scene_id}.mp3"
+            if audio.exists() and index.frames(scene_id) is None and not graph.dry_run:
+                try:
+                    index.update(scene_id, audio)
+                except ValueError as e:
+                    print(f"[render] {scene_id}: {e}")
+            images = list(scene.get("images", [])) + image_refs.get(scene_id, [])
+            images += [p.name for p in PUBLIC_IMAGES_DIR.glob(f"{scene_id}.*")]
+            inputs = {
+                "scene": scene,
+                "audio": graph.file_hash(audio),
+                "frames": index.frames(scene_id),
+                "images": {name: graph.file_hash(PUBLIC_IMAGES_DIR / name) for name in sorted(set(images))},
+                "src": src,
+            }
+            tasks.append(Task(scene_id, inputs, [OUTPUT_DIR / f"scene-{scene_id}.mp4"],
+                              action=partial(render_scene, scene_id), scoped=True))
+        if not graph.dry_run:
+            index.retain(scene["id"] for scene in scenes)
+            OUTPUT_DIR.mkdir(exist_ok=True)
+        return tasks
+
+    def plan_concat(graph):
+        clips = [OUTPUT_DIR / f"scene-{scene['id']}.mp4" for scene in scenes]
+        clips = [clip for clip in clips if clip.exists()]
+        if not clips:
+            return []
+        inputs = {"clips": [[clip.name, graph.file_hash(clip)] for clip in clips]}
+        outputs = [OUTPUT_DIR / "final.mp4", OUTPUT_DIR / "final_telegram.mp4"]
+        return [Task("final", inputs, outputs, action=partial(concat_clips, clips))]
+
+    return [
+        Stage("extract", plan_extract, workers=1),
+        Stage("filter", plan_filter, run=run_filter),
+        Stage("figures", plan_figures, workers=1),
+        Stage("tts", plan_tts, run=run_tts),
+        Stage("render", plan_render, workers=render_jobs),
+        Stage("concat", plan_concat, workers=1),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental papers-to-video build")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages to run (default: {','.join(STAGES)})")
+    parser.add_argument("--scene", action="append", help="Only rebuild this scene (repeatable)")
+    parser.add_argument("--scenes-file", default=str(SCENES_FILE), help="Scene configuration")
+    parser.add_argument("--voice", default=DEFAULT_VOICE, help="TTS voice type")
+    parser.add_argument("--jobs", type=int, default=4, help="Parallel TTS requests / image workers")
+    parser.add_argument("--render-jobs", type=int, default=2, help="Scenes rendered in parallel")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be rebuilt")
+    args = parser.parse_args()
+
+    stage_names = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stage_names) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    with open(args.scenes_file, encoding="utf-8") as f:
+        scenes = json.load(f)
+
+    print("🏗️  Papers-to-video build")
+    print("=" * 50)
+    graph = BuildGraph(
+        make_stages(scenes, args.voice, args.jobs, args.render_jobs),
+        MANIFEST_FILE,
+        force=args.force,
+        only=args.scene,
+        dry_run=args.dry_run
+    )
+    summary = graph.build(stage_names)
+
+    failed = {stage: info["failed"] for stage, info in summary.items() if info["failed"]}
+    rebuilt = sum(info["dirty"] for info in summary.values())
+    print(f"\n{'🔎 Would rebuild' if args.dry_run else '✅ Rebuilt'} {rebuilt} task(s)"
+          + (f", failed: {failed}" if failed else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
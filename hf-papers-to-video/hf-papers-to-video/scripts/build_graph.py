@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Minimal incremental build graph
+
+A build is an ordered list of stages; each stage expands into independent tasks
+(usually one per scene). A task's fingerprint is the hash of its declared inputs
+(text, parameters and content hashes of input files). The manifest stores, for every
+task that last succeeded, its fingerprint and the hashes of its output files; a task
+re-runs only when its fingerprint changed or an output is missing or was modified.
+Dirty tasks within a stage run in parallel.
+"""
+
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+
+def hash_json(obj):
+    """SHA-256 of a JSON-serializable value (key order independent)"""
+    payload = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """
+    Build manifest: task records plus a (size, mtime) -> sha256 cache for input files
+
+    {"files": {path: [size, mtime_ns, sha256]},
+     "tasks": {stage: {key: {"fingerprint", "outputs": {path: sha256}, "result"}}}}
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        self.files = data.get('files', {})
+        self.tasks = data.get('tasks', {})
+
+    def file_hash(self, path):
+        """Content hash of a file (None if missing); unchanged files are not re-read"""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        key = str(path)
+        with self._lock:
+            cached = self.files.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        digest = _hash_file(path)
+        with self._lock:
+            self.files[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def record(self, stage, key):
+        with self._lock:
+            return self.tasks.get(stage, {}).get(key)
+
+    def update(self, stage, key, fingerprint, outputs, result=None):
+        """Record a successful task and save the manifest"""
+        entry = {
+            'fingerprint': fingerprint,
+            'outputs': {str(p): self.file_hash(p) for p in outputs},
+            'result': result,
+        }
+        with self._lock:
+            self.tasks.setdefault(stage, {})[key] = entry
+            self._save()
+
+    def retain(self, stage, keys):
+        """Drop records of tasks that no longer exist in a stage"""
+        keys = set(keys)
+        with self._lock:
+            records = self.tasks.get(stage, {})
+            for key in [k for k in records if k not in keys]:
+                del records[key]
+            self._save()
+
+    def _save(self):
+        """Atomic write (caller holds the lock)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        tmp.write_text(json.dumps({'files': self.files, 'tasks': self.tasks}, ensure_ascii=False, indent=1),
+                       encoding='utf-8')
+        os.replace(tmp, self.path)
+
+
+class Task:
+    """
+    One unit of work
+
+    key: task id within its stage (scene id, image name, or a fixed name for global steps)
+    inputs: JSON-serializable description of everything the output depends on
+    outputs: files the task produces (hashed into the manifest)
+    action: callable run for this task alone (stages with a batch runner ignore it)
+    scoped: per-scene task, subject to BuildGraph(only=...)
+    """
+
+    def __init__(self, key, inputs, outputs=(), action=None, scoped=False):
+        self.key = key
+        self.scoped = scoped
+        self.inputs = inputs
+        self.outputs = [Path(p) for p in outputs]
+        self.action = action
+        self.fingerprint = hash_json(inputs)
+
+
+class Stage:
+    """
+    A pipeline step
+
+    plan(graph) -> [Task], called when the stage is reached so input hashes reflect
+    the outputs of earlier stages.
+    run(tasks, graph) -> {key: result}, optional batch runner for the dirty tasks;
+    keys missing from the result (or mapped to an Exception) count as failed.
+    Without it each task's action runs on a thread pool of `workers`.
+    """
+
+    def __init__(self, name, plan, run=None, workers=4):
+        self.name = name
+        self.plan = plan
+        self.run = run
+        self.workers = workers
+
+
+class BuildGraph:
+    """
+    Runs stages in order, re-running only dirty tasks
+
+    Example:
+        >>> graph = BuildGraph([Stage("tts", plan_tts, run_tts)], ".build/manifest.json")
+        >>> graph.build()
+    """
+
+    def __init__(self, stages, manifest_path, force=False, only=None, dry_run=False):
+        """
+        Args:
+            stages: ordered list of Stage
+            manifest_path: manifest file
+            force: re-run every task
+            only: restrict per-scene tasks to these keys (tasks of other keys are left as is)
+            dry_run: report what would run without running it
+        """
+        self.stages = stages
+        self.manifest = Manifest(manifest_path)
+        self.force = force
+        self.only = set(only) if only else None
+        self.dry_run = dry_run
+        self.failed = set()    # keys that failed in an earlier stage (downstream tasks are skipped)
+
+    def file_hash(self, path):
+        return self.manifest.file_hash(path)
+
+    def is_dirty(self, stage, task):
+        """Fingerprint changed, never built, or an output is missing / was modified"""
+        if self.force:
+            return True
+        record = self.manifest.record(stage.name, task.key)
+        if record is None or record['fingerprint'] != task.fingerprint:
+            return True
+        return any(self.file_hash(path) != digest for path, digest in record['outputs'].items())
+
+    def _run_tasks(self, stage, tasks):
+        if stage.run is not None:
+            return stage.run(tasks, self)
+
+        def call(task):
+            try:
+                return task.action()
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(stage.workers, len(tasks)))) as pool:
+            return dict(zip([t.key for t in tasks], pool.map(call, tasks)))
+
+    def build(self, stage_names=None):
+        """
+        Run the graph
+
+        Args:
+            stage_names: run only these stages (others are not planned)
+
+        Returns:
+            dict: {stage: {"total", "dirty", "failed": [keys]}}
+        """
+        summary = {}
+        for stage in self.stages:
+            if stage_names and stage.name not in stage_names:
+                continue
+            tasks = stage.plan(self)
+            if not self.dry_run:
+                self.manifest.retain(stage.name, [t.key for t in tasks])
+            dirty = [t for t in tasks
+                     if t.key not in self.failed
+                     and (self.only is None or not t.scoped or t.key in self.only)
+                     and self.is_dirty(stage, t)]
+            skipped = sorted(t.key for t in tasks if t.key in self.failed)
+            names = ', '.join(t.key for t in dirty[:8]) + (' ...' if len(dirty) > 8 else '')
+            print(f"[{stage.name}] {len(dirty)}/{len(tasks)} to build" + (f": {names}" if dirty else ""))
+            if skipped:
+                print(f"[{stage.name}] skipped (upstream failed): {', '.join(skipped)}")
+
+            failed = []
+            if dirty and not self.dry_run:
+                results = self._run_tasks(stage, dirty)
+                for task in dirty:
+                    result = results.get(task.key, KeyError(task.key))
+                    if isinstance(result, Exception):
+                        failed.append(task.key)
+                        print(f"[{stage.name}] ✗ {task.key}: {result}")
+                        continue
+                    self.manifest.update(stage.name, task.key, task.fingerprint, task.outputs, result)
+                self.failed.update(failed)
+            summary[stage.name] = {'total': len(tasks), 'dirty': len(dirty), 'failed': failed}
+        return summary
@@ -11,12 +11,25 @@ from pathlib import Path
 WORK_DIR = Path(__file__).parent.parent
 AUDIO_DIR = WORK_DIR / "public" / "audio"
 SCENES_FILE = WORK_DIR / "scenes.json"
+DURATIONS_FILE = WORK_DIR / "audio-durations.json"
 
 # Default voice (News anchor style)
 DEFAULT_VOICE = "zh_male_jieshuoxiaoming_moon_bigtts"
 
-def generate_tts(text, output_path, voice=DEFAULT_VOICE):
-    """Generate TTS using Doubao/Volcano"""
+# Installed doubao-open-tts skill
+TTS_SCRIPTS_DIR = Path.home() / "clawd" / "skills" / "doubao-open-tts" / "scripts"
+
+def generate_tts_batch(jobs, voice=DEFAULT_VOICE, workers=4, qps=5.0):
+    """Generate TTS for many scenes concurrently using Doubao/Volcano
+    
+    Clips are looked up in the skill's audio cache first (keyed by text, voice and
+    prosody), so after an edit only the changed scenes hit the API.
+    Each finished clip's duration (from the API response or cache, else parsed from
+    the MP3 frame headers) is written to audio-durations.json as it completes.
+    
+    jobs: list of (scene_id, text, output_path)
+    Returns {scene_id: result dict from VolcanoTTS.synthesize_batch}, or None on setup errors
+    """
     
     # Check for required environment variables
     required = ['VOLCANO_TTS_APPID', 'VOLCANO_TTS_ACCESS_TOKEN', 'VOLCANO_TTS_SECRET_KEY']
@@ -24,19 +37,54 @@ def generate_tts(text, output_path, voice=DEFAULT_VOICE):
     if missing:
         print(f"❌ Missing environment variables: {missing}")
         print("Set them in your shell or .env file")
-        return False
+        return None
+    
+    # Use the doubao-open-tts skill in-process (one session, no interpreter per scene)
+    if not (TTS_SCRIPTS_DIR / "tts.py").exists():
+        print(f"❌ TTS script not found: {TTS_SCRIPTS_DIR / 'tts.py'}")
+        return None
+    sys.path.insert(0, str(TTS_SCRIPTS_DIR))
+    from tts import VolcanoTTS
+    from tts_cache import TTSCache
+    from audio_index import DurationIndex
+    
+    index = DurationIndex(DURATIONS_FILE)
     
-    # Use the doubao-open-tts skill
-    tts_script = Path.home() / "clawd" / "skills" / "doubao-open-tts" / "scripts" / "tts.py"
+    def report(result):
+        scene_id = jobs[result['index']][0]
+        if result['error']:
+            print(f"✗ {scene_id}: {result['error']}")
+            return
+        try:
+            entry = index.update(scene_id, result['output_file'], result['duration'])
+        except ValueError as e:
+            print(f"✗ {scene_id}: {e}")
+            return
+        if result['cached']:
+            print(f"✓ {scene_id}: unchanged, reused cached audio ({entry['duration']:.2f}s)")
+        else:
+            print(f"✓ {scene_id}: saved to {result['output_file']} ({entry['duration']:.2f}s)")
+    
+    items = [{'text': text, 'output_file': str(path)} for _, text, path in jobs]
+    cache = TTSCache()
+    with VolcanoTTS(voice_type=voice, pool_size=workers, cache=cache) as tts:
+        results = tts.synthesize_batch(items, max_workers=workers, qps=qps, on_result=report, voice_type=voice)
+    stats = cache.stats()
+    print(f"\nCache: {stats['hits']} hits, {stats['misses']} misses ({stats['entries']} clips cached)")
+    
+    return {jobs[r['index']][0]: r for r in results}
+
+def scene_narration(scene):
+    """Narration text for a scene: title, paragraphs and bullet points"""
+    text_parts = [scene.get('title', '')]
     
-    if not tts_script.exists():
-        print(f"❌ TTS script not found: {tts_script}")
-        return False
+    if 'paragraphs' in scene:
+        text_parts.extend(scene['paragraphs'])
     
-    cmd = f'python3 "{tts_script}" "{text}" -v {voice} -o "{output_path}"'
-    result = os.system(cmd)
+    if 'bulletPoints' in scene:
+        text_parts.extend(scene['bulletPoints'])
     
-    return result == 0
+    return ' '.join(text_parts)
 
 def main():
     print("🎙️  TTS Generator")
@@ -53,20 +101,12 @@ def main():
     
     print(f"Generating audio for {len(scenes)} scenes...\n")
     
-    success_count = 0
+    jobs = []
     for scene in scenes:
         scene_id = scene['id']
         
         # Build narration text from content
-        text_parts = [scene.get('title', '')]
-        
-        if 'paragraphs' in scene:
-            text_parts.extend(scene['paragraphs'])
-        
-        if 'bulletPoints' in scene:
-            text_parts.extend(scene['bulletPoints'])
-        
-        narration = ' '.join(text_parts)
+        narration = scene_narration(scene)
         
         if not narration.strip():
             continue
@@ -75,12 +115,18 @@ def main():
         
         print(f"Scene: {scene_id}")
         print(f"Text: {narration[:100]}...")
-        
-        if generate_tts(narration, output_path):
-            print(f"✓ Saved to {output_path}\n")
-            success_count += 1
-        else:
-            print(f"✗ Failed\n")
+        jobs.append((scene_id, narration, output_path))
+    
+    print()
+    results = generate_tts_batch(jobs) if jobs else {}
+    if results is None:
+        return
+    
+    # Drop durations of scenes that no longer exist
+    from audio_index import DurationIndex
+    DurationIndex(DURATIONS_FILE).retain(job[0] for job in jobs)
+    
+    success_count = sum(1 for r in results.values() if not r['error'])
     
     print(f"\n✅ Generated {success_count}/{len(scenes)} audio files")
 
@@ -3,11 +3,10 @@
 
 import os
 import sys
-import json
 from pathlib import Path
 
 # 添加 doubao tts 路径
-sys.path.insert(0, str(Path.home() / "clawd/skills/doubao-open-tts"))
+sys.path.insert(0, str(Path.home() / "clawd/skills/doubao-open-tts/scripts"))
 
 # 文案定义 - 总时长控制在60秒左右
 SCRIPTS = {
@@ -43,36 +42,50 @@ def generate_tts():
                     key, value = line.strip().split('=', 1)
                     os.environ[key] = value
     
-    durations = {}
+    # 调用豆包TTS：所有场景在同一进程内并发合成，共享连接池；
+    # 文案未改动的场景直接使用缓存音频
+    from tts import VolcanoTTS
+    from tts_cache import TTSCache
+    from audio_index import DurationIndex
     
-    for scene_id, text in SCRIPTS.items():
-        output_path = public_audio / f"{scene_id}.mp3"
-        
-        # 调用豆包TTS
-        cmd = f'''cd ~/clawd/skills/doubao-open-tts && python3 scripts/tts.py "{text}" -v {VOICE} -o {output_path}'''
-        print(f"生成 {scene_id} 音频...")
-        os.system(cmd)
-        
-        # 获取音频时长
-        if output_path.exists():
-            import subprocess
-            result = subprocess.run(
-                ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', 
-                 '-of', 'default=noprint_wrappers=1:nokey=1', str(output_path)],
-                capture_output=True, text=True
-            )
-            try:
-                duration = float(result.stdout.strip())
-                durations[scene_id] = int(duration) + 2  # 加2秒缓冲
-                print(f"  ✓ 时长: {duration:.1f}秒")
-            except:
-                durations[scene_id] = 5
+    scene_ids = list(SCRIPTS)
+    items = [
+        {"text": SCRIPTS[scene_id], "output_file": str(public_audio / f"{scene_id}.mp3")}
+        for scene_id in scene_ids
+    ]
+    
+    # 时长索引：每段完成即写入（时长取自接口返回值或缓存，缺失时解析 MP3 帧头）
+    index = DurationIndex("audio-durations.json")
+    
+    def record(result):
+        scene_id = scene_ids[result["index"]]
+        if result["error"]:
+            print(f"  ✗ {scene_id}: {result['error']}")
+            return
+        try:
+            entry = index.update(scene_id, result["output_file"], result["duration"])
+        except ValueError as e:
+            print(f"  ✗ {scene_id}: {e}")
+            return
+        print(f"  ✓ {scene_id}: {entry['duration']:.2f}秒 ({entry['frames']} 帧)")
     
-    # 保存时长配置
-    with open("audio-durations.json", "w", encoding="utf-8") as f:
-        json.dump(durations, f, ensure_ascii=False, indent=2)
+    print(f"并发生成 {len(items)} 段音频...")
+    with VolcanoTTS(voice_type=VOICE, cache=TTSCache()) as tts:
+        results = tts.synthesize_batch(items, voice_type=VOICE, on_result=record)
+    print(f"  缓存命中 {sum(1 for r in results if r['cached'])}/{len(results)} 段")
+    
+    # 合成失败但保留有上次音频的场景，按现有文件解析时长
+    for result in results:
+        output_path = Path(items[result["index"]]["output_file"])
+        if result["error"] and output_path.exists():
+            try:
+                index.update(scene_ids[result["index"]], output_path)
+            except ValueError:
+                pass
+    index.retain(scene_ids)
     
-    print(f"\n音频生成完成，总时长: {sum(durations.values())}秒")
+    durations = {scene_id: entry["duration"] for scene_id, entry in index.scenes.items()}
+    print(f"\n音频生成完成，总时长: {index.total_frames / index.fps:.1f}秒")
     return durations
 
 if __name__ == "__main__":
@@ -328,12 +328,24 @@ const Scene: React.FC<{
   return null;
 };
 
+// Single scene with its own narration clip (rendered per scene by scripts/build.py,
+// then concatenated)
+export const SceneClip: React.FC<{ scene: any }> = ({ scene }) => {
+  return (
+    <AbsoluteFill style={{ backgroundColor: '#0f172a' }}>
+      <Audio src={staticFile(`audio/${scene.id}.mp3`)} volume={1} />
+      <Scene scene={scene} isActive={true} />
+    </AbsoluteFill>
+  );
+};
+
 // Main Video Component
 export const VideoWithSubtitles: React.FC<{
   scenes: any[];
   srtContent: string;
-  audioDurations: Record<string, number>;
-}> = ({ scenes, srtContent, audioDurations }) => {
+  sceneFrames: Record<string, number>;
+}> = ({ scenes, srtContent, sceneFrames }) => {
+  const { fps } = useVideoConfig();
   let currentFrame = 0;
   
   return (
@@ -348,7 +360,7 @@ export const VideoWithSubtitles: React.FC<{
       {/* Scenes */}
       {scenes.map((scene) => {
         const fromFrame = currentFrame;
-        const durationInFrames = (audioDurations[scene.id] || 5) * 30;
+        const durationInFrames = sceneFrames[scene.id] ?? 5 * fps;
         currentFrame += durationInFrames;
         
         return (
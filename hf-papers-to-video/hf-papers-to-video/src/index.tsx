@@ -1,6 +1,6 @@
 import React from 'react';
 import { Composition, registerRoot } from 'remotion';
-import { VideoWithSubtitles } from './components/VideoWithSubtitles';
+import { SceneClip, VideoWithSubtitles } from './components/VideoWithSubtitles';
 import scenesData from '../scenes_papers.json';
 import audioDurations from '../audio-durations.json';
 
@@ -33,25 +33,65 @@ const srtContent = `1
 00:01:42,000 --> 00:01:49,000
 以上就是今天的五篇AI前沿论文。感谢观看，我们明天再见！`;
 
-// Calculate total duration from audio-durations
-const totalDuration = Object.values(audioDurations).reduce((a: number, b: number) => a + b, 0);
+const FPS = 30;
 
-// Root component with Composition
+// Scene lengths in frames. audio-durations.json is written by scripts/audio_index.py as
+// { fps, padding, scenes: { id: { duration, frames, ... } } }; a legacy flat
+// { id: seconds } map is still accepted.
+type DurationIndex = { scenes?: Record<string, { frames: number }> } & Record<string, unknown>;
+
+const sceneFrames = (index: DurationIndex): Record<string, number> => {
+  if (index.scenes) {
+    return Object.fromEntries(
+      Object.entries(index.scenes).map(([id, entry]) => [id, entry.frames])
+    );
+  }
+  return Object.fromEntries(
+    Object.entries(index)
+      .filter(([, seconds]) => typeof seconds === 'number')
+      .map(([id, seconds]) => [id, Math.ceil((seconds as number) * FPS)])
+  );
+};
+
+const framesByScene = sceneFrames(audioDurations as DurationIndex);
+
+// Total duration: sum of scene lengths (scenes without audio fall back to 5 s)
+const totalFrames = scenesData.reduce(
+  (sum: number, scene: { id: string }) => sum + (framesByScene[scene.id] ?? 5 * FPS),
+  0
+);
+
+// Root component with Compositions: the full video plus one "Scene-<id>" composition per
+// scene, so an edited scene can be re-rendered on its own
 const RemotionRoot: React.FC = () => {
   return (
-    <Composition
-      id="PaperVideo"
-      component={VideoWithSubtitles}
-      durationInFrames={totalDuration * 30}
-      fps={30}
-      width={1920}
-      height={1080}
-      defaultProps={{
-        scenes: scenesData,
-        srtContent: srtContent,
-        audioDurations: audioDurations,
-      }}
-    />
+    <>
+      <Composition
+        id="PaperVideo"
+        component={VideoWithSubtitles}
+        durationInFrames={totalFrames}
+        fps={FPS}
+        width={1920}
+        height={1080}
+        defaultProps={{
+          scenes: scenesData,
+          srtContent: srtContent,
+          sceneFrames: framesByScene,
+        }}
+      />
+      {scenesData.map((scene: { id: string }) => (
+        <Composition
+          key={scene.id}
+          id={`Scene-${scene.id}`}
+          component={SceneClip}
+          durationInFrames={framesByScene[scene.id] ?? 5 * FPS}
+          fps={FPS}
+          width={1920}
+          height={1080}
+          defaultProps={{ scene }}
+        />
+      ))}
+    </>
   );
 };
 
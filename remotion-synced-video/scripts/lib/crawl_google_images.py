@@ -2,13 +2,31 @@
 """
 Google Images Crawler - Extract original (non-thumbnail) image URLs
 Usage: python3 crawl_google_images.py <keyword> [--count N] [--output FILE]
+       python3 crawl_google_images.py --scenes scenes.json [--count N]
+
+When the google-images-crawler skill is installed next to this one (or in
+~/clawd/skills), lookups go through its MultiSearch: Google, Bing and Wikimedia
+are queried concurrently with a per-provider deadline, and results are deduped
+and ranked by resolution. --scenes looks up every scene in one process,
+several scenes at a time. Without that skill the Playwright scraper below is used.
 """
 
 import re
+import sys
 import json
+import asyncio
 import argparse
+from pathlib import Path
 from urllib.parse import unquote
-from playwright.sync_api import sync_playwright
+
+# Sibling skill providing core.providers (checked in this order)
+CRAWLER_SKILL_DIRS = [
+    Path(__file__).resolve().parents[3] / "google-images-crawler",
+    Path.home() / "clawd/skills/google-images-crawler",
+]
+DEFAULT_PROVIDERS = "google,bing,wikimedia"
+DEFAULT_DEADLINE = 15.0
+DEFAULT_WORKERS = 4
 
 
 def extract_from_imgurl_links(page):
@@ -54,6 +72,8 @@ def crawl_google_images(keyword, count=10):
     Returns:
         List of original image URLs
     """
+    from playwright.sync_api import sync_playwright
+
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         page = browser.new_page()
@@ -79,18 +99,108 @@ def crawl_google_images(keyword, count=10):
         return all_urls[:count]
 
 
+def load_multi_search():
+    """Import (MultiSearch, create_providers) from the google-images-crawler skill, or None"""
+    for skill_dir in CRAWLER_SKILL_DIRS:
+        if not (skill_dir / "core" / "providers.py").exists():
+            continue
+        sys.path.insert(0, str(skill_dir))
+        try:
+            from core.providers import MultiSearch, create_providers
+            return MultiSearch, create_providers
+        except ImportError as e:
+            sys.path.remove(str(skill_dir))
+            print(f"google-images-crawler unavailable ({e}), using the built-in crawler", file=sys.stderr)
+    return None
+
+
+async def search_many(queries, count, multi_search, providers=DEFAULT_PROVIDERS,
+                      deadline=DEFAULT_DEADLINE, workers=DEFAULT_WORKERS):
+    """
+    Look up several queries concurrently through MultiSearch
+
+    Args:
+        queries: search queries
+        count: images per query
+        multi_search: (MultiSearch, create_providers) from load_multi_search()
+        providers: comma-separated provider names
+        deadline: per-provider deadline in seconds
+        workers: queries searched at the same time (also the number of Google pages)
+
+    Returns:
+        {query: [{"url", "width", "height", "title"}]}, ranked by resolution
+    """
+    MultiSearch, create_providers = multi_search
+    queries = list(dict.fromkeys(queries))
+    sources = create_providers(providers.split(","), pages=min(workers, len(queries)) or 1)
+    semaphore = asyncio.Semaphore(max(1, workers))
+    found = {}
+
+    async with MultiSearch(sources, deadline=deadline) as multi:
+        async def lookup(query):
+            async with semaphore:
+                stats = {}
+                results = await multi.search(query, count, stats=stats)
+            found[query] = [
+                {"url": r.url, "width": r.width, "height": r.height, "title": r.title}
+                for r in results
+            ]
+            per_source = ", ".join(f"{name}={s['results']}" for name, s in stats.items())
+            print(f"{query}: {len(results)} [{per_source}]", file=sys.stderr)
+
+        await asyncio.gather(*(lookup(q) for q in queries))
+    return found
+
+
+def lookup_queries(queries, count, providers=DEFAULT_PROVIDERS, deadline=DEFAULT_DEADLINE,
+                   workers=DEFAULT_WORKERS):
+    """{query: [{"url", ...}]} via MultiSearch, or the built-in crawler (one query at a time)"""
+    multi_search = load_multi_search()
+    if multi_search:
+        return asyncio.run(search_many(queries, count, multi_search, providers, deadline, workers))
+    found = {}
+    for query in dict.fromkeys(queries):
+        try:
+            found[query] = [{"url": url} for url in crawl_google_images(query, count)]
+        except Exception as e:
+            print(f"{query}: {e}", file=sys.stderr)
+            found[query] = []
+    return found
+
+
 def main():
     parser = argparse.ArgumentParser(description='Crawl Google Images')
-    parser.add_argument('keyword', help='Search keyword')
+    parser.add_argument('keyword', nargs='?', help='Search keyword')
+    parser.add_argument('--scenes', help='Look up every scene of a scenes.json '
+                        '(searchQuery or title); prints {scene_id: [{url, ...}]} as JSON')
     parser.add_argument('--count', '-n', type=int, default=10, 
                         help='Number of images to retrieve (default: 10)')
     parser.add_argument('--output', '-o', help='Output file to save URLs')
     parser.add_argument('--json', '-j', action='store_true',
                         help='Output as JSON')
+    parser.add_argument('--providers', default=DEFAULT_PROVIDERS,
+                        help=f'Search providers when google-images-crawler is available (default: {DEFAULT_PROVIDERS})')
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE,
+                        help=f'Per-provider deadline in seconds (default: {DEFAULT_DEADLINE:.0f})')
+    parser.add_argument('--workers', '-w', type=int, default=DEFAULT_WORKERS,
+                        help=f'Queries searched concurrently (default: {DEFAULT_WORKERS})')
     
     args = parser.parse_args()
+    if not args.keyword and not args.scenes:
+        parser.error('a keyword or --scenes is required')
+    
+    if args.scenes:
+        with open(args.scenes, encoding='utf-8') as f:
+            scenes = json.load(f)
+        queries = {scene['id']: scene.get('searchQuery') or scene.get('title', '') for scene in scenes}
+        found = lookup_queries([q for q in queries.values() if q], args.count,
+                               args.providers, args.deadline, args.workers)
+        print(json.dumps({scene_id: found.get(query, []) for scene_id, query in queries.items()},
+                         ensure_ascii=False))
+        return
     
-    urls = crawl_google_images(args.keyword, args.count)
+    found = lookup_queries([args.keyword], args.count, args.providers, args.deadline, args.workers)
+    urls = [item['url'] for item in found.get(args.keyword, [])]
     
     if args.json:
         print(json.dumps(urls))
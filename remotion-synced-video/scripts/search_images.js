@@ -1,7 +1,11 @@
 #!/usr/bin/env node
 /**
  * 多源图片搜索脚本（生产版）
- * 优先级：Python Google Images → Bing Images → Unsplash → 渐变占位图
+ * 优先级：Python 多源搜索 → Bing Images → Unsplash → 渐变占位图
+ *
+ * 第一级在一个 Python 进程中一次查询所有场景（lib/crawl_google_images.py --scenes）：
+ * 安装了 google-images-crawler 技能时 Google/Bing/Wikimedia 并发查询（每个来源有截止时间，
+ * 按分辨率排序），多个场景同时搜索；否则逐个场景用 Playwright 爬取 Google。
  * 
  * 使用方法：
  *   node search_images.js scenes.json --output ./public/images
@@ -136,6 +140,49 @@ async function searchGoogleImagesPython(query, limit = SEARCH_LIMIT) {
   });
 }
 
+// 一次查询所有场景（多源并发），返回 { sceneId: [{ url, source }] }，失败时返回 null
+async function searchScenesPython(scenesFile, limit = SEARCH_LIMIT) {
+  console.log(`${colors.cyan}🔍 [多源搜索]${colors.reset} 并发查询所有场景...`);
+  
+  const scriptPath = path.join(__dirname, 'lib', 'crawl_google_images.py');
+  
+  return new Promise((resolve) => {
+    const proc = spawn('python3', [scriptPath, '--scenes', scenesFile, '--count', String(limit)], {
+      timeout: 180000
+    });
+    
+    let output = '';
+    
+    proc.stdout.on('data', (data) => { output += data.toString(); });
+    proc.stderr.on('data', (data) => { process.stderr.write(`   ${data}`); });
+    
+    proc.on('close', (code) => {
+      if (code !== 0) {
+        console.log(`${colors.yellow}  ⚠️ 多源搜索失败，改为逐个场景搜索${colors.reset}`);
+        resolve(null);
+        return;
+      }
+      
+      try {
+        const found = JSON.parse(output);
+        const byScene = {};
+        for (const [sceneId, items] of Object.entries(found)) {
+          byScene[sceneId] = items.map(item => ({ url: item.url, source: 'search' }));
+        }
+        resolve(byScene);
+      } catch (e) {
+        console.log(`${colors.yellow}  ⚠️ 解析失败，改为逐个场景搜索${colors.reset}`);
+        resolve(null);
+      }
+    });
+    
+    proc.on('error', (err) => {
+      console.log(`${colors.yellow}  ⚠️ 启动失败: ${err.message}${colors.reset}`);
+      resolve(null);
+    });
+  });
+}
+
 // Bing Images 搜索
 async function searchBingImages(query, limit = SEARCH_LIMIT) {
   console.log(`${colors.cyan}🔍 [Bing]${colors.reset} 搜索: "${query}"`);
@@ -218,8 +265,8 @@ function generatePlaceholder(sceneId, outputPath) {
   }
 }
 
-// 为场景搜索图片
-async function searchForScene(scene, outputDir) {
+// 为场景搜索图片（prefetched 为 searchScenesPython 已查到的结果）
+async function searchForScene(scene, outputDir, prefetched) {
   const query = scene.searchQuery || scene.title;
   const sceneId = scene.id;
   
@@ -229,10 +276,15 @@ async function searchForScene(scene, outputDir) {
   const failures = [];
   let allImages = [];
   
-  // Level 1: Python Google Images（首选）
-  const googleResults = await searchGoogleImagesPython(query, SEARCH_LIMIT);
+  // Level 1: Python 多源搜索（首选，已批量查询）；批量查询失败时单独爬取 Google
+  const googleResults = prefetched
+    ? (prefetched[sceneId] || [])
+    : await searchGoogleImagesPython(query, SEARCH_LIMIT);
+  if (prefetched) {
+    console.log(`${colors.green}  ✓${colors.reset} 多源搜索找到 ${googleResults.length} 张图片`);
+  }
   allImages = allImages.concat(googleResults);
-  if (googleResults.length === 0) failures.push('Google: 未找到');
+  if (googleResults.length === 0) failures.push(prefetched ? '多源搜索: 未找到' : 'Google: 未找到');
   if (allImages.length >= DOWNLOAD_LIMIT) {
     return await downloadImages(allImages, outputDir, sceneId, failures);
   }
@@ -334,7 +386,7 @@ async function main() {
   
   console.log(`${colors.blue}═══════════════════════════════════════════${colors.reset}`);
   console.log(`${colors.blue}🖼️  多源图片搜索工具${colors.reset}`);
-  console.log(`${colors.blue}   Python/Google → Bing → Unsplash → 占位图${colors.reset}`);
+  console.log(`${colors.blue}   多源搜索 → Bing → Unsplash → 占位图${colors.reset}`);
   console.log(`${colors.blue}═══════════════════════════════════════════${colors.reset}\n`);
   
   if (!fs.existsSync(args.scenesFile)) {
@@ -347,13 +399,16 @@ async function main() {
   
   ensureDir(args.outputDir);
   
-  const stats = { total: scenes.length, google: 0, bing: 0, unsplash: 0, placeholder: 0, failures: [] };
+  const stats = { total: scenes.length, search: 0, google: 0, bing: 0, unsplash: 0, placeholder: 0, failures: [] };
   const imageMap = [];
   
+  const prefetched = await searchScenesPython(args.scenesFile, SEARCH_LIMIT);
+  
   for (const scene of scenes) {
-    const result = await searchForScene(scene, args.outputDir);
+    const result = await searchForScene(scene, args.outputDir, prefetched);
     
-    if (result.source === 'google') stats.google++;
+    if (result.source === 'search') stats.search++;
+    else if (result.source === 'google') stats.google++;
     else if (result.source === 'bing') stats.bing++;
     else if (result.source === 'unsplash') stats.unsplash++;
     else if (result.source === 'placeholder') stats.placeholder++;
@@ -383,6 +438,7 @@ async function main() {
   console.log(`${colors.blue}═══════════════════════════════════════════${colors.reset}`);
   
   console.log(`\n✅ 总计: ${stats.total} 个场景`);
+  console.log(`   ${colors.green}多源搜索:${colors.reset}  ${stats.search} 个`);
   console.log(`   ${colors.green}Google:${colors.reset}    ${stats.google} 个`);
   console.log(`   ${colors.cyan}Bing:${colors.reset}      ${stats.bing} 个`);
   console.log(`   ${colors.blue}Unsplash:${colors.reset}  ${stats.unsplash} 个`);
@@ -10,32 +10,126 @@
 - 新增Bing图片搜索作为备选来源
 - 新增直接URL源（预设常见图片的直接链接）
 - 改进错误处理和重试机制
+- Wikimedia 批量解析：一次搜索请求 + 一次 imageinfo 请求（每次最多 50 个标题），
+  直接请求服务端缩略图，并发下载
+- 连接复用的 HTTP 客户端（keep-alive 连接池，安装 httpx[http2] 时使用 HTTP/2），
+  SSL 校验只在客户端范围内关闭（--insecure），不再全局禁用
+- 多来源并发查询：所有来源同时搜索（每个来源有截止时间），先返回的来源先开始下载，
+  凑够数量即停止，不再逐个来源依次尝试
 """
 
 import argparse
 import json
-import urllib.request
-import urllib.parse
 import ssl
 import re
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from PIL import Image
-import time
 
-# 禁用SSL验证（某些环境下需要）
-ssl._create_default_https_context = ssl._create_unverified_context
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx  # 可选：pip install "httpx[http2]" 后启用 HTTP/2
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+WIKIMEDIA_API = "https://commons.wikimedia.org/w/api.php"
+# MediaWiki API 单次请求最多接受的标题数
+IMAGEINFO_BATCH = 50
+# 请求服务端缩略图的宽度（报告插图无需原图）
+DEFAULT_THUMB_WIDTH = 1200
+# 并发下载数（Wikimedia 要求客户端保持礼貌的请求速率）
+DEFAULT_WORKERS = 4
+# 每个来源的搜索截止时间（秒），超时的来源被跳过
+DEFAULT_SOURCE_DEADLINE = 20
+SOURCES = ('direct', 'wikimedia', 'bing')
+IMAGE_MIMES = ('image/jpeg', 'image/png', 'image/webp', 'image/gif')
+
+
+
+class HttpClient:
+    """连接复用的 HTTP 客户端
+    
+    同一主机的请求复用 keep-alive 连接（TLS 握手只发生一次），连接池大小与并发下载数一致，
+    可在多个线程间共享。安装了 httpx 和 h2 时使用 HTTP/2（同一连接上多路复用），否则使用
+    requests 连接池。insecure=True 时只对本客户端关闭证书校验，不影响进程内其它 HTTPS 请求。
+    """
+    
+    def __init__(self, headers, pool_size=DEFAULT_WORKERS, insecure=False, http2=True):
+        self.insecure = insecure
+        self.http2 = http2 and httpx is not None
+        
+        if self.http2:
+            # 校验用的 SSL 上下文只创建一次（加载 CA 证书开销较大）
+            verify = False if insecure else ssl.create_default_context()
+            self._client = httpx.Client(
+                http2=True,
+                headers=headers,
+                verify=verify,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=pool_size * 2, max_keepalive_connections=pool_size),
+            )
+        else:
+            self._client = requests.Session()
+            self._client.headers.update(headers)
+            self._client.verify = not insecure
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+            self._client.mount('https://', adapter)
+            self._client.mount('http://', adapter)
+    
+    def get(self, url, params=None, timeout=15):
+        """GET 请求，返回响应内容（非 2xx 时抛出异常）"""
+        with warnings.catch_warnings():
+            if self.insecure:
+                warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+            response = self._client.get(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+    
+    def get_json(self, url, params=None, timeout=15):
+        """GET 请求，返回解析后的 JSON"""
+        return json.loads(self.get(url, params=params, timeout=timeout).decode('utf-8'))
+    
+    def close(self):
+        self._client.close()
+
 
 class ImageDownloader:
     """图片下载器 - 修复版"""
     
-    def __init__(self, output_dir="images"):
+    def __init__(self, output_dir="images", thumb_width=DEFAULT_THUMB_WIDTH, workers=DEFAULT_WORKERS,
+                 insecure=False):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.thumb_width = thumb_width
+        self.workers = workers
+        self._wikimedia_candidates = {}  # 查询 -> 预先解析的候选图片（见 prefetch_wikimedia）
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
         }
+        # 所有请求共享连接池；下载队列由固定大小的线程池限制并发
+        self.client = HttpClient(self.headers, pool_size=workers, insecure=insecure)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        # 来源搜索单独一个池：Wikimedia 搜索内部还会向 _pool 提交任务，共用会互相阻塞
+        self._search_pool = ThreadPoolExecutor(max_workers=len(SOURCES))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def close(self):
+        """关闭线程池和连接池"""
+        self._search_pool.shutdown(wait=True)
+        self._pool.shutdown(wait=True)
+        self.client.close()
     
     def download_image(self, url, filename, timeout=20):
         """下载单张图片"""
@@ -47,139 +141,202 @@ class ImageDownloader:
             return True
         
         try:
-            req = urllib.request.Request(url, headers=self.headers)
-            with urllib.request.urlopen(req, timeout=timeout) as response:
-                data = response.read()
-                
-                # 检查是否是有效图片
-                if len(data) < 2000:
-                    print(f"   ⚠️  文件太小: {len(data)} bytes")
-                    return False
-                
-                # 保存
-                output_path.write_bytes(data)
+            data = self.client.get(url, timeout=timeout)
+            
+            # 检查是否是有效图片
+            if len(data) < 2000:
+                print(f"   ⚠️  文件太小: {len(data)} bytes")
+                return False
+            
+            # 保存
+            output_path.write_bytes(data)
+            
+            # 验证图片
+            try:
+                with Image.open(output_path) as img:
+                    img.verify()
+                size_kb = len(data) / 1024
+                print(f"   ✅ 成功下载 ({size_kb:.1f} KB): {filename}")
+                return True
+            except Exception as e:
+                print(f"   ⚠️  无效图片: {e}")
+                output_path.unlink(missing_ok=True)
+                return False
                 
-                # 验证图片
-                try:
-                    with Image.open(output_path) as img:
-                        img.verify()
-                    size_kb = len(data) / 1024
-                    print(f"   ✅ 成功下载 ({size_kb:.1f} KB): {filename}")
-                    return True
-                except Exception as e:
-                    print(f"   ⚠️  无效图片: {e}")
-                    output_path.unlink(missing_ok=True)
-                    return False
-                    
         except Exception as e:
             print(f"   ❌ 下载失败: {str(e)[:50]}")
             return False
     
-    def search_wikimedia(self, query, count=3):
-        """从Wikimedia Commons搜索图片 - 修复版
+    def _api_get(self, params, timeout=15):
+        """调用 Wikimedia API，返回解析后的 JSON"""
+        return self.client.get_json(WIKIMEDIA_API, params={**params, 'format': 'json'}, timeout=timeout)
+    
+    def _search_titles(self, query, limit):
+        """搜索 File: 命名空间，返回按相关度排序的文件标题"""
+        data = self._api_get({
+            'action': 'query', 'list': 'search', 'srsearch': query,
+            'srnamespace': 6, 'srlimit': limit,
+        })
+        return [item['title'] for item in data.get('query', {}).get('search', []) if item.get('title')]
+    
+    def _imageinfo(self, titles):
+        """批量获取文件信息（每次请求最多 IMAGEINFO_BATCH 个标题）
         
-        使用正确的API流程:
-        1. 使用search API搜索文件
-        2. 使用imageinfo API获取实际图片URL
-        3. 下载图片
+        返回: {标题: {url, thumburl, width, height, mime}}
         """
-        print(f"🔍 Wikimedia搜索: {query}")
+        infos = {}
+        for start in range(0, len(titles), IMAGEINFO_BATCH):
+            chunk = titles[start:start + IMAGEINFO_BATCH]
+            data = self._api_get({
+                'action': 'query', 'titles': '|'.join(chunk),
+                'prop': 'imageinfo', 'iiprop': 'url|size|mime',
+                'iiurlwidth': self.thumb_width,
+            })
+            query = data.get('query', {})
+            # API 会规范化标题（如空格/大小写），映射回请求时的标题
+            renamed = {n['to']: n['from'] for n in query.get('normalized', [])}
+            for page in query.get('pages', {}).values():
+                imageinfo = page.get('imageinfo')
+                if imageinfo:
+                    title = page.get('title', '')
+                    infos[renamed.get(title, title)] = imageinfo[0]
+        return infos
+    
+    def prefetch_wikimedia(self, queries, count=3):
+        """批量解析多个查询的 Wikimedia 候选图片
+        
+        每个查询一次搜索请求（并发执行），所有查询的标题合并后批量获取 imageinfo，
+        10 个章节的报告只需约 10 + 1 次 API 请求。结果缓存供 search_wikimedia() 使用。
         
-        # Wikimedia搜索API
-        api_url = f"https://commons.wikimedia.org/w/api.php?action=query&list=search&srsearch={urllib.parse.quote(query)}&srnamespace=6&format=json&srlimit={count*2}"
+        参数:
+            queries: 查询列表
+            count: 每个查询需要的图片数（会多取一些候选以应对下载失败）
+        
+        返回:
+            {查询: [候选图片信息]}，候选按搜索相关度排序
+        """
+        queries = [q for q in dict.fromkeys(queries) if q not in self._wikimedia_candidates]
+        if not queries:
+            return self._wikimedia_candidates
         
+        def search(query):
+            try:
+                return self._search_titles(query, count * 2)
+            except Exception as e:
+                print(f"   ❌ Wikimedia搜索失败 ({query}): {e}")
+                return None
+        
+        titles_by_query = dict(zip(queries, self._pool.map(search, queries)))
+        
+        all_titles = list(dict.fromkeys(t for titles in titles_by_query.values() if titles for t in titles))
         try:
-            req = urllib.request.Request(api_url, headers=self.headers)
-            with urllib.request.urlopen(req, timeout=15) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                results = []
-                for item in data.get('query', {}).get('search', []):
-                    title = item.get('title', '').replace('File:', '')
-                    if not title:
-                        continue
-                    
-                    # 获取文件详细信息（包括实际URL）
-                    file_info_url = f"https://commons.wikimedia.org/w/api.php?action=query&titles=File:{urllib.parse.quote(title)}&prop=imageinfo&iiprop=url|size|mime&format=json"
-                    
-                    try:
-                        req2 = urllib.request.Request(file_info_url, headers=self.headers)
-                        with urllib.request.urlopen(req2, timeout=15) as response2:
-                            data2 = json.loads(response2.read().decode('utf-8'))
-                            pages = data2.get('query', {}).get('pages', {})
-                            
-                            for page_id, page_info in pages.items():
-                                imageinfo = page_info.get('imageinfo', [])
-                                if imageinfo:
-                                    img_url = imageinfo[0].get('url')
-                                    if img_url:
-                                        print(f"   找到: {title[:50]}")
-                                        # 使用查询关键词作为文件名前缀
-                                        safe_query = query.replace(' ', '_')[:30]
-                                        safe_name = f"{safe_query}_{len(results)}.jpg"
-                                        
-                                        if self.download_image(img_url, safe_name):
-                                            results.append(img_url)
-                                        
-                                        if len(results) >= count:
-                                            return results
-                                        time.sleep(0.5)
-                    except Exception as e:
-                        print(f"   获取文件信息失败: {e}")
-                        continue
-                
-                return results
-                
+            infos = self._imageinfo(all_titles) if all_titles else {}
         except Exception as e:
-            print(f"   ❌ 搜索失败: {e}")
+            print(f"   ❌ 获取文件信息失败: {e}")
+            return self._wikimedia_candidates
+        
+        for query, titles in titles_by_query.items():
+            if titles is None:
+                continue  # 搜索失败，不缓存，允许之后重试
+            candidates = []
+            for title in titles:
+                info = infos.get(title)
+                if info and info.get('url') and info.get('mime') in IMAGE_MIMES:
+                    candidates.append({
+                        'title': title.replace('File:', '', 1),
+                        'url': info['url'],
+                        'download_url': info.get('thumburl') or info['url'],
+                        'width': info.get('width'),
+                        'height': info.get('height'),
+                    })
+            self._wikimedia_candidates[query] = candidates
+        return self._wikimedia_candidates
+    
+    def download_many(self, items, count):
+        """并发下载候选图片，直到成功 count 张或候选耗尽
+        
+        参数:
+            items: [(下载URL, 文件名)]，按优先级排序
+            count: 需要成功的数量
+        
+        返回:
+            成功下载的 URL 列表（保持候选顺序）
+        """
+        results = []
+        pending = list(items)
+        while pending and len(results) < count:
+            # 每轮只下载还缺的数量，失败时从剩余候选中补充
+            wave, pending = pending[:count - len(results)], pending[count - len(results):]
+            outcomes = self._pool.map(lambda item: self.download_image(*item), wave)
+            results.extend(url for (url, _), ok in zip(wave, outcomes) if ok)
+        return results
+    
+    def wikimedia_candidates(self, query, count=3):
+        """Wikimedia 候选图片 [(下载URL, 文件名, 宽, 高)]
+        
+        使用批量API流程:
+        1. 使用search API搜索文件（一次请求）
+        2. 使用imageinfo API批量获取图片URL和服务端缩略图（一次请求）
+        """
+        print(f"🔍 Wikimedia搜索: {query}")
+        
+        candidates = self.prefetch_wikimedia([query], count).get(query)
+        if not candidates:
             return []
+        
+        safe_query = query.replace(' ', '_')[:30]
+        for c in candidates:
+            print(f"   找到: {c['title'][:50]}")
+        return [(c['download_url'], f"{safe_query}_{i}.jpg", c.get('width'), c.get('height'))
+                for i, c in enumerate(candidates)]
     
-    def search_bing_images(self, query, count=3):
-        """使用Bing图片搜索作为备选来源"""
+    def search_wikimedia(self, query, count=3):
+        """从Wikimedia Commons搜索图片 - 批量版（搜索 + 批量 imageinfo + 并发下载）"""
+        items = [item[:2] for item in self.wikimedia_candidates(query, count)]
+        return self.download_many(items, count)
+    
+    def bing_candidates(self, query, count=3):
+        """Bing 候选图片 [(下载URL, 文件名, 宽, 高)]（尺寸未知）"""
         print(f"🔍 Bing图片搜索: {query}")
         
         try:
             # Bing图片搜索
-            search_url = f"https://www.bing.com/images/search?q={urllib.parse.quote(query)}&form=HDRSC2&first=1"
-            req = urllib.request.Request(search_url, headers=self.headers)
+            html = self.client.get(
+                "https://www.bing.com/images/search",
+                params={'q': query, 'form': 'HDRSC2', 'first': 1},
+                timeout=15,
+            ).decode('utf-8', errors='replace')
+            
+            # 提取图片URL（Bing图片通常在JSON数据或特定HTML结构中）
+            img_urls = []
+            
+            # 尝试多种模式匹配
+            patterns = [
+                r'murl":"(https://[^"]+\.(?:jpg|jpeg|png))"',  # 直接图片URL
+                r'"ou":"(https://[^"]+\.(?:jpg|jpeg|png))"',  # 原始URL
+                r'https://tse\d+\.mm\.bing\.net/th\?id=[^\s"<>]+',  # Bing缩略图
+            ]
+            
+            for pattern in patterns:
+                matches = re.findall(pattern, html, re.IGNORECASE)
+                for url in matches:
+                    if url not in img_urls and len(img_urls) < count * 3:
+                        img_urls.append(url)
+            
+            safe_query = query.replace(' ', '_')[:30]
+            return [(url, f"{safe_query}_bing_{i}.jpg", None, None) for i, url in enumerate(img_urls)]
             
-            with urllib.request.urlopen(req, timeout=15) as response:
-                html = response.read().decode('utf-8')
-                
-                # 提取图片URL（Bing图片通常在JSON数据或特定HTML结构中）
-                img_urls = []
-                
-                # 尝试多种模式匹配
-                patterns = [
-                    r'murl":"(https://[^"]+\.(?:jpg|jpeg|png))"',  # 直接图片URL
-                    r'"ou":"(https://[^"]+\.(?:jpg|jpeg|png))"',  # 原始URL
-                    r'https://tse\d+\.mm\.bing\.net/th\?id=[^\s"<>]+',  # Bing缩略图
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, html, re.IGNORECASE)
-                    for url in matches:
-                        if url not in img_urls and len(img_urls) < count * 3:
-                            img_urls.append(url)
-                
-                results = []
-                for i, img_url in enumerate(img_urls[:count]):
-                    safe_query = query.replace(' ', '_')[:30]
-                    safe_name = f"{safe_query}_bing_{i}.jpg"
-                    if self.download_image(img_url, safe_name):
-                        results.append(img_url)
-                        if len(results) >= count:
-                            break
-                    time.sleep(0.5)
-                
-                return results
-                
         except Exception as e:
             print(f"   ❌ Bing搜索失败: {e}")
             return []
     
-    def search_direct_urls(self, query, count=3):
-        """使用预设的直接URL（针对常见主题）
+    def search_bing_images(self, query, count=3):
+        """使用Bing图片搜索作为备选来源"""
+        items = [item[:2] for item in self.bing_candidates(query, count)]
+        return self.download_many(items, count)
+    
+    def direct_candidates(self, query, count=3):
+        """预设直接URL的候选图片 [(下载URL, 文件名, 宽, 高)]（尺寸未知）
         
         优点：绕过搜索API，直接使用已知的有效图片链接
         适用于：艺术史常见主题（塔特林塔、构成主义作品等）
@@ -207,59 +364,82 @@ class ImageDownloader:
             ],
         }
         
-        results = []
         query_lower = query.lower()
         
         for key, urls in direct_urls.items():
             if key in query_lower:
-                for i, url in enumerate(urls[:count]):
-                    safe_query = query.replace(' ', '_')[:30]
-                    safe_name = f"{safe_query}_direct_{i}.jpg"
-                    if self.download_image(url, safe_name):
-                        results.append(url)
-                        if len(results) >= count:
-                            break
-                    time.sleep(0.5)
-                break
+                safe_query = query.replace(' ', '_')[:30]
+                return [(url, f"{safe_query}_direct_{i}.jpg", None, None) for i, url in enumerate(urls)]
         
-        return results
+        return []
     
-    def search_with_retry(self, query, sources=None, max_per_source=2):
+    def search_direct_urls(self, query, count=3):
+        """使用预设的直接URL（针对常见主题）"""
+        items = [item[:2] for item in self.direct_candidates(query, count)]
+        return self.download_many(items, count)
+    
+    def search_with_retry(self, query, sources=None, max_per_source=2, deadline=DEFAULT_SOURCE_DEADLINE):
         """
-        多源搜索带重试
+        多源并发搜索
+        
+        所有来源同时查询候选图片，先返回的来源先开始下载（来源内按分辨率从高到低，
+        尺寸未知的排在最后），按 URL 去重，成功 max_per_source 张即停止；
+        从开始查询算起超过截止时间仍未返回的来源被跳过（截止时间只约束搜索，不含下载耗时）。
         
         参数:
             query: 搜索关键词
-            sources: 图片来源列表 ['direct', 'wikimedia', 'bing', ...]
-            max_per_source: 每个来源最大下载数
-        
-        默认搜索顺序：direct -> wikimedia -> bing
+            sources: 图片来源列表 ['direct', 'wikimedia', 'bing']
+            max_per_source: 需要下载的图片数
+            deadline: 每个来源的截止时间（秒）
         """
         if sources is None:
-            sources = ['direct', 'wikimedia', 'bing']
-        
-        all_results = []
+            sources = list(SOURCES)
         
-        for source in sources:
-            print(f"\n📡 尝试来源: {source}")
-            
-            if source == 'direct':
-                results = self.search_direct_urls(query, max_per_source)
-            elif source == 'wikimedia':
-                results = self.search_wikimedia(query, max_per_source)
-            elif source == 'bing':
-                results = self.search_bing_images(query, max_per_source)
-            else:
+        finders = {
+            'direct': self.direct_candidates,
+            'wikimedia': self.wikimedia_candidates,
+            'bing': self.bing_candidates,
+        }
+        futures = {}
+        for source in dict.fromkeys(sources):
+            if source not in finders:
                 print(f"   未知来源: {source}")
                 continue
-            
-            all_results.extend(results)
-            
-            if len(all_results) >= max_per_source:
-                print(f"✅ 已下载足够图片 ({len(all_results)}张)")
+            futures[self._search_pool.submit(finders[source], query, max_per_source)] = source
+        
+        print(f"\n📡 并发查询来源: {', '.join(futures.values())}")
+        all_results = []
+        seen = set()
+        end = time.monotonic() + deadline
+        pending = set(futures)
+        while pending and len(all_results) < max_per_source:
+            # 下载在计时等待之外进行；下载期间已完成的来源在下一轮立即返回
+            done, pending = wait(pending, timeout=max(0, end - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                late = [futures[future] for future in pending]
+                print(f"   ⏱️  超过截止时间 {deadline}s，跳过来源: {', '.join(late)}")
                 break
             
-            time.sleep(1)  # 来源间延迟，避免请求过快
+            for future in done:
+                needed = max_per_source - len(all_results)
+                if needed <= 0:
+                    break
+                try:
+                    candidates = future.result()
+                except Exception as e:
+                    print(f"   ❌ {futures[future]} 搜索失败: {e}")
+                    continue
+                candidates = [c for c in candidates if c[0] not in seen]
+                seen.update(c[0] for c in candidates)
+                candidates.sort(key=lambda c: -((c[2] or 0) * (c[3] or 0)))
+                all_results.extend(self.download_many([c[:2] for c in candidates], needed))
+        
+        if len(all_results) >= max_per_source:
+            print(f"✅ 已下载足够图片 ({len(all_results)}张)")
+        # 未开始的搜索不再执行；已在进行的搜索结束后其结果被忽略
+        for future in pending:
+            future.cancel()
         
         return all_results
 
@@ -302,7 +482,8 @@ def create_placeholder_image(name, title, output_dir, size=(800, 600)):
 
 def main():
     parser = argparse.ArgumentParser(description="图片搜索下载工具 - 修复版")
-    parser.add_argument("--query", "-q", required=True, help="搜索关键词")
+    parser.add_argument("--query", "-q", required=True, nargs='+',
+                       help="搜索关键词（可指定多个，Wikimedia 查询会批量解析）")
     parser.add_argument("--output", "-o", default="images", help="输出目录")
     parser.add_argument("--count", "-n", type=int, default=3, help="下载数量")
     parser.add_argument("--sources", "-s", nargs='+', 
@@ -310,35 +491,55 @@ def main():
                        help="图片来源: direct(直接URL), wikimedia, bing")
     parser.add_argument("--placeholder", "-p", action="store_true",
                        help="如果下载失败则创建占位图")
-    parser.add_argument("--name", default="image", help="占位图文件名")
+    parser.add_argument("--name", default="image", help="占位图文件名（多个关键词时以关键词命名）")
+    parser.add_argument("--thumb-width", type=int, default=DEFAULT_THUMB_WIDTH,
+                       help=f"Wikimedia 服务端缩略图宽度（默认: {DEFAULT_THUMB_WIDTH}）")
+    parser.add_argument("--workers", "-w", type=int, default=DEFAULT_WORKERS,
+                       help=f"并发下载数（默认: {DEFAULT_WORKERS}）")
+    parser.add_argument("--deadline", type=float, default=DEFAULT_SOURCE_DEADLINE,
+                       help=f"每个来源的搜索截止时间，秒（默认: {DEFAULT_SOURCE_DEADLINE}）")
+    parser.add_argument("--insecure", action="store_true",
+                       help="不校验 HTTPS 证书（仅在证书环境异常时使用）")
     
     args = parser.parse_args()
     
     print("="*60)
     print("图片搜索下载工具 - 修复版")
     print("="*60)
-    print(f"搜索: {args.query}")
+    print(f"搜索: {', '.join(args.query)}")
     print(f"来源: {', '.join(args.sources)}")
     print(f"数量: {args.count}")
     
-    # 创建下载器
-    downloader = ImageDownloader(output_dir=args.output)
-    
-    # 搜索下载
-    results = downloader.search_with_retry(
-        args.query,
-        sources=args.sources,
-        max_per_source=args.count
-    )
+    # 创建下载器（连接池在所有关键词间共享）
+    with ImageDownloader(
+        output_dir=args.output,
+        thumb_width=args.thumb_width,
+        workers=args.workers,
+        insecure=args.insecure,
+    ) as downloader:
+        # 多个关键词时一次性解析所有 Wikimedia 候选
+        if len(args.query) > 1 and 'wikimedia' in args.sources:
+            downloader.prefetch_wikimedia(args.query, args.count)
+        
+        total = 0
+        for query in args.query:
+            # 搜索下载
+            results = downloader.search_with_retry(
+                query,
+                sources=args.sources,
+                max_per_source=args.count,
+                deadline=args.deadline
+            )
+            total += len(results)
+            
+            # 如果失败且启用占位图
+            if len(results) == 0 and args.placeholder:
+                print("\n📝 创建占位图...")
+                name = args.name if len(args.query) == 1 else query.replace(' ', '-')[:30]
+                create_placeholder_image(name, query, args.output)
     
     print("\n" + "="*60)
-    print(f"📊 结果: 成功下载 {len(results)} 张图片")
-    
-    # 如果失败且启用占位图
-    if len(results) == 0 and args.placeholder:
-        print("\n📝 创建占位图...")
-        create_placeholder_image(args.name, args.query, args.output)
-    
+    print(f"📊 结果: 成功下载 {total} 张图片")
     print("="*60)
 
 